@@ -0,0 +1,527 @@
+"""
+API assíncrona (ASGI): as rotas de /funcionarios e de leitura da escala de
+gestao_escala_criacao2, servidas por asyncio + asyncpg.
+
+No Flask cada requisição prende uma thread (e uma conexão) enquanto espera o
+banco; aqui a espera é um await e um único processo atende muitas telas e
+cadastros ao mesmo tempo com o mesmo pool. Respostas, códigos de status,
+ETags, caches (cache_monitor, cache_cadastros), NOTIFY e métricas são os mesmos da
+versão Flask. Escritas em lote, replanejamento e /escalas/replanejar
+continuam só no Flask (usam o código psycopg2).
+
+Precisa de starlette, uvicorn, asyncpg e python-multipart (formulários).
+Uso: python api_assincrona.py [--host 127.0.0.1] [--porta 8000]
+     ou uvicorn api_assincrona:app
+"""
+import argparse
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import cache_cadastros
+import cache_monitor
+from conexao_banco import SITE_PADRAO, abrir_conexao_dedicada_async, criar_pool_async
+from instrumentacao import Medidor, MedicaoASGI, exportar_prometheus
+from notificacoes import (
+    CANAL_CADASTRO, CANAL_ESCALA, evento_da_notificacao, inicio_de_slot, notificar_async
+)
+
+# Mesmos limites da versão Flask
+CAMPOS_FUNCIONARIO = ("id", "nome", "horario_inicio", "horario_fim")
+LIMITE_MAXIMO = 1000     # maior página aceita em ?limit=
+LINHAS_POR_LOTE = 500    # linhas trazidas do cursor do servidor por vez
+
+
+def _erro(e):
+    return JSONResponse({"erro": str(e)}, status_code=500)
+
+
+def _inteiro(request, nome):
+    """Parâmetro inteiro opcional da query string; ValueError se vier outra coisa (como no Flask)."""
+    valor = request.query_params.get(nome)
+    if valor is None:
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"{nome} deve ser um número inteiro") from None
+
+
+async def _dados_formulario(request):
+    """
+    (nome, horario_inicio, horario_fim) do formulário, com os horários como vieram:
+    o SQL converte com ::text::time, o mesmo parser do Postgres que recebe o texto
+    na versão Flask (aceita "8:00", "08:00:00"...).
+    """
+    form = await request.form()
+    return form.get("nome"), form.get("horario_inicio"), form.get("horario_fim")
+
+
+# --- ROTAS ---
+
+# 1. CRIAR (INSERT)
+async def criar(request):
+    try:
+        nome, horario_inicio, horario_fim = await _dados_formulario(request)
+        async with request.app.state.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "INSERT INTO funcionarios (nome, horario_inicio, horario_fim) VALUES ($1, $2::text::time, $3::text::time)",
+                    nome, horario_inicio, horario_fim
+                )
+                await notificar_async(conn, CANAL_CADASTRO, funcionario=nome)
+        cache_cadastros.invalidar()
+        cache_monitor.invalidar()
+        return JSONResponse({"mensagem": f"Funcionário {nome} criado com sucesso!"}, status_code=201)
+    except Exception as e:
+        return _erro(e)
+
+
+# 2. CRIAR COM ID (RETURNING)
+async def criar_com_id(request):
+    try:
+        nome, horario_inicio, horario_fim = await _dados_formulario(request)
+        async with request.app.state.pool.acquire() as conn:
+            async with conn.transaction():
+                novo_id = await conn.fetchval(
+                    "INSERT INTO funcionarios (nome, horario_inicio, horario_fim) VALUES ($1, $2::text::time, $3::text::time) RETURNING id",
+                    nome, horario_inicio, horario_fim
+                )
+                await notificar_async(conn, CANAL_CADASTRO, funcionario_id=novo_id)
+        cache_cadastros.invalidar()
+        cache_monitor.invalidar()
+        return JSONResponse(
+            {"nome": nome, "horario_inicio": horario_inicio, "horario_fim": horario_fim, "id": novo_id},
+            status_code=201
+        )
+    except Exception as e:
+        return _erro(e)
+
+
+# 3. LER UM (do cache de cadastros)
+async def ler_um(request):
+    try:
+        id = request.path_params["id"]
+        linha = (await cache_cadastros.funcionarios_por_id_async(request.app.state.pool, [id])).get(id)
+        if linha is None:
+            return JSONResponse({"mensagem": "Funcionário não encontrado"}, status_code=404)
+        funcionario_dict = dict(zip(CAMPOS_FUNCIONARIO, linha))
+        for campo in ("horario_inicio", "horario_fim"):
+            if funcionario_dict.get(campo):
+                funcionario_dict[campo] = str(funcionario_dict[campo])
+        return JSONResponse(funcionario_dict)
+    except Exception as e:
+        return _erro(e)
+
+
+# 4. LER TODOS (SELECT ALL), em streaming: ?fields=, ?after_id=, ?limit=
+async def ler_todos(request):
+    campos = request.query_params.get("fields")
+    campos = [c.strip() for c in campos.split(",") if c.strip()] if campos is not None else list(CAMPOS_FUNCIONARIO)
+    if not campos:
+        return JSONResponse(
+            {"erro": f"Informe ao menos um campo em fields. Use: {', '.join(CAMPOS_FUNCIONARIO)}"}, status_code=400
+        )
+    invalidos = [c for c in campos if c not in CAMPOS_FUNCIONARIO]
+    if invalidos:
+        return JSONResponse(
+            {"erro": f"Campos inválidos: {', '.join(invalidos)}. Use: {', '.join(CAMPOS_FUNCIONARIO)}"},
+            status_code=400
+        )
+    try:
+        after_id = _inteiro(request, "after_id")
+        limit = _inteiro(request, "limit")
+    except ValueError as e:
+        return JSONResponse({"erro": str(e)}, status_code=400)
+    if limit is not None and not 0 < limit <= LIMITE_MAXIMO:
+        return JSONResponse({"erro": f"limit deve estar entre 1 e {LIMITE_MAXIMO}"}, status_code=400)
+
+    sql_query = f"SELECT {', '.join(campos)} FROM funcionarios"
+    parametros = []
+    if after_id is not None:
+        parametros.append(after_id)
+        sql_query += f" WHERE id > ${len(parametros)}"
+    sql_query += " ORDER BY id"
+    if limit is not None:
+        parametros.append(limit)
+        sql_query += f" LIMIT ${len(parametros)}"
+
+    async def gerar_json():
+        # Cursor no servidor (exige transação): as linhas chegam em lotes
+        async with request.app.state.pool.acquire() as conn:
+            async with conn.transaction():
+                yield "["
+                primeiro = True
+                async for row in conn.cursor(sql_query, *parametros, prefetch=LINHAS_POR_LOTE):
+                    funcionario_dict = {
+                        campo: str(valor) if campo.startswith("horario") and valor is not None else valor
+                        for campo, valor in zip(campos, row)
+                    }
+                    yield ("" if primeiro else ",") + json.dumps(funcionario_dict, ensure_ascii=False)
+                    primeiro = False
+                yield "]"
+
+    return StreamingResponse(gerar_json(), media_type="application/json")
+
+
+# 5. ATUALIZAR (UPDATE) e 6. DELETAR (DELETE)
+async def _alterar(request, sql, parametros, mensagem, mensagem_nao_encontrado):
+    id = request.path_params["id"]
+    async with request.app.state.pool.acquire() as conn:
+        async with conn.transaction():
+            status = await conn.execute(sql, id, *parametros)
+            if status.split()[-1] != "1":  # "UPDATE 1" / "DELETE 0"
+                return JSONResponse({"mensagem": mensagem_nao_encontrado}, status_code=404)
+            await notificar_async(conn, CANAL_CADASTRO, funcionario_id=id)
+    cache_cadastros.invalidar()
+    cache_monitor.invalidar()
+    return JSONResponse({"mensagem": mensagem})
+
+
+async def atualizar(request):
+    try:
+        id = request.path_params["id"]
+        nome, horario_inicio, horario_fim = await _dados_formulario(request)
+        return await _alterar(
+            request,
+            "UPDATE funcionarios SET nome = $2, horario_inicio = $3::text::time, horario_fim = $4::text::time WHERE id = $1",
+            (nome, horario_inicio, horario_fim),
+            f"Funcionário {id} atualizado com sucesso",
+            "Funcionário não encontrado ou erro ao atualizar"
+        )
+    except Exception as e:
+        return _erro(e)
+
+
+async def deletar(request):
+    try:
+        id = request.path_params["id"]
+        return await _alterar(
+            request, "DELETE FROM funcionarios WHERE id = $1", (),
+            f"Funcionário {id} removido", "Funcionário não encontrado"
+        )
+    except Exception as e:
+        return _erro(e)
+
+
+# 8. MONITOR: ESCALA DO DIA (servida do cache, com ETag)
+async def _resposta_monitor(request, formato):
+    try:
+        data_escala = date.fromisoformat(request.query_params.get("data", date.today().isoformat()))
+        site = request.query_params.get("site", SITE_PADRAO)
+        entrada = await cache_monitor.obter_monitor_async(data_escala, site, request.app.state.pool)
+
+        # O ETag é o mesmo para JSON e HTML da mesma grade; o sufixo os diferencia
+        etag = f"{entrada['etag']}-{formato}"
+        cabecalhos = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+        pedidos = request.headers.get("if-none-match", "")
+        if pedidos.strip() == "*" or f'"{etag}"' in (p.strip().removeprefix("W/") for p in pedidos.split(",")):
+            return Response(status_code=304, headers=cabecalhos)
+        tipo = "application/json" if formato == "json" else "text/html; charset=utf-8"
+        return Response(entrada[formato], media_type=tipo, headers=cabecalhos)
+    except ValueError:
+        return JSONResponse({"erro": "Data inválida, use AAAA-MM-DD"}, status_code=400)
+    except Exception as e:
+        return _erro(e)
+
+
+async def monitor(request):
+    return await _resposta_monitor(request, "html")
+
+
+async def monitor_json(request):
+    return await _resposta_monitor(request, "json")
+
+
+class OuvinteEscalasAsync:
+    """
+    Versão asyncio do notificacoes.OuvinteEscalas: LISTEN numa conexão asyncpg
+    dedicada, uma asyncio.Queue por tela e aviso de troca de slot a cada minuto.
+    """
+
+    def __init__(self, pool, intervalo_verificacao=1.0):
+        self._pool = pool
+        self._intervalo = intervalo_verificacao
+        self._assinantes = {}   # fila -> site
+        self._ultimo_minuto = None
+        self._tarefa = None
+
+    def assinar(self, site):
+        fila = asyncio.Queue(maxsize=100)
+        self._assinantes[fila] = site
+        return fila
+
+    def cancelar(self, fila):
+        self._assinantes.pop(fila, None)
+
+    def publicar(self, evento):
+        for fila, site in list(self._assinantes.items()):
+            if evento.get("site") in (None, site):
+                try:
+                    fila.put_nowait(evento)
+                except asyncio.QueueFull:
+                    pass  # tela parada; ela recarrega tudo quando voltar
+
+    def iniciar(self):
+        self._tarefa = asyncio.create_task(self._rodar())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+
+    async def _rodar(self):
+        while True:
+            try:
+                await self._escutar()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ouvinte de escalas: conexão perdida ({e}), tentando de novo em 5 s")
+                await asyncio.sleep(5)
+
+    async def _escutar(self):
+        conn = await abrir_conexao_dedicada_async()
+        perdida = asyncio.Event()
+
+        def receber(_conn, _pid, canal, payload):
+            self.publicar(evento_da_notificacao(canal, payload))
+
+        try:
+            conn.add_termination_listener(lambda _conn: perdida.set())
+            await conn.add_listener(CANAL_ESCALA, receber)
+            await conn.add_listener(CANAL_CADASTRO, receber)
+            while not perdida.is_set():
+                await self._verificar_troca_de_slot()
+                try:
+                    await asyncio.wait_for(perdida.wait(), self._intervalo)
+                except asyncio.TimeoutError:
+                    pass
+            raise ConnectionError("conexão do LISTEN encerrada")
+        finally:
+            if not conn.is_closed():
+                await conn.close()
+
+    async def _verificar_troca_de_slot(self):
+        agora = datetime.now()
+        minuto = agora.hour * 60 + agora.minute
+        if minuto == self._ultimo_minuto:
+            return
+        self._ultimo_minuto = minuto
+
+        hoje = date.today()
+        for site in set(self._assinantes.values()):
+            try:
+                grade = (await cache_monitor.obter_monitor_async(hoje, site, self._pool))["grade"]
+            except Exception:
+                continue
+            horario = inicio_de_slot(grade, minuto)
+            if horario:
+                self.publicar({"tipo": "troca_de_slot", "site": site, "data": hoje.isoformat(), "horario": horario})
+
+
+# Eventos em tempo real para os monitores (Server-Sent Events)
+async def monitor_eventos(request, intervalo_keepalive=15):
+    ouvinte = request.app.state.ouvinte
+    fila = ouvinte.assinar(request.query_params.get("site", SITE_PADRAO))
+
+    async def fluxo():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    evento = await asyncio.wait_for(fila.get(), intervalo_keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(evento, ensure_ascii=False)}\n\n"
+        finally:
+            ouvinte.cancelar(fila)
+
+    return StreamingResponse(
+        fluxo(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# Consultas pontuais: a mesma consulta de gestao_escala_criacao2._designacao_no_horario
+# ($1 site, $2 alvo, $3 véspera, $4 dia, $5 instante, $6 hora do instante)
+FILTROS_NO_HORARIO = {
+    "posto": "ed.posto_id = (SELECT id FROM postos WHERE nome = $2)",
+    "funcionario": "ed.funcionario_id = $2"
+}
+FAIXAS_NO_HORARIO = (
+    "e.data_escala = $4 AND ed.hora_inicio BETWEEN e.abertura AND $6",
+    "e.data_escala = $3 AND ed.hora_inicio < e.abertura AND ed.hora_inicio <= $6",
+    "e.data_escala = $3 AND ed.hora_inicio >= e.abertura",
+)
+
+
+async def _designacao_no_horario(pool, filtro, alvo, instante, site):
+    candidatos = " UNION ALL ".join(
+        f"""(SELECT ed.* FROM escala_detalhes ed
+            WHERE ed.escala_id = e.id AND {FILTROS_NO_HORARIO[filtro]} AND {faixa}
+            ORDER BY ed.hora_inicio DESC LIMIT 1)"""
+        for faixa in FAIXAS_NO_HORARIO
+    )
+    linha = await pool.fetchrow(f"""
+        SELECT e.data_escala, ed.hora_inicio, ed.hora_fim, p.nome AS posto,
+               f.id AS funcionario_id, COALESCE(f.nome, 'VAGO') AS funcionario
+        FROM escalas e
+        CROSS JOIN LATERAL ({candidatos}) ed
+        JOIN postos p ON p.id = ed.posto_id
+        LEFT JOIN funcionarios f ON f.id = ed.funcionario_id
+        CROSS JOIN LATERAL (
+            SELECT e.data_escala + ed.hora_inicio
+                + CASE WHEN ed.hora_inicio < e.abertura THEN INTERVAL '1 day' ELSE INTERVAL '0 days' END AS inicio
+        ) slot
+        WHERE e.site = $1 AND e.data_escala IN ($3, $4)
+          AND $5 < slot.inicio + (ed.hora_fim - ed.hora_inicio)
+                + CASE WHEN ed.hora_fim <= ed.hora_inicio THEN INTERVAL '1 day' ELSE INTERVAL '0 days' END
+        ORDER BY slot.inicio DESC, e.data_escala DESC
+        LIMIT 1
+    """, site, alvo, instante.date() - timedelta(days=1), instante.date(), instante, instante.time())
+    if linha is None:
+        return None
+    return {
+        "site": site,
+        "em": instante.isoformat(timespec="minutes"),
+        "data_escala": linha["data_escala"].isoformat(),
+        "horario": f"{linha['hora_inicio'].strftime('%H:%M')} - {linha['hora_fim'].strftime('%H:%M')}",
+        "posto": linha["posto"],
+        "funcionario_id": linha["funcionario_id"],
+        "funcionario": linha["funcionario"]
+    }
+
+
+async def _resposta_no_horario(request, filtro, alvo, mensagem_nao_encontrado):
+    try:
+        em = request.query_params.get("em")
+        instante = datetime.fromisoformat(em) if em else datetime.now()
+        resultado = await _designacao_no_horario(
+            request.app.state.pool, filtro, alvo, instante, request.query_params.get("site", SITE_PADRAO)
+        )
+        if resultado is None:
+            return JSONResponse({"mensagem": mensagem_nao_encontrado}, status_code=404)
+        return JSONResponse(resultado)
+    except ValueError:
+        return JSONResponse({"erro": "Instante inválido, use AAAA-MM-DDTHH:MM"}, status_code=400)
+    except Exception as e:
+        return _erro(e)
+
+
+# Quem está no posto X no instante T
+async def ocupante_do_posto(request):
+    return await _resposta_no_horario(
+        request, "posto", request.path_params["nome"], "Nenhuma escala para este posto neste horário"
+    )
+
+
+# Onde está o funcionário Y no instante T
+async def posto_do_funcionario(request):
+    return await _resposta_no_horario(
+        request, "funcionario", request.path_params["id"], "Funcionário sem posto neste horário"
+    )
+
+
+# Métricas de equilíbrio e cobertura gravadas junto do cabeçalho da escala
+async def metricas_escala(request):
+    try:
+        data_escala = date.fromisoformat(request.query_params.get("data", date.today().isoformat()))
+        site = request.query_params.get("site", SITE_PADRAO)
+        linha = await request.app.state.pool.fetchrow(
+            "SELECT id, metricas FROM escalas WHERE site = $1 AND data_escala = $2", site, data_escala
+        )
+        if linha is None:
+            return JSONResponse({"mensagem": "Escala não encontrada"}, status_code=404)
+        return JSONResponse({
+            "escala_id": linha["id"],
+            "site": site,
+            "data": data_escala.isoformat(),
+            "metricas": linha["metricas"]
+        })
+    except ValueError:
+        return JSONResponse({"erro": "Data inválida, use AAAA-MM-DD"}, status_code=400)
+    except Exception as e:
+        return _erro(e)
+
+
+# 9. MONITORAMENTO DO POOL DE CONEXÕES
+_pool = None  # pool do processo, para os medidores do /metrics
+
+
+def estatisticas_pool_async():
+    if _pool is None:
+        return {"tamanho": 0, "em_uso": 0, "livres": 0, "max": 0}
+    tamanho = _pool.get_size()
+    livres = _pool.get_idle_size()
+    return {"tamanho": tamanho, "em_uso": tamanho - livres, "livres": livres, "max": _pool.get_max_size()}
+
+
+async def pool(request):
+    return JSONResponse(estatisticas_pool_async())
+
+
+# 10. MÉTRICAS (formato Prometheus)
+Medidor("escala_pool_conexoes_em_uso", "Conexões do pool emprestadas.", lambda: estatisticas_pool_async()["em_uso"])
+Medidor("escala_pool_conexoes_livres", "Conexões do pool disponíveis.", lambda: estatisticas_pool_async()["livres"])
+
+
+async def metrics(request):
+    return Response(exportar_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    global _pool
+    _pool = app.state.pool = await criar_pool_async()
+    app.state.ouvinte = OuvinteEscalasAsync(_pool)
+    app.state.ouvinte.iniciar()
+    try:
+        yield
+    finally:
+        await app.state.ouvinte.parar()
+        await _pool.close()
+        _pool = None
+
+
+rotas = [
+    Route("/funcionarios", criar, methods=["POST"]),
+    Route("/funcionarioID", criar_com_id, methods=["POST"]),
+    Route("/funcionarios", ler_todos, methods=["GET"]),
+    Route("/funcionarios/{id:int}", ler_um, methods=["GET"]),
+    Route("/funcionarios/{id:int}", atualizar, methods=["PUT"]),
+    Route("/funcionarios/{id:int}", deletar, methods=["DELETE"]),
+    Route("/monitor", monitor, methods=["GET"]),
+    Route("/monitor.json", monitor_json, methods=["GET"]),
+    Route("/monitor/eventos", monitor_eventos, methods=["GET"]),
+    Route("/postos/{nome}/ocupante", ocupante_do_posto, methods=["GET"]),
+    Route("/funcionarios/{id:int}/posto", posto_do_funcionario, methods=["GET"]),
+    Route("/escalas/metricas", metricas_escala, methods=["GET"]),
+    Route("/pool", pool, methods=["GET"]),
+    Route("/metrics", metrics, methods=["GET"]),
+]
+
+app = MedicaoASGI(Starlette(routes=rotas, lifespan=ciclo_de_vida))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8000)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.porta)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import heapq
+
+
+def atribuicao_custo_minimo(custos):
+    """
+    Resolve o problema de atribuição (algoritmo húngaro, versão com caminhos
+    aumentantes mais curtos) para uma matriz retangular de custos.
+
+    :param custos: Lista de linhas (postos) com o custo de cada coluna (funcionário).
+                   Deve haver no máximo tantas linhas quanto colunas.
+    :return: Lista com a coluna escolhida para cada linha, minimizando a soma dos custos.
+    """
+    n = len(custos)
+    if n == 0:
+        return []
+    m = len(custos[0])
+    if n > m:
+        raise ValueError("A matriz de custos precisa ter pelo menos tantas colunas quanto linhas.")
+
+    infinito = float("inf")
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    dono = [0] * (m + 1)      # dono[j] = linha atribuída à coluna j (1-indexado, 0 = livre)
+    caminho = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        dono[0] = i
+        j0 = 0
+        minimo = [infinito] * (m + 1)
+        usado = [False] * (m + 1)
+
+        # Procura o caminho aumentante mais curto a partir da linha i
+        while True:
+            usado[j0] = True
+            i0 = dono[j0]
+            linha = custos[i0 - 1]
+            u_i0 = u[i0]
+            delta = infinito
+            j1 = 0
+            for j in range(1, m + 1):
+                if not usado[j]:
+                    atual = linha[j - 1] - u_i0 - v[j]
+                    if atual < minimo[j]:
+                        minimo[j] = atual
+                        caminho[j] = j0
+                    if minimo[j] < delta:
+                        delta = minimo[j]
+                        j1 = j
+            for j in range(m + 1):
+                if usado[j]:
+                    u[dono[j]] += delta
+                    v[j] -= delta
+                else:
+                    minimo[j] -= delta
+            j0 = j1
+            if dono[j0] == 0:
+                break
+
+        # Inverte o caminho encontrado
+        while True:
+            j1 = caminho[j0]
+            dono[j0] = dono[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    resultado = [0] * n
+    for j in range(1, m + 1):
+        if dono[j]:
+            resultado[dono[j] - 1] = j - 1
+    return resultado
+
+
+def atribuir_postos_prioritarios(candidatos, num_postos, custo):
+    """
+    Escolhe um funcionário distinto para cada posto prioritário com custo total mínimo.
+
+    Em uma atribuição ótima, cada posto recebe alguém entre os ``num_postos``
+    funcionários mais baratos para ele (os outros postos ocupam no máximo
+    ``num_postos - 1`` deles). Por isso a matriz resolvida tem no máximo
+    ``num_postos²`` colunas, não importa o tamanho do efetivo.
+
+    :param candidatos: IDs dos funcionários em serviço.
+    :param num_postos: Quantidade de postos prioritários a preencher.
+    :param custo: Função custo(func_id, indice_posto).
+    :return: Lista com o ID escolhido para cada posto (ou None se faltar gente).
+    """
+    candidatos = list(candidatos)
+    if len(candidatos) < num_postos:
+        # Faltam funcionários: preenche os postos na ordem, os últimos ficam vagos
+        num_postos_preenchidos = len(candidatos)
+    else:
+        num_postos_preenchidos = num_postos
+    if num_postos_preenchidos == 0:
+        return [None] * num_postos
+
+    reduzidos = {}
+    for indice_posto in range(num_postos_preenchidos):
+        mais_baratos = heapq.nsmallest(
+            num_postos_preenchidos, candidatos, key=lambda func_id: custo(func_id, indice_posto)
+        )
+        for func_id in mais_baratos:
+            reduzidos.setdefault(func_id, None)
+    colunas = list(reduzidos)
+
+    custos = [
+        [custo(func_id, indice_posto) for func_id in colunas]
+        for indice_posto in range(num_postos_preenchidos)
+    ]
+    escolhidos = [colunas[j] for j in atribuicao_custo_minimo(custos)]
+    return escolhidos + [None] * (num_postos - num_postos_preenchidos)
@@ -0,0 +1,229 @@
+"""
+Benchmark da API: Flask (gestao_escala_criacao2, servidor com threads) contra a
+versão assíncrona (api_assincrona, uvicorn + asyncpg) na mesma máquina.
+
+Sobe os dois servidores, roda cada cenário com N clientes simultâneos (conexões
+keep-alive, uma thread por cliente) e mede requisições por segundo e latência:
+- monitor: telas pedindo /monitor.json com If-None-Match e consultas pontuais
+  "onde está o funcionário" (/funcionarios/<id>/posto);
+- crud: leitura de um funcionário, página de /funcionarios e PUT em um
+  funcionário de teste por cliente (criados e removidos pelo benchmark).
+Com --telas, mantém também essa quantidade de telas conectadas em
+/monitor/eventos (SSE) durante as medições, como nos monitores reais.
+
+Uso: python benchmark_api.py [--clientes 50] [--duracao 10] [--telas 0] [--cenario monitor]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time as relogio
+from datetime import date
+from urllib.parse import urlencode
+
+PREFIXO = "Benchmark API"
+CENARIOS = ("monitor", "crud")
+SERVIDORES = {
+    "flask": "from gestao_escala_criacao2 import app; app.run(host='127.0.0.1', port={porta}, threaded=True)",
+    "asgi": "import uvicorn; uvicorn.run('api_assincrona:app', host='127.0.0.1', port={porta}, log_level='warning')",
+}
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(nome, porta, espera=30):
+    """Sobe o servidor em outro processo e espera ele responder."""
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    processo = subprocess.Popen(
+        [sys.executable, "-c", SERVIDORES[nome].format(porta=porta)],
+        cwd=pasta, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    limite = relogio.monotonic() + espera
+    while relogio.monotonic() < limite:
+        try:
+            status, _, _ = Cliente(porta).pedir("GET", "/funcionarios?limit=1")
+            if status == 200:
+                return processo
+        except OSError:
+            pass
+        relogio.sleep(0.2)
+    processo.kill()
+    raise RuntimeError(f"O servidor {nome} não respondeu em {espera} s.")
+
+
+class Cliente:
+    """Uma conexão HTTP keep-alive (reabre sozinha se o servidor fechar)."""
+
+    def __init__(self, porta):
+        self.conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=30)
+
+    def pedir(self, metodo, caminho, formulario=None, cabecalhos=None):
+        cabecalhos = dict(cabecalhos or {})
+        corpo = None
+        if formulario is not None:
+            corpo = urlencode(formulario)
+            cabecalhos["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            self.conexao.request(metodo, caminho, corpo, cabecalhos)
+            resposta = self.conexao.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            self.conexao.close()  # conexão velha fechada pelo servidor: tenta de novo
+            self.conexao.request(metodo, caminho, corpo, cabecalhos)
+            resposta = self.conexao.getresponse()
+        return resposta.status, resposta.read(), resposta.getheader("ETag")
+
+
+def abrir_telas(porta, quantidade):
+    """Conexões SSE ociosas (monitores ligados), abertas em paralelo ao teste."""
+    telas = []
+    for _ in range(quantidade):
+        tela = socket.create_connection(("127.0.0.1", porta), timeout=30)
+        tela.sendall(b"GET /monitor/eventos HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n")
+        tela.recv(1024)  # cabeçalho + "retry:"
+        telas.append(tela)
+    return telas
+
+
+def preparar(porta, clientes):
+    """IDs existentes para as leituras e um funcionário de teste por cliente."""
+    cliente = Cliente(porta)
+    _, corpo, _ = cliente.pedir("GET", "/funcionarios?fields=id&limit=1000")
+    ids = [linha["id"] for linha in json.loads(corpo)]
+    proprios = []
+    for i in range(clientes):
+        _, corpo, _ = cliente.pedir("POST", "/funcionarioID", {
+            "nome": f"{PREFIXO} {i}", "horario_inicio": "08:00", "horario_fim": "17:00"
+        })
+        proprios.append(json.loads(corpo)["id"])
+    return ids, proprios
+
+
+def limpar(porta, proprios):
+    cliente = Cliente(porta)
+    for id in proprios:
+        cliente.pedir("DELETE", f"/funcionarios/{id}")
+
+
+def _passos_monitor(indice, ids, proprios, data_escala):
+    etag = None
+    def passos(cliente):
+        nonlocal etag
+        status, _, novo = cliente.pedir(
+            "GET", f"/monitor.json?data={data_escala}", cabecalhos={"If-None-Match": etag} if etag else None
+        )
+        etag = novo or etag
+        yield status
+        yield cliente.pedir("GET", f"/funcionarios/{ids[indice % len(ids)]}/posto?em={data_escala}T10:00")[0]
+    return passos
+
+
+def _passos_crud(indice, ids, proprios, data_escala):
+    proprio = proprios[indice]
+    contador = 0
+    def passos(cliente):
+        nonlocal contador
+        contador += 1
+        yield cliente.pedir("GET", f"/funcionarios/{ids[(indice + contador) % len(ids)]}")[0]
+        yield cliente.pedir("GET", "/funcionarios?fields=id,nome&limit=50")[0]
+        yield cliente.pedir("PUT", f"/funcionarios/{proprio}", {
+            "nome": f"{PREFIXO} {indice}", "horario_inicio": f"{8 + contador % 4:02d}:00", "horario_fim": "17:00"
+        })[0]
+    return passos
+
+
+PASSOS = {"monitor": _passos_monitor, "crud": _passos_crud}
+
+
+def rodar_cenario(porta, cenario, clientes, duracao, ids, proprios, data_escala):
+    """Cada cliente repete os passos do cenário até o fim do tempo; mede cada requisição."""
+    latencias = [[] for _ in range(clientes)]
+    erros = [0] * clientes
+    fim = relogio.monotonic() + duracao
+    largada = threading.Barrier(clientes + 1)
+
+    def trabalhar(indice):
+        cliente = Cliente(porta)
+        passos = PASSOS[cenario](indice, ids, proprios, data_escala)
+        largada.wait()
+        while relogio.monotonic() < fim:
+            inicio = relogio.perf_counter()
+            for status in passos(cliente):
+                agora = relogio.perf_counter()
+                latencias[indice].append(agora - inicio)
+                if status >= 500:
+                    erros[indice] += 1
+                inicio = agora
+
+    threads = [threading.Thread(target=trabalhar, args=(i,), daemon=True) for i in range(clientes)]
+    for thread in threads:
+        thread.start()
+    largada.wait()
+    inicio = relogio.perf_counter()
+    for thread in threads:
+        thread.join()
+    tempo = relogio.perf_counter() - inicio
+
+    todas = sorted(l for lista in latencias for l in lista)
+    percentil = lambda p: todas[min(len(todas) - 1, int(p * len(todas)))] * 1000 if todas else 0.0
+    return {
+        "requisicoes": len(todas),
+        "por_segundo": len(todas) / tempo,
+        "p50_ms": percentil(0.50),
+        "p95_ms": percentil(0.95),
+        "p99_ms": percentil(0.99),
+        "media_ms": statistics.fmean(todas) * 1000 if todas else 0.0,
+        "erros": sum(erros),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--duracao", type=float, default=10, help="Segundos por cenário")
+    parser.add_argument("--telas", type=int, default=0, help="Conexões SSE abertas durante o teste")
+    parser.add_argument("--cenario", action="append", choices=CENARIOS, help="Pode repetir; padrão: todos")
+    parser.add_argument("--servidor", action="append", choices=tuple(SERVIDORES), help="Padrão: os dois")
+    parser.add_argument("--data", default=date.today().isoformat(), help="Escala usada no monitor")
+    args = parser.parse_args()
+
+    resultados = {}
+    for nome in args.servidor or SERVIDORES:
+        porta = _porta_livre()
+        processo = iniciar_servidor(nome, porta)
+        telas = []
+        proprios = []
+        try:
+            ids, proprios = preparar(porta, args.clientes)
+            telas = abrir_telas(porta, args.telas)
+            for cenario in args.cenario or CENARIOS:
+                resultado = rodar_cenario(porta, cenario, args.clientes, args.duracao, ids, proprios, args.data)
+                resultados[(nome, cenario)] = resultado
+                print(
+                    f"{nome:<6} {cenario:<8} | {resultado['por_segundo']:8.0f} req/s"
+                    f" | p50 {resultado['p50_ms']:7.1f} ms | p95 {resultado['p95_ms']:7.1f} ms"
+                    f" | p99 {resultado['p99_ms']:7.1f} ms | erros {resultado['erros']}"
+                )
+        finally:
+            for tela in telas:
+                tela.close()
+            limpar(porta, proprios)
+            processo.terminate()
+            processo.wait()
+
+    for cenario in args.cenario or CENARIOS:
+        if ("flask", cenario) in resultados and ("asgi", cenario) in resultados:
+            ganho = resultados[("asgi", cenario)]["por_segundo"] / resultados[("flask", cenario)]["por_segundo"]
+            print(f"{cenario}: asgi/flask = {ganho:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Benchmark dos geradores de escala com efetivos sintéticos.
+
+Mede tempo e pico de memória de gerar_escala_balanceada (em cada modo) para
+vários tamanhos de efetivo, postos e intervalos, e opcionalmente a gravação
+no banco e gerar_escala_do_dia. O relatório sai em JSON para comparação
+entre versões: com --comparar, termina com erro se algum caso ficar mais lento
+que a tolerância.
+
+Uso:
+  python benchmark_escalas.py --saida base.json
+  python benchmark_escalas.py --saida atual.json --comparar base.json --tolerancia 0.25
+  python benchmark_escalas.py --banco   # inclui gravação e gerar_escala_do_dia (banco já migrado)
+"""
+import argparse
+import contextlib
+import json
+import platform
+import random
+import statistics
+import sys
+import time as relogio
+import tracemalloc
+from datetime import datetime
+
+from escala_com_dicionarios2 import MODOS_GERACAO, gerar_escala_balanceada
+
+# (funcionários, postos de rodízio, postos fixos, intervalo em minutos)
+CASOS_PADRAO = [
+    (12, 7, 1, 30),
+    (50, 10, 2, 30),
+    (200, 30, 4, 60),
+    (500, 50, 5, 30),
+    (500, 50, 5, 5),
+]
+
+# Restrições do modo "restricoes" no benchmark (o tempo limite fixa o custo da busca local)
+RESTRICOES_BENCHMARK = {"max_consecutivos": 4, "pausa_apos": 8, "duracao_pausa": 1, "tempo_limite": 0.1}
+
+
+def _hora(minutos):
+    return f"{(minutos // 60) % 24:02d}:{minutos % 60:02d}"
+
+
+def gerar_roster(num_funcionarios, num_postos, num_fixos, intervalo_minutos, semente=0):
+    """
+    Efetivo sintético com turnos escalonados: entradas em múltiplos do intervalo
+    ao longo das primeiras horas, turnos de 6 a 12 horas, dois postos de prioridade.
+    Retorna os argumentos de gerar_escala_balanceada.
+    """
+    rng = random.Random(semente)
+    inicio, fim = 6 * 60, 23 * 60 + 30
+    postos_rodizio = {f"Posto {i}": "" for i in range(num_postos)}
+    postos_fixos = {f"Fixo {i}": f"Fixo Func {i}" for i in range(num_fixos)}
+
+    agenda = {}
+    passos = max(1, (8 * 60) // intervalo_minutos)
+    for i in range(num_funcionarios):
+        entrada = inicio + rng.randrange(passos) * intervalo_minutos
+        saida = min(entrada + rng.choice((6, 8, 10, 12)) * 60, 23 * 60 + 59)
+        agenda[f"Func {i}"] = (_hora(entrada), _hora(saida))
+    for nome in postos_fixos.values():
+        agenda[nome] = (_hora(inicio), _hora(fim))
+
+    return (
+        _hora(inicio), _hora(fim), intervalo_minutos, postos_rodizio, postos_fixos,
+        agenda, ["Posto 0", "Posto 3"], 3
+    )
+
+
+def medir(funcao, repeticoes):
+    """Executa funcao() `repeticoes` vezes; devolve mediana, mínimo (s) e pico de memória (bytes)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = relogio.perf_counter()
+        funcao()
+        tempos.append(relogio.perf_counter() - inicio)
+
+    # Memória medida em uma execução separada: o tracemalloc deixa o código mais lento
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"mediana_s": statistics.median(tempos), "minimo_s": min(tempos), "pico_memoria_bytes": pico}
+
+
+def benchmark_geradores(casos, repeticoes):
+    resultados = []
+    for num_funcionarios, num_postos, num_fixos, intervalo in casos:
+        args = gerar_roster(num_funcionarios, num_postos, num_fixos, intervalo)
+        for modo in MODOS_GERACAO:
+            restricoes = RESTRICOES_BENCHMARK if modo == "restricoes" else None
+            medida = medir(lambda: gerar_escala_balanceada(*args, modo=modo, restricoes=restricoes, usar_cache=False), repeticoes)
+            resultados.append(dict(
+                medida,
+                nome=f"balanceada/{modo}/{num_funcionarios}f-{num_postos}p-{intervalo}min",
+                funcionarios=num_funcionarios, postos=num_postos, fixos=num_fixos, intervalo=intervalo
+            ))
+            _imprimir(resultados[-1])
+    return resultados
+
+
+def benchmark_banco(repeticoes):
+    """
+    Gravação (values x copy) e gerar_escala_do_dia, em datas de 2099 que são apagadas no fim.
+    O banco já deve estar migrado (python gestao_escala.py migrar); senão, encerra com uma mensagem.
+    """
+    from datetime import timedelta
+
+    import benchmark_persistencia as bp
+    from gestao_escala import exigir_banco_migrado, gerar_escala_do_dia, get_db_connection
+    from persistencia_escala import salvar_escala
+
+    conn = get_db_connection()
+    if not conn:
+        return []
+    exigir_banco_migrado(conn)
+    resultados = []
+    datas = [bp.DATA_BASE + timedelta(days=i) for i in range(repeticoes + 1)]
+    try:
+        postos_ids, funcionarios_ids = bp.preparar_cadastros(conn, 8, 12)
+        detalhes = bp.gerar_detalhes(postos_ids, funcionarios_ids, 30, 0)
+        for metodo in ("values", "copy"):
+            proxima = iter(datas)
+            bp.limpar(conn, datas)
+            medida = medir(lambda: salvar_escala(conn, next(proxima), detalhes, metodo=metodo), repeticoes)
+            bp.limpar(conn, datas)
+            resultados.append(dict(medida, nome=f"persistencia/{metodo}/{len(detalhes)}linhas", linhas=len(detalhes)))
+            _imprimir(resultados[-1])
+
+        def gerar_do_dia():
+            # gerar_escala_do_dia imprime o relatório; desvia para stderr
+            with contextlib.redirect_stdout(sys.stderr):
+                gerar_escala_do_dia(next(proxima))
+
+        proxima = iter(datas)
+        medida = medir(gerar_do_dia, repeticoes)
+        bp.limpar(conn, datas)
+        resultados.append(dict(medida, nome="do_dia/banco"))
+        _imprimir(resultados[-1])
+    finally:
+        bp.limpar(conn, datas)
+        bp.limpar_cadastros(conn)
+        conn.close()
+    return resultados
+
+
+def comparar(resultados, arquivo_base, tolerancia):
+    """Lista os casos que ficaram mais lentos que a base além da tolerância (0.25 = 25%)."""
+    with open(arquivo_base, encoding="utf-8") as arquivo:
+        base = {r["nome"]: r for r in json.load(arquivo)["resultados"]}
+    regressoes = []
+    for resultado in resultados:
+        anterior = base.get(resultado["nome"])
+        if anterior and resultado["mediana_s"] > anterior["mediana_s"] * (1 + tolerancia):
+            regressoes.append({
+                "nome": resultado["nome"],
+                "antes_s": anterior["mediana_s"],
+                "depois_s": resultado["mediana_s"]
+            })
+    return regressoes
+
+
+def _imprimir(resultado):
+    print(
+        f"{resultado['nome']:<42} | {resultado['mediana_s'] * 1000:9.2f} ms"
+        f" | pico {resultado['pico_memoria_bytes'] / 1024:9.1f} KiB",
+        file=sys.stderr
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--caso", action="append", metavar="F,P,X,I",
+                        help="funcionários,postos,fixos,intervalo (pode repetir; padrão: CASOS_PADRAO)")
+    parser.add_argument("--banco", action="store_true", help="Inclui gravação e gerar_escala_do_dia")
+    parser.add_argument("--saida", default="benchmark_escalas.json", help="Arquivo JSON do relatório")
+    parser.add_argument("--comparar", help="Relatório JSON anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args()
+
+    casos = [tuple(int(v) for v in caso.split(",")) for caso in args.caso] if args.caso else CASOS_PADRAO
+
+    if args.banco:
+        # Antes de medir os geradores: sem o banco migrado a parte de banco não roda
+        from gestao_escala import exigir_banco_migrado, get_db_connection
+        conn = get_db_connection()
+        if conn:
+            try:
+                exigir_banco_migrado(conn)
+            finally:
+                conn.close()
+
+    resultados = benchmark_geradores(casos, args.repeticoes)
+    if args.banco:
+        resultados += benchmark_banco(args.repeticoes)
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticoes": args.repeticoes,
+        "resultados": resultados
+    }
+    if args.comparar:
+        relatorio["regressoes"] = comparar(resultados, args.comparar, args.tolerancia)
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Relatório salvo em {args.saida}", file=sys.stderr)
+
+    if relatorio.get("regressoes"):
+        for regressao in relatorio["regressoes"]:
+            print(f"REGRESSÃO: {regressao['nome']} {regressao['antes_s']:.4f}s -> {regressao['depois_s']:.4f}s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
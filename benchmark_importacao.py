@@ -0,0 +1,81 @@
+"""
+Orçamento de tempo de importação dos pontos de entrada (CLI e workers).
+
+Cada módulo é importado em um interpretador novo (vale o menor de N tempos,
+sem contar a partida do Python) e não pode carregar as dependências listadas
+como proibidas: o gerador e os workers do lote são biblioteca pura, e as
+ferramentas de linha de comando só abrem banco/web quando usadas. Termina com
+erro se algum módulo estourar o orçamento ou importar o que não deve.
+
+Uso: python benchmark_importacao.py [--repeticoes 5] [--folga 1.0]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PESADOS = ("flask", "flask_sqlalchemy", "sqlalchemy", "psycopg2")
+
+# módulo -> (orçamento em ms, dependências que não podem ser carregadas)
+ORCAMENTOS = {
+    "escala_com_dicionarios2": (60, PESADOS),          # gerador
+    "lote_escalas": (80, PESADOS),                     # workers do pool de processos
+    "instrumentacao": (40, PESADOS),
+    "exportacao_escalas": (60, PESADOS),               # CLI
+    "benchmark_escalas": (120, PESADOS),               # CLI
+    "gestao_escala": (250, ("flask", "flask_sqlalchemy", "sqlalchemy")),  # CLI (migrar/gerar/ler)
+    "gestao_escala_criacao2": (1500, ()),              # API: Flask e SQLAlchemy são o ponto
+    "api_assincrona": (1500, PESADOS),                 # API ASGI (asyncpg)
+}
+
+_MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps([duracao, [m for m in {proibidos!r} if m in sys.modules]]))
+"""
+
+
+def medir_importacao(modulo, proibidos, repeticoes):
+    """Menor tempo de importação (s) em `repeticoes` processos e as dependências proibidas carregadas."""
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    tempos = []
+    carregados = set()
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", _MEDICAO.format(modulo=modulo, proibidos=tuple(proibidos))],
+            cwd=pasta, capture_output=True, text=True, check=True
+        ).stdout
+        duracao, presentes = json.loads(saida.strip().splitlines()[-1])
+        tempos.append(duracao)
+        carregados.update(presentes)
+    return min(tempos), sorted(carregados)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--folga", type=float, default=1.0, help="Multiplica os orçamentos (máquinas lentas)")
+    args = parser.parse_args()
+
+    falhas = []
+    for modulo, (orcamento_ms, proibidos) in ORCAMENTOS.items():
+        duracao, carregados = medir_importacao(modulo, proibidos, args.repeticoes)
+        limite_ms = orcamento_ms * args.folga
+        situacao = "ok"
+        if duracao * 1000 > limite_ms:
+            situacao = "ESTOUROU"
+            falhas.append(modulo)
+        if carregados:
+            situacao = f"IMPORTOU {', '.join(carregados)}"
+            falhas.append(modulo)
+        print(f"{modulo:<26} | {duracao * 1000:8.1f} ms | orçamento {limite_ms:7.0f} ms | {situacao}")
+
+    if falhas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
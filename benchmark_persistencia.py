@@ -0,0 +1,134 @@
+"""
+Benchmark da gravação de escalas: um INSERT por linha (como era feito) contra
+execute_values e COPY FROM STDIN em uma única transação.
+
+Simula um mês de escalas com slots de rodízio e mede linhas por segundo.
+O banco já deve estar migrado (python gestao_escala.py migrar).
+Uso: python benchmark_persistencia.py [--dias 30] [--postos 8] [--intervalo 30]
+"""
+import argparse
+import time as relogio
+from datetime import date, timedelta
+
+from gestao_escala import exigir_banco_migrado, get_db_connection
+from persistencia_escala import atualizar_resumo_postos, salvar_escala
+
+PREFIXO = "Benchmark"
+DATA_BASE = date(2099, 1, 1)
+
+
+def salvar_linha_a_linha(conn, data_escala, detalhes):
+    """Caminho antigo: um round trip por detalhe da escala."""
+    cur = conn.cursor()
+    cur.execute("INSERT INTO escalas (data_escala) VALUES (%s) RETURNING id", (data_escala,))
+    escala_id = cur.fetchone()[0]
+    for posto_id, funcionario_id, hora_inicio, hora_fim in detalhes:
+        cur.execute("""
+            INSERT INTO escala_detalhes (escala_id, posto_id, funcionario_id, hora_inicio, hora_fim)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (escala_id, posto_id, funcionario_id, hora_inicio, hora_fim))
+    atualizar_resumo_postos(cur, data_escala, detalhes)
+    conn.commit()
+    cur.close()
+    return escala_id
+
+
+def preparar_cadastros(conn, num_postos, num_funcionarios):
+    """Cria postos e funcionários sintéticos e devolve seus IDs."""
+    cur = conn.cursor()
+    postos_ids = []
+    for i in range(num_postos):
+        cur.execute("""
+            INSERT INTO postos (nome, prioridade) VALUES (%s, %s)
+            ON CONFLICT (nome) DO UPDATE SET nome = EXCLUDED.nome
+            RETURNING id
+        """, (f"{PREFIXO} Posto {i}", 1 if i < 2 else 2))
+        postos_ids.append(cur.fetchone()[0])
+    funcionarios_ids = []
+    for i in range(num_funcionarios):
+        cur.execute("""
+            INSERT INTO funcionarios (nome, horario_inicio, horario_fim)
+            VALUES (%s, '00:00', '23:59') RETURNING id
+        """, (f"{PREFIXO} Func {i}",))
+        funcionarios_ids.append(cur.fetchone()[0])
+    conn.commit()
+    cur.close()
+    return postos_ids, funcionarios_ids
+
+
+def gerar_detalhes(postos_ids, funcionarios_ids, intervalo_minutos, deslocamento):
+    """Um dia inteiro de slots, com o rodízio andando uma posição por slot."""
+    detalhes = []
+    for slot, inicio in enumerate(range(0, 24 * 60, intervalo_minutos)):
+        fim = min(inicio + intervalo_minutos, 24 * 60 - 1)
+        hora_inicio = f"{inicio // 60:02d}:{inicio % 60:02d}"
+        hora_fim = f"{fim // 60:02d}:{fim % 60:02d}"
+        for posicao, posto_id in enumerate(postos_ids):
+            funcionario_id = funcionarios_ids[(posicao + slot + deslocamento) % len(funcionarios_ids)]
+            detalhes.append((posto_id, funcionario_id, hora_inicio, hora_fim))
+    return detalhes
+
+
+def limpar(conn, datas):
+    cur = conn.cursor()
+    cur.execute("DELETE FROM escala_detalhes WHERE escala_id IN (SELECT id FROM escalas WHERE data_escala = ANY(%s))", (datas,))
+    cur.execute("DELETE FROM resumo_postos_dia WHERE data_escala = ANY(%s)", (datas,))
+    cur.execute("DELETE FROM escalas WHERE data_escala = ANY(%s)", (datas,))
+    conn.commit()
+    cur.close()
+
+
+def limpar_cadastros(conn):
+    cur = conn.cursor()
+    cur.execute("DELETE FROM funcionarios WHERE nome LIKE %s", (f"{PREFIXO} %",))
+    cur.execute("DELETE FROM postos WHERE nome LIKE %s", (f"{PREFIXO} %",))
+    conn.commit()
+    cur.close()
+
+
+def medir(nome, gravar, conn, dias, postos_ids, funcionarios_ids, intervalo_minutos):
+    datas = [DATA_BASE + timedelta(days=i) for i in range(dias)]
+    limpar(conn, datas)
+    meses = [gerar_detalhes(postos_ids, funcionarios_ids, intervalo_minutos, i) for i in range(dias)]
+    total_linhas = sum(len(detalhes) for detalhes in meses)
+
+    inicio = relogio.perf_counter()
+    for data_escala, detalhes in zip(datas, meses):
+        gravar(conn, data_escala, detalhes)
+    duracao = relogio.perf_counter() - inicio
+
+    limpar(conn, datas)
+    print(f"{nome:<16} | {total_linhas:>8} linhas | {duracao:8.3f} s | {total_linhas / duracao:>10.0f} linhas/s")
+    return total_linhas / duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--postos", type=int, default=8)
+    parser.add_argument("--funcionarios", type=int, default=12)
+    parser.add_argument("--intervalo", type=int, default=30)
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    if not conn:
+        return
+    exigir_banco_migrado(conn)
+
+    try:
+        postos_ids, funcionarios_ids = preparar_cadastros(conn, args.postos, args.funcionarios)
+        print(f"\n--- Gravando {args.dias} dias, {args.postos} postos, slots de {args.intervalo} min ---")
+        antes = medir("linha a linha", salvar_linha_a_linha, conn, args.dias, postos_ids, funcionarios_ids, args.intervalo)
+        depois = medir("execute_values", salvar_escala, conn, args.dias, postos_ids, funcionarios_ids, args.intervalo)
+        copy = medir(
+            "COPY", lambda c, d, det: salvar_escala(c, d, det, metodo="copy"),
+            conn, args.dias, postos_ids, funcionarios_ids, args.intervalo
+        )
+        print(f"\nGanho: execute_values {depois / antes:.1f}x, COPY {copy / antes:.1f}x")
+    finally:
+        limpar_cadastros(conn)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
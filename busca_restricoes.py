@@ -0,0 +1,300 @@
+"""
+Modo "restricoes" do gerador: busca local com restrições declarativas.
+
+1. Construção gulosa slot a slot, na ordem da fila de rodízio, pulando quem
+   violaria alguma restrição (as verificações olham só a vizinhança do slot).
+2. Melhoria por busca local (trocas de funcionários dentro de um slot), até
+   acabar o tempo ou parar de melhorar. Só movimentos válidos são aceitos e
+   nunca se aceita piora, então a solução atual é sempre a melhor encontrada.
+"""
+import random
+import time as relogio
+from collections import deque
+
+RESTRICOES_PADRAO = {
+    "max_consecutivos": None,   # slots seguidos no mesmo posto: int (todos) ou {posto: int}
+    "pausa_apos": None,         # slots seguidos trabalhando que exigem uma pausa
+    "duracao_pausa": 1,         # slots da pausa obrigatória
+    "postos_proibidos": {},     # {funcionário: [postos que ele não pode ocupar]}
+    "tempo_limite": 1.0,        # segundos para a busca local
+    "semente": 0,
+}
+
+# Pesos do custo (menor é melhor), em ordem de importância
+PESO_VAGO = 10 ** 9
+PESO_FALTA_MINIMO = 10 ** 4
+PESO_SOMA = 10
+
+LIVRE = -1
+
+
+def normalizar_restricoes(restricoes, ordem_postos_rodizio, nomes_rodizio):
+    """Valida as restrições (por nome) e as converte para índices de coluna e IDs."""
+    restricoes = dict(RESTRICOES_PADRAO, **(restricoes or {}))
+    desconhecidas = set(restricoes) - set(RESTRICOES_PADRAO)
+    if desconhecidas:
+        raise ValueError(f"Restrições desconhecidas: {', '.join(sorted(desconhecidas))}")
+
+    def coluna(posto):
+        if posto not in ordem_postos_rodizio:
+            raise ValueError(f"Posto fora do rodízio nas restrições: {posto!r}")
+        return ordem_postos_rodizio.index(posto)
+
+    max_consecutivos = restricoes["max_consecutivos"]
+    if isinstance(max_consecutivos, dict):
+        limites = [None] * len(ordem_postos_rodizio)
+        for posto, limite in max_consecutivos.items():
+            limites[coluna(posto)] = limite
+    else:
+        limites = [max_consecutivos] * len(ordem_postos_rodizio)
+
+    ids = {nome: func_id for func_id, nome in enumerate(nomes_rodizio)}
+    proibidos = [frozenset() for _ in nomes_rodizio]
+    for nome, postos in restricoes["postos_proibidos"].items():
+        if nome in ids:  # quem não está na agenda do dia é ignorado
+            proibidos[ids[nome]] = frozenset(coluna(posto) for posto in postos)
+
+    if restricoes["pausa_apos"] is not None and restricoes["pausa_apos"] < 1:
+        raise ValueError("pausa_apos deve ser pelo menos 1.")
+    return dict(restricoes, limites=limites, proibidos=proibidos)
+
+
+class _Solucao:
+    """Estado da busca: quem está em cada posto de cada slot, e o inverso por funcionário."""
+
+    def __init__(self, plano, min_passagens, restricoes):
+        self.num_slots = plano["num_slots"]
+        self.num_postos = len(plano["ordem_postos_rodizio"])
+        self.min_passagens = min_passagens
+        self.limites = restricoes["limites"]
+        self.proibidos = restricoes["proibidos"]
+        self.pausa_apos = restricoes["pausa_apos"]
+        self.duracao_pausa = restricoes["duracao_pausa"]
+
+        num_funcionarios = len(plano["nomes_rodizio"])
+        # Índice de prioridade de cada coluna (None para postos normais)
+        self.prioridade_da_coluna = [None] * self.num_postos
+        for posicao, indice_posto in plano["posicoes_prioridade"]:
+            self.prioridade_da_coluna[posicao] = indice_posto
+
+        # Presença: [entrada, saída) em slots; só entra quem está alinhado à grade
+        self.entrada = [None] * num_funcionarios
+        for slot, entradas in enumerate(plano["entradas_por_slot"]):
+            for func_id in entradas:
+                self.entrada[func_id] = slot
+        self.saida = plano["slot_saida_funcionario"]
+        self.em_servico = [[] for _ in range(self.num_slots)]
+        for func_id, slot_entrada in enumerate(self.entrada):
+            if slot_entrada is not None:
+                for slot in range(slot_entrada, self.saida[func_id]):
+                    self.em_servico[slot].append(func_id)
+
+        self.atribuicao = [[None] * self.num_postos for _ in range(self.num_slots)]
+        self.posto_de = [[LIVRE] * self.num_slots for _ in range(num_funcionarios)]
+        self.historico = [[0] * len(plano["prioridades"]) for _ in range(num_funcionarios)]
+        self.soma = [0] * num_funcionarios
+        self.vagos = self.num_slots * self.num_postos
+
+    # --- Alterações ---
+
+    def colocar(self, func_id, slot, coluna):
+        """Põe func_id na coluna do slot (func_id None = VAGO). Retorna quem estava lá."""
+        anterior = self.atribuicao[slot][coluna]
+        indice_posto = self.prioridade_da_coluna[coluna]
+        if anterior is not None:
+            self.posto_de[anterior][slot] = LIVRE
+            if indice_posto is not None:
+                self.historico[anterior][indice_posto] -= 1
+                self.soma[anterior] -= 1
+        else:
+            self.vagos -= 1
+        self.atribuicao[slot][coluna] = func_id
+        if func_id is not None:
+            self.posto_de[func_id][slot] = coluna
+            if indice_posto is not None:
+                self.historico[func_id][indice_posto] += 1
+                self.soma[func_id] += 1
+        else:
+            self.vagos += 1
+        return anterior
+
+    # --- Custo ---
+
+    def custo_funcionario(self, func_id):
+        falta = max(0, self.min_passagens - self.soma[func_id])
+        return (
+            falta * PESO_FALTA_MINIMO
+            + self.soma[func_id] ** 2 * PESO_SOMA
+            + sum(quantidade * quantidade for quantidade in self.historico[func_id])
+        )
+
+    # --- Restrições (só a vizinhança do slot) ---
+
+    def _trecho(self, func_id, slot, trabalho, coluna, maximo):
+        """
+        Início e fim (inclusive) do trecho em torno de slot, dentro da presença, em que o
+        funcionário está trabalhando (trabalho=True, coluna=None), em uma coluna específica
+        (trabalho=True, coluna=c) ou de folga (trabalho=False). Para de crescer ao passar de
+        `maximo` slots: quem chama só precisa saber se o trecho passa do limite.
+        """
+        sequencia = self.posto_de[func_id]
+        entrada, saida = self.entrada[func_id], self.saida[func_id]
+
+        def vale(posto):
+            if not trabalho:
+                return posto == LIVRE
+            return posto != LIVRE if coluna is None else posto == coluna
+
+        inicio = fim = slot
+        while inicio - 1 >= entrada and fim - inicio < maximo and vale(sequencia[inicio - 1]):
+            inicio -= 1
+        while fim + 1 < saida and fim - inicio < maximo and vale(sequencia[fim + 1]):
+            fim += 1
+        return inicio, fim
+
+    def _pausa_curta(self, func_id, slot_folga):
+        """A folga que contém slot_folga vem depois de um trecho completo de trabalho e é curta demais?"""
+        inicio, fim = self._trecho(func_id, slot_folga, False, None, self.duracao_pausa)
+        if fim - inicio + 1 >= self.duracao_pausa:
+            return False
+        if inicio <= self.entrada[func_id] or fim + 1 >= self.saida[func_id]:
+            return False  # folga no começo ou no fim do turno não conta como pausa
+        inicio_trabalho, fim_trabalho = self._trecho(func_id, inicio - 1, True, None, self.pausa_apos)
+        return fim_trabalho - inicio_trabalho + 1 >= self.pausa_apos
+
+    def valido(self, func_id, slot):
+        """Verifica as restrições de func_id que podem ter mudado com uma alteração no slot."""
+        coluna = self.posto_de[func_id][slot]
+
+        if coluna != LIVRE:
+            if coluna in self.proibidos[func_id]:
+                return False
+            limite = self.limites[coluna]
+            if limite is not None:
+                inicio, fim = self._trecho(func_id, slot, True, coluna, limite)
+                if fim - inicio + 1 > limite:
+                    return False
+
+        if self.pausa_apos is None:
+            return True
+        if coluna == LIVRE:
+            return not self._pausa_curta(func_id, slot)
+
+        inicio, fim = self._trecho(func_id, slot, True, None, self.pausa_apos)
+        if fim - inicio + 1 > self.pausa_apos:
+            return False
+        # Folgas vizinhas ao trecho de trabalho (a anterior pode ter sido encurtada)
+        if inicio - 1 >= self.entrada[func_id] and self._pausa_curta(func_id, inicio - 1):
+            return False
+        if fim + 1 < self.saida[func_id] and self._pausa_curta(func_id, fim + 1):
+            return False
+        return True
+
+
+def _construir(solucao, plano):
+    """Solução inicial gulosa, na ordem da fila de rodízio (como o modo "rodizio")."""
+    fila = deque()
+    prioritarias = [c for c in range(solucao.num_postos) if solucao.prioridade_da_coluna[c] is not None]
+    normais = [c for c in range(solucao.num_postos) if solucao.prioridade_da_coluna[c] is None]
+
+    for slot in range(solucao.num_slots):
+        for func_id in plano["saidas_por_slot"][slot]:
+            fila.remove(func_id)
+        fila.extend(plano["entradas_por_slot"][slot])
+
+        usados = set()
+
+        def tentar(func_id, coluna):
+            solucao.colocar(func_id, slot, coluna)
+            if solucao.valido(func_id, slot):
+                usados.add(func_id)
+                return True
+            solucao.colocar(None, slot, coluna)
+            return False
+
+        # Postos de prioridade: quem tem menos passagens (em empate, a ordem da fila)
+        for coluna in prioritarias:
+            indice_posto = solucao.prioridade_da_coluna[coluna]
+            candidatos = sorted(
+                (func_id for func_id in fila if func_id not in usados),
+                key=lambda f: (solucao.soma[f], solucao.historico[f][indice_posto])
+            )
+            for func_id in candidatos:
+                if tentar(func_id, coluna):
+                    break
+        # Demais postos: o primeiro da fila que puder
+        for coluna in normais:
+            for func_id in fila:
+                if func_id not in usados and tentar(func_id, coluna):
+                    break
+
+        fila.rotate(1)
+
+
+def _melhorar(solucao, tempo_limite, rng):
+    """Busca local: troca dois funcionários de um slot (ou põe um livre no lugar de outro)."""
+    slots_com_gente = [slot for slot in range(solucao.num_slots) if len(solucao.em_servico[slot]) > 0]
+    if not slots_com_gente or solucao.num_postos == 0:
+        return 0
+    limite_sem_melhora = 50 * len(slots_com_gente) * solucao.num_postos
+    prazo = relogio.perf_counter() + tempo_limite
+    iteracoes = sem_melhora = 0
+
+    while sem_melhora < limite_sem_melhora:
+        iteracoes += 1
+        if iteracoes % 128 == 0 and relogio.perf_counter() > prazo:
+            break
+        sem_melhora += 1
+
+        slot = rng.choice(slots_com_gente)
+        coluna = rng.randrange(solucao.num_postos)
+        b = rng.choice(solucao.em_servico[slot])
+        a = solucao.atribuicao[slot][coluna]
+        if a == b:
+            continue
+        coluna_b = solucao.posto_de[b][slot]
+
+        antes = solucao.vagos * PESO_VAGO + solucao.custo_funcionario(b)
+        if a is not None:
+            antes += solucao.custo_funcionario(a)
+
+        # b vai para a coluna; a vai para onde b estava (ou fica livre)
+        if coluna_b != LIVRE:
+            solucao.colocar(None, slot, coluna_b)
+        solucao.colocar(b, slot, coluna)
+        if coluna_b != LIVRE:
+            solucao.colocar(a, slot, coluna_b)
+
+        depois = solucao.vagos * PESO_VAGO + solucao.custo_funcionario(b)
+        if a is not None:
+            depois += solucao.custo_funcionario(a)
+        valido = solucao.valido(b, slot) and (a is None or solucao.valido(a, slot))
+
+        if valido and depois <= antes:
+            if depois < antes:
+                sem_melhora = 0
+            continue
+
+        # Desfaz
+        if coluna_b != LIVRE:
+            solucao.colocar(None, slot, coluna_b)
+        solucao.colocar(a, slot, coluna)
+        if coluna_b != LIVRE:
+            solucao.colocar(b, slot, coluna_b)
+    return iteracoes
+
+
+def resolver_com_restricoes(plano, min_passagens, restricoes=None):
+    """
+    Resolve o dia inteiro respeitando as restrições.
+
+    :param plano: Resultado de _preparar_rodizio (escala_com_dicionarios2).
+    :param restricoes: Ver RESTRICOES_PADRAO (nomes de postos e funcionários).
+    :return: (designacoes, em_servico): por slot, a lista de IDs por posto de
+             rodízio (None = VAGO) e a lista de IDs em serviço.
+    """
+    restricoes = normalizar_restricoes(restricoes, plano["ordem_postos_rodizio"], plano["nomes_rodizio"])
+    solucao = _Solucao(plano, min_passagens, restricoes)
+    _construir(solucao, plano)
+    _melhorar(solucao, restricoes["tempo_limite"], random.Random(restricoes["semente"]))
+    return solucao.atribuicao, solucao.em_servico
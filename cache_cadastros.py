@@ -0,0 +1,196 @@
+"""
+Cache em memória dos cadastros (postos com prioridade, funcionários com turno).
+
+São dados que quase não mudam, mas eram lidos a cada geração de escala, a cada
+leitura da grade do monitor e a cada GET de funcionário. Aqui:
+- postos: a tabela (pequena) inteira é lida uma vez e servida do cache;
+- turnos: a relação de funcionários com turno que a geração de escala percorre
+  inteira (gestao_escala.gerar_escala_do_dia), também lida uma vez;
+- funcionários: consultas pontuais, por id ou por nome. Cada linha pedida
+  fica no cache (LRU de ITENS_FUNCIONARIOS linhas); as que faltam vêm do banco
+  em uma consulta só (= ANY). A listagem (GET /funcionarios) não passa pelo
+  cache: continua paginada e em streaming direto do banco.
+
+Read-through até:
+1. uma escrita de cadastro neste processo chamar invalidar() (rotas POST/PUT/DELETE
+   e importação em lote);
+2. um NOTIFY em notificacoes.CANAL_CADASTRO chegar ao ouvinte do processo
+   (escritas feitas por outro processo);
+3. passar TTL_SEGUNDOS, para escritas que não avisam (SQL direto no banco).
+
+Como em cache_monitor, cada invalidação muda a versão: uma leitura do banco
+que começou antes dela não é guardada. Os valores devolvidos são compartilhados
+entre as chamadas: não altere as listas e tuplas recebidas.
+"""
+import os
+import threading
+import time as relogio
+from collections import OrderedDict
+
+from instrumentacao import Contador
+
+TTL_SEGUNDOS = float(os.environ.get("ESCALA_CACHE_CADASTROS_TTL", "300"))
+ITENS_FUNCIONARIOS = int(os.environ.get("ESCALA_CACHE_CADASTROS_ITENS", "10000"))
+
+CONSULTA_POSTOS = "SELECT id, nome, prioridade FROM postos ORDER BY prioridade ASC, id ASC"
+CONSULTA_TURNOS = "SELECT id, nome, horario_inicio, horario_fim FROM funcionarios ORDER BY id"
+# {coluna}: id ou nome; {marcador}: %s no psycopg2, :chaves no SQLAlchemy, $1 no asyncpg
+CONSULTA_FUNCIONARIOS = "SELECT id, nome, horario_inicio, horario_fim FROM funcionarios WHERE {coluna} = ANY({marcador})"
+
+_lock = threading.Lock()
+_tabelas = {}                   # "postos" | "turnos" -> (instante em que expira, linhas)
+_funcionarios = OrderedDict()   # id -> (instante em que expira, linha), do menos para o mais recente
+_ids_por_nome = {}              # nome -> id, só das linhas em _funcionarios
+_versao = 0
+
+LEITURAS = Contador(
+    "escala_cache_cadastros_leituras_total", "Leituras de cadastros (postos, turnos, linhas de funcionários) por tabela e resultado do cache.",
+    ("tabela", "resultado")
+)
+
+
+def invalidar():
+    """Descarta os cadastros em cache; a próxima leitura vai ao banco."""
+    global _versao
+    with _lock:
+        _versao += 1
+        _tabelas.clear()
+        _funcionarios.clear()
+        _ids_por_nome.clear()
+
+
+# --- POSTOS E TURNOS (tabela inteira) ---
+
+def _consultar_tabela(tabela):
+    """(linhas ou None se ausente/expirado, versão do cache no momento da consulta)."""
+    with _lock:
+        entrada = _tabelas.get(tabela)
+        versao = _versao
+    if entrada is not None and entrada[0] > relogio.monotonic():
+        LEITURAS.incrementar(tabela, "acerto")
+        return entrada[1], versao
+    LEITURAS.incrementar(tabela, "banco")
+    return None, versao
+
+
+def _guardar_tabela(tabela, rows, versao):
+    linhas = [tuple(row) for row in rows]
+    with _lock:
+        # Se alguém invalidou enquanto líamos o banco, não guarda o resultado velho
+        if versao == _versao:
+            _tabelas[tabela] = (relogio.monotonic() + TTL_SEGUNDOS, linhas)
+    return linhas
+
+
+def _ler_tabela(cur, tabela, consulta):
+    linhas, versao = _consultar_tabela(tabela)
+    if linhas is None:
+        cur.execute(consulta)
+        linhas = _guardar_tabela(tabela, cur.fetchall(), versao)
+    return linhas
+
+
+def postos(cur):
+    """[(id, nome, prioridade)] ordenados por prioridade (1 = alta) e id."""
+    return _ler_tabela(cur, "postos", CONSULTA_POSTOS)
+
+
+async def postos_async(pool):
+    linhas, versao = _consultar_tabela("postos")
+    if linhas is None:
+        linhas = _guardar_tabela("postos", await pool.fetch(CONSULTA_POSTOS), versao)
+    return linhas
+
+
+def turnos(cur):
+    """[(id, nome, horario_inicio, horario_fim)] de todos os funcionários, por id."""
+    return _ler_tabela(cur, "turnos", CONSULTA_TURNOS)
+
+
+# --- FUNCIONÁRIOS (consultas pontuais) ---
+
+def _procurar_funcionarios(chaves, coluna):
+    """({chave: linha} das que estão no cache, [chaves que faltam], versão do cache)."""
+    agora = relogio.monotonic()
+    encontrados, faltam = {}, []
+    with _lock:
+        versao = _versao
+        for chave in dict.fromkeys(chaves):
+            id = _ids_por_nome.get(chave) if coluna == "nome" else chave
+            entrada = _funcionarios.get(id)
+            # Pelo nome, confere a linha: o nome pode ter mudado (escrita sem aviso)
+            if entrada is not None and entrada[0] > agora and (coluna == "id" or entrada[1][1] == chave):
+                _funcionarios.move_to_end(id)
+                encontrados[chave] = entrada[1]
+            else:
+                faltam.append(chave)
+    if encontrados:
+        LEITURAS.incrementar("funcionarios", "acerto", quantidade=len(encontrados))
+    if faltam:
+        LEITURAS.incrementar("funcionarios", "banco", quantidade=len(faltam))
+    return encontrados, faltam, versao
+
+
+def _guardar_funcionarios(rows, versao, coluna):
+    """Guarda as linhas lidas do banco e devolve {chave (id ou nome): linha}."""
+    linhas = [tuple(row) for row in rows]
+    expira = relogio.monotonic() + TTL_SEGUNDOS
+    with _lock:
+        if versao == _versao:
+            for linha in linhas:
+                _funcionarios[linha[0]] = (expira, linha)
+                _funcionarios.move_to_end(linha[0])
+                _ids_por_nome[linha[1]] = linha[0]
+            while len(_funcionarios) > ITENS_FUNCIONARIOS:
+                _, (_, descartada) = _funcionarios.popitem(last=False)
+                if _ids_por_nome.get(descartada[1]) == descartada[0]:
+                    del _ids_por_nome[descartada[1]]
+    indice = 0 if coluna == "id" else 1
+    return {linha[indice]: linha for linha in linhas}
+
+
+def _ler_funcionarios(cur, chaves, coluna):
+    encontrados, faltam, versao = _procurar_funcionarios(chaves, coluna)
+    if faltam:
+        cur.execute(CONSULTA_FUNCIONARIOS.format(coluna=coluna, marcador="%s"), (faltam,))
+        encontrados.update(_guardar_funcionarios(cur.fetchall(), versao, coluna))
+    return encontrados
+
+
+def funcionarios_por_id(cur, ids):
+    """{id: (id, nome, horario_inicio, horario_fim)} dos ids que existem."""
+    return _ler_funcionarios(cur, ids, "id")
+
+
+def funcionarios_por_nome(cur, nomes):
+    """{nome: (id, nome, horario_inicio, horario_fim)} dos nomes que existem."""
+    return _ler_funcionarios(cur, nomes, "nome")
+
+
+def funcionario_por_id_sessao(session, id):
+    """Linha do funcionário com esse id, ou None; para a sessão do Flask-SQLAlchemy."""
+    encontrados, faltam, versao = _procurar_funcionarios([id], "id")
+    if faltam:
+        from sqlalchemy import text
+        rows = session.execute(text(CONSULTA_FUNCIONARIOS.format(coluna="id", marcador=":chaves")), {"chaves": faltam})
+        encontrados.update(_guardar_funcionarios(rows.fetchall(), versao, "id"))
+    return encontrados.get(id)
+
+
+async def funcionarios_por_id_async(pool, ids):
+    encontrados, faltam, versao = _procurar_funcionarios(ids, "id")
+    if faltam:
+        rows = await pool.fetch(CONSULTA_FUNCIONARIOS.format(coluna="id", marcador="$1"), faltam)
+        encontrados.update(_guardar_funcionarios(rows, versao, "id"))
+    return encontrados
+
+
+def ids_por_nome(postos, funcionarios):
+    """({nome do posto: id}, {nome do funcionário: id})."""
+    return {nome: id for id, nome, *_ in postos}, {nome: id for id, nome, *_ in funcionarios}
+
+
+def nomes_por_id(postos, funcionarios):
+    """({id do posto: nome}, {id do funcionário: nome})."""
+    return {id: nome for id, nome, *_ in postos}, {id: nome for id, nome, *_ in funcionarios}
+
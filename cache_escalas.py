@@ -0,0 +1,202 @@
+"""
+Memorização dos resultados do gerador (gerar_escala_com_metricas / gerar_escala_balanceada).
+
+Quem planeja roda o gerador várias vezes com os mesmos postos, agenda, intervalo
+e MIN_PASSAGENS. A chave de cada resultado é o SHA-256 das entradas normalizadas
+mais VERSAO_GERADOR (ver impressao_digital): entradas iguais dão a mesma chave
+e o resultado sai do cache sem rodar o gerador.
+
+Níveis, na ordem em que são consultados:
+1. memória: LRU por processo com ITENS_MEMORIA resultados;
+2. persistente (opcional, ESCALA_CACHE_ESCALAS): "postgres" usa a tabela
+   escalas_memorizadas (criada pelo comando migrar de gestao_escala); qualquer
+   outro valor é um diretório com um arquivo JSON por chave. Sobrevive ao
+   processo e é compartilhado entre máquinas/processos.
+
+Os resultados são guardados como texto JSON: cada leitura devolve objetos novos,
+que o chamador pode alterar à vontade. Falhas do nível persistente só são
+avisadas (print); a escala é gerada normalmente. Acertos e faltas vão para o
+contador escala_cache_escalas_leituras_total (/metrics) e para estatisticas().
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from instrumentacao import Contador
+
+ITENS_MEMORIA = int(os.environ.get("ESCALA_CACHE_ESCALAS_ITENS", "128"))
+PERSISTENTE = os.environ.get("ESCALA_CACHE_ESCALAS", "")
+NIVEIS = ("memoria", "persistente", "gerada")
+
+_lock = threading.Lock()
+_memoria = OrderedDict()  # chave -> texto JSON, do menos para o mais recente
+
+LEITURAS = Contador(
+    "escala_cache_escalas_leituras_total",
+    "Resultados do gerador por origem (memoria, persistente ou gerada = falta no cache).",
+    ("origem",)
+)
+
+
+def _hhmm(horario):
+    """ "7:00" e "07:00" dão a mesma chave (o gerador só usa os minutos)."""
+    horas, minutos = horario.split(":")[:2]
+    return f"{int(horas):02d}:{int(minutos):02d}"
+
+
+def _serializavel(valor):
+    # Conjuntos nas restrições (ex.: postos proibidos) entram ordenados
+    if isinstance(valor, (set, frozenset)):
+        return sorted(valor)
+    raise TypeError(f"Valor sem forma canônica para a chave do cache: {valor!r}")
+
+
+def impressao_digital(versao, hora_inicio, hora_fim, intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo, restricoes):
+    """
+    SHA-256 (hex) das entradas do gerador na forma em que ele as usa.
+
+    A ordem de postos, fixos e agenda é mantida (define colunas e desempates);
+    dos postos de rodízio só os nomes contam; horários viram "HH:MM".
+    """
+    entradas = {
+        "versao": versao,
+        "inicio": _hhmm(hora_inicio),
+        "fim": _hhmm(hora_fim),
+        "intervalo": intervalo_minutos if isinstance(intervalo_minutos, (int, str)) else list(intervalo_minutos),
+        "postos_rodizio": list(postos_rodizio),
+        "postos_fixos": list(postos_fixos.items()),
+        "agenda": [[nome, _hhmm(entrada), _hhmm(saida)] for nome, (entrada, saida) in agenda_funcionarios.items()],
+        "postos_prioridade": list(postos_prioridade),
+        "min_passagens": min_passagens,
+        "modo": modo,
+        "restricoes": restricoes or None,
+    }
+    texto = json.dumps(entradas, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_serializavel)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+# --- Nível persistente ---
+
+def _ler_persistente(chave):
+    if not PERSISTENTE:
+        return None
+    if PERSISTENTE == "postgres":
+        from conexao_banco import get_db_connection
+        conn = get_db_connection()
+        if not conn:
+            return None
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT resultado::text FROM escalas_memorizadas WHERE chave = %s", (chave,))
+            linha = cur.fetchone()
+            conn.commit()
+            return linha[0] if linha else None
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro ao ler o cache de escalas: {e}")
+            return None
+        finally:
+            cur.close()
+            conn.close()
+    try:
+        with open(os.path.join(PERSISTENTE, f"{chave}.json"), encoding="utf-8") as arquivo:
+            return arquivo.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f"Erro ao ler o cache de escalas: {e}")
+        return None
+
+
+def _gravar_persistente(chave, versao, texto):
+    if not PERSISTENTE:
+        return
+    if PERSISTENTE == "postgres":
+        from conexao_banco import get_db_connection
+        conn = get_db_connection()
+        if not conn:
+            return
+        cur = conn.cursor()
+        try:
+            # JSON (não JSONB) para guardar o texto como está, com a ordem das chaves
+            cur.execute("""
+                INSERT INTO escalas_memorizadas (chave, versao_gerador, resultado)
+                VALUES (%s, %s, %s::json)
+                ON CONFLICT (chave) DO NOTHING
+            """, (chave, versao, texto))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro ao gravar o cache de escalas: {e}")
+        finally:
+            cur.close()
+            conn.close()
+        return
+    try:
+        os.makedirs(PERSISTENTE, exist_ok=True)
+        # Arquivo temporário + rename: quem lê ao mesmo tempo nunca vê um JSON pela metade
+        descritor, temporario = tempfile.mkstemp(dir=PERSISTENTE, suffix=".tmp")
+        with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+            arquivo.write(texto)
+        os.replace(temporario, os.path.join(PERSISTENTE, f"{chave}.json"))
+    except OSError as e:
+        print(f"Erro ao gravar o cache de escalas: {e}")
+
+
+# --- Memória (LRU) ---
+
+def _guardar_memoria(chave, texto):
+    with _lock:
+        _memoria[chave] = texto
+        _memoria.move_to_end(chave)
+        while len(_memoria) > ITENS_MEMORIA:
+            _memoria.popitem(last=False)
+
+
+def memorizado(chave, versao, gerar):
+    """
+    Resultado de gerar() (tipos simples, prontos para JSON) para a chave: da memória,
+    do nível persistente ou gerando e guardando nos dois.
+    """
+    with _lock:
+        texto = _memoria.get(chave)
+        if texto is not None:
+            _memoria.move_to_end(chave)
+    if texto is not None:
+        LEITURAS.incrementar("memoria")
+        return json.loads(texto)
+
+    texto = _ler_persistente(chave)
+    if texto is not None:
+        LEITURAS.incrementar("persistente")
+        _guardar_memoria(chave, texto)
+        return json.loads(texto)
+
+    LEITURAS.incrementar("gerada")
+    texto = json.dumps(gerar(), ensure_ascii=False)
+    _guardar_memoria(chave, texto)
+    _gravar_persistente(chave, versao, texto)
+    # Mesmo caminho de um acerto: o resultado tem os mesmos tipos (listas, não tuplas)
+    return json.loads(texto)
+
+
+def limpar_memoria():
+    """Esvazia o LRU do processo (o nível persistente não muda)."""
+    with _lock:
+        _memoria.clear()
+
+
+def estatisticas():
+    """Leituras por origem, itens na memória e taxa de acerto (0 a 1) deste processo."""
+    leituras = {origem: LEITURAS.valor(origem) for origem in NIVEIS}
+    total = sum(leituras.values())
+    with _lock:
+        itens = len(_memoria)
+    return {
+        **leituras,
+        "itens_memoria": itens,
+        "taxa_acerto": (leituras["memoria"] + leituras["persistente"]) / total if total else 0.0,
+    }
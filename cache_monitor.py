@@ -0,0 +1,196 @@
+"""
+Cache em memória da escala do dia para os monitores.
+
+A grade é lida do banco uma vez, renderizada em JSON e HTML e servida do cache
+até que algo a invalide (escala salva, funcionário ou posto alterado, neste
+processo ou avisado pelo NOTIFY ao ouvinte) ou até passar TTL_SEGUNDOS, para o
+caso de o aviso não chegar (ouvinte fora do ar, SQL direto no banco).
+"""
+import hashlib
+import json
+import os
+import threading
+import time as relogio
+from datetime import date
+from html import escape
+
+import cache_cadastros
+from instrumentacao import cronometrado
+
+TTL_SEGUNDOS = float(os.environ.get("ESCALA_CACHE_MONITOR_TTL", "60"))
+
+_lock = threading.Lock()
+_cache = {}   # (site, data) -> (expira em, grade renderizada)
+_versao = 0   # muda a cada invalidação; entradas de versões antigas são descartadas
+
+
+def invalidar(site=None, data_escala=None):
+    """
+    Descarta a grade em cache. Sem argumentos, descarta tudo
+    (ex.: um funcionário mudou de nome e aparece em várias escalas).
+    """
+    global _versao
+    if isinstance(data_escala, str):
+        data_escala = date.fromisoformat(data_escala)
+    with _lock:
+        _versao += 1
+        if site is None and data_escala is None:
+            _cache.clear()
+        else:
+            _cache.pop((site, data_escala), None)
+
+
+# Os IDs seguem a ordem dos slots (inclusive depois da meia-noite). Os nomes de
+# postos e funcionários vêm do cache_cadastros, não de JOINs.
+# Marcadores de parâmetro: %s no psycopg2, $1/$2 no asyncpg
+CONSULTA_GRADE = """
+    SELECT ed.hora_inicio, ed.hora_fim, ed.posto_id, ed.funcionario_id
+    FROM escala_detalhes ed
+    JOIN escalas e ON e.id = ed.escala_id
+    WHERE e.data_escala = {data} AND e.site = {site}
+    ORDER BY ed.id
+"""
+
+
+@cronometrado("carregar_grade")
+def carregar_grade(conn, data_escala, site):
+    """Lê a escala do dia como grade: uma linha por horário, uma coluna por posto."""
+    cur = conn.cursor()
+    try:
+        cur.execute(CONSULTA_GRADE.format(data="%s", site="%s"), (data_escala, site))
+        rows = cur.fetchall()
+        postos = cache_cadastros.postos(cur)
+        if _faltam_postos(rows, postos):
+            # Posto novo ainda fora do cache (ex.: gravado por outro processo)
+            cache_cadastros.invalidar()
+            postos = cache_cadastros.postos(cur)
+        funcionarios = cache_cadastros.funcionarios_por_id(cur, _ids_funcionarios(rows))
+    finally:
+        cur.close()
+    return montar_grade(rows, data_escala, site, *cache_cadastros.nomes_por_id(postos, funcionarios.values()))
+
+
+def _faltam_postos(rows, postos):
+    ids = {id for id, *_ in postos}
+    return any(posto_id not in ids for _, _, posto_id, _ in rows)
+
+
+def _ids_funcionarios(rows):
+    """Só os funcionários da grade são procurados no cache de cadastros."""
+    return {funcionario_id for *_, funcionario_id in rows if funcionario_id is not None}
+
+
+def montar_grade(rows, data_escala, site, nomes_postos, nomes_funcionarios):
+    """Linhas (hora_inicio, hora_fim, posto_id, funcionario_id), na ordem dos slots -> grade."""
+    postos = []
+    slots = {}
+    for hora_inicio, hora_fim, posto_id, funcionario_id in rows:
+        posto = nomes_postos.get(posto_id, f"Posto {posto_id}")
+        if posto not in postos:
+            postos.append(posto)
+        horario = f"{hora_inicio.strftime('%H:%M')} - {hora_fim.strftime('%H:%M')}"
+        slots.setdefault(horario, {})[posto] = (
+            "VAGO" if funcionario_id is None else nomes_funcionarios.get(funcionario_id, f"Funcionário {funcionario_id}")
+        )
+
+    return {
+        "site": site,
+        "data": data_escala.isoformat(),
+        "postos": postos,
+        "slots": [
+            {"horario": horario, "designacoes": [designacoes.get(posto, "") for posto in postos]}
+            for horario, designacoes in slots.items()
+        ]
+    }
+
+
+def renderizar_html(grade):
+    """
+    Página simples para o monitor. Recarrega quando o servidor avisa (SSE em
+    /monitor/eventos) e, por garantia, a cada 5 minutos.
+    """
+    cabecalho = "".join(f"<th>{escape(posto)}</th>" for posto in grade["postos"])
+    linhas = "".join(
+        "<tr><td>" + escape(slot["horario"]) + "</td>"
+        + "".join(f"<td>{escape(nome)}</td>" for nome in slot["designacoes"])
+        + "</tr>"
+        for slot in grade["slots"]
+    )
+    if not grade["slots"]:
+        linhas = f"<tr><td colspan=\"{len(grade['postos']) + 1}\">Nenhuma escala encontrada para esta data.</td></tr>"
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        "<meta http-equiv=\"refresh\" content=\"300\">"
+        f"<title>Escala {escape(grade['site'])} {escape(grade['data'])}</title></head><body>"
+        f"<h1>Escala {escape(grade['site'])} - {escape(grade['data'])}</h1>"
+        f"<table border=\"1\"><tr><th>Horário</th>{cabecalho}</tr>{linhas}</table>"
+        "<script>new EventSource(\"/monitor/eventos?site=\" + encodeURIComponent("
+        f"{json.dumps(grade['site'])}"
+        ")).onmessage = function () { location.reload(); };</script>"
+        "</body></html>"
+    )
+
+
+def obter_monitor(data_escala, site, get_db_connection):
+    """
+    Retorna a grade do dia já renderizada: {"grade": dict, "json": bytes, "html": bytes, "etag": str}.
+    Só consulta o banco quando a entrada não está no cache.
+    """
+    entrada, versao = _consultar_cache(site, data_escala)
+    if entrada is not None:
+        return entrada
+
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Sem conexão com o banco de dados")
+    try:
+        grade = carregar_grade(conn, data_escala, site)
+    finally:
+        conn.close()
+    return _guardar(site, data_escala, grade, versao)
+
+
+async def obter_monitor_async(data_escala, site, pool):
+    """Mesmo que obter_monitor(), lendo a grade por um pool asyncpg (API assíncrona)."""
+    entrada, versao = _consultar_cache(site, data_escala)
+    if entrada is not None:
+        return entrada
+
+    grade = await carregar_grade_async(pool, data_escala, site)
+    return _guardar(site, data_escala, grade, versao)
+
+
+@cronometrado("carregar_grade")
+async def carregar_grade_async(pool, data_escala, site):
+    rows = await pool.fetch(CONSULTA_GRADE.format(data="$1", site="$2"), data_escala, site)
+    postos = await cache_cadastros.postos_async(pool)
+    if _faltam_postos(rows, postos):
+        cache_cadastros.invalidar()
+        postos = await cache_cadastros.postos_async(pool)
+    funcionarios = await cache_cadastros.funcionarios_por_id_async(pool, _ids_funcionarios(rows))
+    return montar_grade(rows, data_escala, site, *cache_cadastros.nomes_por_id(postos, funcionarios.values()))
+
+
+def _consultar_cache(site, data_escala):
+    """(entrada ou None, versão do cache no momento da consulta)."""
+    with _lock:
+        expira, entrada = _cache.get((site, data_escala), (0, None))
+        if entrada is not None and expira <= relogio.monotonic():
+            del _cache[(site, data_escala)]
+            entrada = None
+        return entrada, _versao
+
+
+def _guardar(site, data_escala, grade, versao):
+    corpo_json = json.dumps(grade, ensure_ascii=False).encode("utf-8")
+    entrada = {
+        "grade": grade,
+        "json": corpo_json,
+        "html": renderizar_html(grade).encode("utf-8"),
+        "etag": hashlib.sha1(corpo_json).hexdigest()
+    }
+    with _lock:
+        # Se alguém invalidou enquanto líamos o banco, não guarda o resultado velho
+        if versao == _versao:
+            _cache[(site, data_escala)] = (relogio.monotonic() + TTL_SEGUNDOS, entrada)
+    return entrada
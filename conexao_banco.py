@@ -0,0 +1,180 @@
+import json
+import os
+import time as relogio
+
+from instrumentacao import instrumentar_conexao_async, instrumentar_engine, registrar_sql
+
+# --- CONFIGURAÇÃO DO BANCO DE DADOS ---
+# Altere estas configurações para o seu ambiente Postgres local
+# (ou defina as variáveis de ambiente ESCALA_DB_*)
+DB_CONFIG = {
+    "dbname": os.environ.get("ESCALA_DB_NAME", "gestao_escalas"),
+    "user": os.environ.get("ESCALA_DB_USER", "postgres"),
+    "password": os.environ.get("ESCALA_DB_PASSWORD", "123"),
+    "host": os.environ.get("ESCALA_DB_HOST", "localhost"),
+    "port": os.environ.get("ESCALA_DB_PORT", "5432")
+}
+
+# Site usado quando nenhum é informado (instalação de um único site)
+SITE_PADRAO = "principal"
+
+# --- CONFIGURAÇÃO DO POOL DE CONEXÕES ---
+# Um único pool atende as funções psycopg2 e as rotas Flask/SQLAlchemy
+POOL_CONFIG = {
+    "pool_size": int(os.environ.get("ESCALA_POOL_SIZE", "5")),         # conexões mantidas abertas
+    "max_overflow": int(os.environ.get("ESCALA_POOL_OVERFLOW", "10")), # extras em pico de uso
+    "pool_timeout": int(os.environ.get("ESCALA_POOL_TIMEOUT", "30")),  # segundos esperando uma conexão livre
+    "pool_recycle": int(os.environ.get("ESCALA_POOL_RECYCLE", "1800")),# renova conexões antigas (segundos)
+    "pool_pre_ping": True                                              # testa a conexão antes de entregar
+}
+
+
+_cursor_instrumentado = None
+
+
+def cursor_instrumentado():
+    """
+    Cursor psycopg2 que mede execute/executemany/copy_expert (inclusive via
+    execute_values) no histograma de SQL da instrumentacao. A classe é criada
+    na primeira conexão: importar o módulo não carrega o psycopg2 (a API
+    assíncrona só usa DB_CONFIG e o asyncpg).
+    """
+    global _cursor_instrumentado
+    if _cursor_instrumentado is None:
+        import psycopg2.extensions
+
+        class CursorInstrumentado(psycopg2.extensions.cursor):
+            medido_pelo_sqlalchemy = False
+
+            def _medir(self, metodo, comando, *args):
+                if self.medido_pelo_sqlalchemy:
+                    return metodo(comando, *args)
+                inicio = relogio.perf_counter()
+                try:
+                    return metodo(comando, *args)
+                finally:
+                    registrar_sql(comando, relogio.perf_counter() - inicio, self)
+
+            def execute(self, query, vars=None):
+                return self._medir(super().execute, query, vars)
+
+            def executemany(self, query, vars_list):
+                return self._medir(super().executemany, query, vars_list)
+
+            def copy_expert(self, sql, file, size=8192):
+                return self._medir(super().copy_expert, sql, file, size)
+
+        _cursor_instrumentado = CursorInstrumentado
+    return _cursor_instrumentado
+
+
+_engine = None
+
+
+def get_engine():
+    """Retorna o engine compartilhado, criando-o (e o pool) na primeira chamada."""
+    global _engine
+    if _engine is None:
+        # SQLAlchemy só é carregado na primeira conexão (importar o módulo continua barato)
+        from sqlalchemy import create_engine
+        from sqlalchemy.engine import URL
+
+        url = URL.create(
+            "postgresql+psycopg2",
+            username=DB_CONFIG["user"],
+            password=DB_CONFIG["password"] or None,
+            host=DB_CONFIG["host"],
+            port=int(DB_CONFIG["port"]) if DB_CONFIG["port"] else None,
+            database=DB_CONFIG["dbname"]
+        )
+        # Todo cursor psycopg2 do pool é medido (ver instrumentacao)
+        _engine = create_engine(url, connect_args={"cursor_factory": cursor_instrumentado()}, **POOL_CONFIG)
+        instrumentar_engine(_engine)
+    return _engine
+
+
+def get_db_connection():
+    """
+    Pega uma conexão psycopg2 do pool compartilhado.
+    conn.close() devolve a conexão ao pool em vez de fechá-la.
+    """
+    try:
+        return get_engine().raw_connection()
+    except Exception as e:
+        print(f"Erro ao conectar ao banco de dados: {e}")
+        return None
+
+
+def abrir_conexao_dedicada():
+    """Conexão psycopg2 fora do pool, para quem a segura o tempo todo (ex.: LISTEN)."""
+    import psycopg2
+
+    return psycopg2.connect(**DB_CONFIG, cursor_factory=cursor_instrumentado())
+
+
+def criar_db(app):
+    """
+    Cria o Flask-SQLAlchemy do app usando o engine (e o pool) das funções psycopg2,
+    em vez de deixar a extensão abrir um segundo pool para o mesmo banco.
+    """
+    from flask_sqlalchemy import SQLAlchemy
+
+    class SQLAlchemyCompartilhado(SQLAlchemy):
+        def _make_engine(self, bind_key, options, app):
+            return get_engine()
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = get_engine().url
+    return SQLAlchemyCompartilhado(app)
+
+
+def estatisticas_pool():
+    """Números do pool para monitoramento."""
+    pool = get_engine().pool
+    return {
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "livres": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": POOL_CONFIG["max_overflow"],
+        "status": pool.status()
+    }
+
+
+# --- API ASSÍNCRONA (asyncpg, carregado só quando usado) ---
+
+def _parametros_asyncpg():
+    return {
+        "database": DB_CONFIG["dbname"],
+        "user": DB_CONFIG["user"],
+        "password": DB_CONFIG["password"] or None,
+        "host": DB_CONFIG["host"],
+        "port": int(DB_CONFIG["port"]) if DB_CONFIG["port"] else None
+    }
+
+
+async def _preparar_conexao_async(conn):
+    # JSONB chega como dict (no asyncpg o padrão é texto), como no psycopg2
+    await conn.set_type_codec("jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+    instrumentar_conexao_async(conn)
+
+
+async def criar_pool_async():
+    """
+    Pool asyncpg para a API assíncrona, com o mesmo banco e os mesmos limites do
+    pool do SQLAlchemy (pool_size conexões abertas, até pool_size + max_overflow).
+    """
+    import asyncpg
+
+    return await asyncpg.create_pool(
+        **_parametros_asyncpg(),
+        min_size=POOL_CONFIG["pool_size"],
+        max_size=POOL_CONFIG["pool_size"] + POOL_CONFIG["max_overflow"],
+        init=_preparar_conexao_async
+    )
+
+
+async def abrir_conexao_dedicada_async():
+    """Conexão asyncpg fora do pool (LISTEN do ouvinte da API assíncrona)."""
+    import asyncpg
+
+    return await asyncpg.connect(**_parametros_asyncpg())
@@ -1,127 +1,446 @@
-from datetime import datetime, timedelta
-import random
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from itertools import accumulate, islice
 
-def gerar_escala_balanceada(hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens):
+from atribuicao_otima import atribuir_postos_prioritarios
+from busca_restricoes import resolver_com_restricoes
+from grade_escala import GradeEscala
+from indice_turnos import IndiceTurnos
+from intervalos_variaveis import planejar_intervalos
+from metricas_escala import MetricasEscala
+
+MODOS_GERACAO = ("rodizio", "otimo", "restricoes")
+INTERVALO_VARIAVEL = "variavel"  # slots de 30 a 60 min escolhidos por planejar_intervalos
+MINUTOS_DIA = 24 * 60
+# Mude a cada alteração que muda a escala gerada: invalida os resultados memorizados (cache_escalas)
+VERSAO_GERADOR = "2026.12"
+
+
+def _minutos(hora_str):
+    """Converte "HH:MM" em minutos desde a meia-noite."""
+    hora = datetime.strptime(hora_str, "%H:%M")
+    return hora.hour * 60 + hora.minute
+
+
+def _duracao(inicio_str, fim_str):
+    """
+    Minutos de inicio_str a fim_str; fim anterior ao início é no dia seguinte.
+    Fim igual ao início dá zero, como no gerador original: a escala fica sem
+    slots e o turno só ocupa o slot de entrada (não vira um turno de 24h).
+    """
+    return (_minutos(fim_str) - _minutos(inicio_str)) % MINUTOS_DIA
+
+
+def _turno_relativo(inicio, entrada_str, saida_str):
+    """
+    (entrada, saida) em minutos desde o início da escala, com virada do dia
+    (ex.: 19:00-07:00). Quem entra antes do início da escala cai no dia
+    seguinte, ou seja, depois do fim dela.
+    """
+    entrada = (_minutos(entrada_str) - inicio) % MINUTOS_DIA
+    return entrada, entrada + _duracao(entrada_str, saida_str)
+
+
+def _preparar_rodizio(hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade):
+    """
+    Pré-calcula tudo o que o laço de rodízio precisa, uma única vez:
+    IDs inteiros para funcionários e postos, e os eventos de entrada/saída
+    já agrupados pelo índice do slot em que acontecem.
+
+    :param intervalo_minutos: Duração fixa dos slots (int) ou a lista de durações
+                              de cada slot (ver _intervalos_variaveis).
+    """
+    inicio = _minutos(hora_inicio_escala_str)
+    duracao = _duracao(hora_inicio_escala_str, hora_fim_escala_str)
+    if isinstance(intervalo_minutos, int):
+        if intervalo_minutos <= 0:
+            raise ValueError("O intervalo de rodízio deve ser maior que zero.")
+        num_slots = -(-duracao // intervalo_minutos)
+        limites = range(0, (num_slots + 1) * intervalo_minutos, intervalo_minutos)
+    else:
+        duracoes = list(intervalo_minutos)
+        if any(duracao <= 0 for duracao in duracoes):
+            raise ValueError("A duração de cada slot deve ser maior que zero.")
+        num_slots = len(duracoes)
+        limites = list(accumulate(duracoes, initial=0))
+        intervalo_minutos = None
+
+    # IDs inteiros: o índice na lista é o ID do funcionário
+    nomes_rodizio = [nome for nome in agenda_funcionarios.keys() if nome not in postos_fixos.values()]
+    ordem_postos_rodizio = list(postos_rodizio.keys())
+
+    # Postos de prioridade (sem repetição) e posições do rodízio que os ocupam
+    prioridades = list(dict.fromkeys(postos_prioridade))
+    posicoes_prioridade = [
+        (posicao, prioridades.index(posto))
+        for posicao, posto in enumerate(ordem_postos_rodizio) if posto in prioridades
+    ]
+    # Posição da fila que recebe o funcionário mais necessitado (equivale a indices_prioridade[0])
+    destinos = [ordem_postos_rodizio.index(p) for p in postos_prioridade if p in ordem_postos_rodizio]
+    destino_prioridade = destinos[0] if destinos else None
+
+    # Turnos em minutos desde `inicio` (ver _turno_relativo) num índice por horário de
+    # entrada: cada slot busca só quem entra nele (O(log n) por slot, sem varrer o efetivo).
+    # Com intervalo fixo só entra quem chega exatamente no início de um slot; com slots
+    # variáveis, quem chega no meio de um slot entra no seguinte
+    turnos = [_turno_relativo(inicio, *agenda_funcionarios[nome]) for nome in nomes_rodizio]
+    indice = IndiceTurnos((func_id, entrada, saida) for func_id, (entrada, saida) in enumerate(turnos))
+    entradas_por_slot = [[] for _ in range(num_slots)]
+    saidas_por_slot = [[] for _ in range(num_slots)]  # (minuto da saída, func_id) até a ordenação
+    slot_saida_funcionario = [num_slots] * len(nomes_rodizio)
+    for slot in range(num_slots):
+        limite = limites[slot]
+        desde = limites[slot - 1] + 1 if slot and not intervalo_minutos else limite
+        for func_id in indice.entradas_em(desde, limite + 1):
+            entradas_por_slot[slot].append(func_id)
+            # Sai no primeiro slot cujo início já alcançou o horário de saída
+            # (a remoção acontece antes da adição, então nunca no próprio slot de entrada)
+            saida = max(turnos[func_id][1], limite + 1)
+            slot_saida = bisect_left(limites, saida, slot + 1)
+            if slot_saida < num_slots:
+                saidas_por_slot[slot_saida].append((saida, func_id))
+                slot_saida_funcionario[func_id] = slot_saida
+    # No mesmo slot, sai primeiro quem tem o horário de saída mais cedo
+    saidas_por_slot = [[func_id for _, func_id in sorted(saidas)] for saidas in saidas_por_slot]
+
+    return {
+        "inicio": inicio,
+        "intervalo": intervalo_minutos,  # None com slots variáveis
+        "limites": [inicio + limite for limite in limites],  # início de cada slot e fim do último (pode passar de 24:00)
+        "num_slots": num_slots,
+        "nomes_rodizio": nomes_rodizio,
+        "ordem_postos_rodizio": ordem_postos_rodizio,
+        "designacoes_fixas": list(postos_fixos.values()),
+        "postos_fixos": list(postos_fixos.keys()),
+        "cabecalho": ["Horário"] + ordem_postos_rodizio + list(postos_fixos.keys()),
+        "prioridades": prioridades,
+        "posicoes_prioridade": posicoes_prioridade,
+        "destino_prioridade": destino_prioridade,
+        "entradas_por_slot": entradas_por_slot,
+        "saidas_por_slot": saidas_por_slot,
+        "slot_saida_funcionario": slot_saida_funcionario,
+    }
+
+
+def _designar_otimo(fila, slot, num_postos_rodizio, posicoes_prioridade, historico_posto, soma_passagens, slot_saida_funcionario, min_passagens, num_slots):
+    """
+    Designa os postos de um slot no modo "otimo".
+
+    Os postos de prioridade são resolvidos como uma atribuição de custo mínimo
+    entre os funcionários em serviço. O custo, em ordem de importância:
+    1. quem ainda não atingiu min_passagens e não tem mais folga até a saída;
+    2. menor soma de passagens pelos postos de prioridade (equilíbrio);
+    3. menos passagens por aquele posto específico (alterna Alfa 2 / Alfa 3).
+    Os demais postos seguem a ordem da fila de rodízio.
+    """
+    peso_soma = num_slots + 1
+    peso_urgencia = peso_soma * (num_slots + 1)
+
+    def custo(func_id, indice_prioridade):
+        indice_posto = posicoes_prioridade[indice_prioridade][1]
+        valor = soma_passagens[func_id] * peso_soma + historico_posto[func_id][indice_posto]
+        faltam = min_passagens - soma_passagens[func_id]
+        if faltam > 0 and slot_saida_funcionario[func_id] - slot <= faltam:
+            valor -= peso_urgencia
+        return valor
+
+    designacoes_rodizio = [None] * num_postos_rodizio
+    escolhidos = atribuir_postos_prioritarios(fila, len(posicoes_prioridade), custo)
+    for (posicao, _), func_id in zip(posicoes_prioridade, escolhidos):
+        designacoes_rodizio[posicao] = func_id
+
+    # Postos normais: o restante da fila, na ordem do rodízio
+    ocupados = set(escolhidos)
+    restantes = (func_id for func_id in fila if func_id not in ocupados)
+    posicoes_ocupadas = {posicao for posicao, _ in posicoes_prioridade}
+    for posicao in range(num_postos_rodizio):
+        if posicao not in posicoes_ocupadas:
+            designacoes_rodizio[posicao] = next(restantes, None)
+    return designacoes_rodizio
+
+
+def gerar_escala_balanceada(hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo="rodizio", restricoes=None, usar_cache=True):
+    """
+    Gera uma escala de serviço com rodízio e alocações fixas, garantindo 
+    que os funcionários passem um número mínimo de vezes pelos postos de prioridade.
+
+    Mesmos parâmetros de gerar_escala_com_metricas; retorna só a tabela.
+    """
+    escala_tabela, _ = gerar_escala_com_metricas(
+        hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio,
+        postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo, restricoes, usar_cache
+    )
+    return escala_tabela
+
+
+def gerar_escala_com_metricas(hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo="rodizio", restricoes=None, usar_cache=True):
+    """
+    Mesmo que gerar_grade_escala, com a grade já convertida em tabela.
+
+    :param usar_cache: Reaproveita o resultado de uma chamada com as mesmas entradas
+                       (ver cache_escalas); False sempre roda o gerador.
+    :return: (escala_tabela, metricas).
+    """
+    def gerar():
+        grade, metricas = gerar_grade_escala(
+            hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio,
+            postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo, restricoes
+        )
+        return grade.tabela(), metricas
+
+    if not usar_cache:
+        return gerar()
+    import cache_escalas  # json/hashlib/instrumentacao só para quem gera (o import do gerador fica leve)
+    chave = cache_escalas.impressao_digital(
+        VERSAO_GERADOR, hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio,
+        postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo, restricoes
+    )
+    escala_tabela, metricas = cache_escalas.memorizado(chave, VERSAO_GERADOR, gerar)
+    return escala_tabela, metricas
+
+
+def gerar_grade_escala(hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo="rodizio", restricoes=None):
     """
     Gera uma escala de serviço com rodízio e alocações fixas, garantindo 
     que os funcionários passem um número mínimo de vezes pelos postos de prioridade.
+
+    O laço trabalha só com IDs inteiros: as entradas/saídas são lidas de
+    listas já agrupadas por slot e a fila de rodízio é um deque, então o
+    custo cresce linearmente com slots x postos. As métricas de equilíbrio e
+    cobertura (ver metricas_escala) são acumuladas no mesmo laço.
     
+    :param hora_fim_escala_str: Fim da escala; anterior ao início = escala que vira a
+                                meia-noite (ex.: "19:00" a "07:00"). Turnos da agenda
+                                também podem virar a meia-noite. Horários iguais não
+                                viram 24h (ver _duracao).
+    :param intervalo_minutos: Duração dos slots em minutos, uma lista com a duração de
+                              cada slot ou INTERVALO_VARIAVEL (slots de 30 a 60 min com
+                              menos trocas, ver _intervalos_variaveis).
     :param postos_prioridade: Lista de nomes de postos que devem ser balanceados (ex: ["Alfa 2", "Alfa 3"]).
     :param min_passagens: Número mínimo de vezes que cada funcionário deve passar nos postos de prioridade.
-    ...
+    :param modo: "rodizio" (padrão: último vai para o primeiro, movendo o mais necessitado
+                 para o primeiro posto prioritário), "otimo" (atribuição de custo mínimo
+                 dos postos prioritários a cada slot, ver _designar_otimo) ou "restricoes"
+                 (busca local com tempo limitado, ver busca_restricoes).
+    :param restricoes: Só no modo "restricoes": máximo de slots seguidos por posto, pausa
+                       obrigatória, postos proibidos por funcionário e tempo limite
+                       (ver busca_restricoes.RESTRICOES_PADRAO).
+    :return: (grade, metricas): a GradeEscala (IDs, sem texto) e o dicionário de
+             MetricasEscala.relatorio().
     """
-    
-    # Define a data base (a data real não importa, só o tempo)
-    hoje = datetime.now().date()
-    intervalo = timedelta(minutes=intervalo_minutos)
-    hora_fim_escala = datetime.combine(hoje, datetime.strptime(hora_fim_escala_str, "%H:%M").time())
-    
-    # 1. Preparar os tempos de entrada e saída e definir nomes de rodízio
-    tempos_entrada = {}
-    tempos_saida = {}
-    nomes_rodizio = [nome for nome in agenda_funcionarios.keys() if nome not in postos_fixos.values()]
-    
-    for nome, (start_str, end_str) in agenda_funcionarios.items():
-        tempos_entrada[nome] = datetime.combine(hoje, datetime.strptime(start_str, "%H:%M").time())
-        tempos_saida[nome] = datetime.combine(hoje, datetime.strptime(end_str, "%H:%M").time())
+    if modo not in MODOS_GERACAO:
+        raise ValueError(f"Modo de geração inválido: {modo!r}. Use um de {MODOS_GERACAO}.")
+    if restricoes and modo != "restricoes":
+        raise ValueError('As restrições só valem no modo "restricoes".')
+
+    if intervalo_minutos == INTERVALO_VARIAVEL:
+        intervalo_minutos = _intervalos_variaveis(
+            hora_inicio_escala_str, hora_fim_escala_str, postos_rodizio,
+            postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens
+        )
+    plano = _preparar_rodizio(
+        hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos,
+        postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade
+    )
+    metricas = MetricasEscala(plano["nomes_rodizio"], plano["ordem_postos_rodizio"], plano["prioridades"], min_passagens)
+    grade = _nova_grade(plano)
+    estado = _estado_inicial(plano, min_passagens)
+
+    if modo == "restricoes":
+        # O dia inteiro é resolvido de uma vez; aqui só se grava a grade e as métricas
+        designacoes, em_servico = resolver_com_restricoes(plano, min_passagens, restricoes)
+        for slot, designacoes_rodizio in enumerate(designacoes):
+            _contar_passagens(plano, estado, designacoes_rodizio, min_passagens)
+            metricas.registrar_slot(slot, em_servico[slot], designacoes_rodizio)
+            grade.definir_linha(slot, designacoes_rodizio)
+    else:
+        _executar_slots(plano, estado, 0, min_passagens, modo, grade, metricas)
+    return grade, metricas.relatorio(estado["historico_posto"], estado["soma_passagens"])
+
+
+def _intervalos_variaveis(hora_inicio_escala_str, hora_fim_escala_str, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens):
+    """
+    Durações dos slots para INTERVALO_VARIAVEL (ver intervalos_variaveis).
+
+    Só as entradas e saídas do rodízio contam como trocas de turno. A meta de
+    equilíbrio é ter vagas de prioridade suficientes para que todo o efetivo do
+    rodízio chegue a min_passagens: efetivo x min_passagens / postos de prioridade.
+    """
+    inicio = _minutos(hora_inicio_escala_str)
+    turnos = [
+        _turno_relativo(inicio, entrada, saida)
+        for nome, (entrada, saida) in agenda_funcionarios.items() if nome not in postos_fixos.values()
+    ]
+    vagas_prioridade = sum(1 for posto in postos_rodizio if posto in postos_prioridade)
+    min_slots = -(-len(turnos) * min_passagens // vagas_prioridade) if vagas_prioridade else 0
+    return planejar_intervalos(
+        0, _duracao(hora_inicio_escala_str, hora_fim_escala_str),
+        [entrada for entrada, _ in turnos], [saida for _, saida in turnos], min_slots
+    )
+
+
+def _nova_grade(plano):
+    """
+    Grade vazia do dia. Os IDs do rodízio são os mesmos da grade (nomes_rodizio
+    vem primeiro); os postos fixos já são preenchidos em todos os slots.
+    """
+    num_postos_rodizio = len(plano["ordem_postos_rodizio"])
+    nomes_rodizio = plano["nomes_rodizio"]
+    nomes_fixos = list(dict.fromkeys(plano["designacoes_fixas"]))
+    grade = GradeEscala(
+        plano["inicio"], plano["intervalo"], plano["num_slots"],
+        plano["ordem_postos_rodizio"] + plano["postos_fixos"],
+        nomes_rodizio + nomes_fixos,
+        limites=None if plano["intervalo"] else plano["limites"]
+    )
+    for coluna, nome in enumerate(plano["designacoes_fixas"], start=num_postos_rodizio):
+        grade.preencher_coluna(coluna, len(nomes_rodizio) + nomes_fixos.index(nome))
+    return grade
+
+
+def _estado_inicial(plano, min_passagens):
+    """Estado do rodízio antes do primeiro slot: fila vazia e nenhuma passagem."""
+    num_funcionarios = len(plano["nomes_rodizio"])
+    num_prioridades = len(plano["prioridades"])
+    return {
+        "fila": deque(),  # Fila de rodízio (ordem de prioridade), com IDs
+        # Histórico de passagens nos postos de prioridade, indexado por ID
+        "historico_posto": [[0] * num_prioridades for _ in range(num_funcionarios)],
+        "soma_passagens": [0] * num_funcionarios,
+        # Quem ainda está abaixo do mínimo em todos os postos de prioridade
+        "a_priorizar": [min_passagens > 0 or num_prioridades == 0] * num_funcionarios,
+    }
+
+
+def _contar_passagens(plano, estado, designacoes_rodizio, min_passagens):
+    """Soma as passagens de um slot pelos postos de prioridade ao estado."""
+    historico_posto = estado["historico_posto"]
+    for posicao, indice_posto in plano["posicoes_prioridade"]:
+        func_id = designacoes_rodizio[posicao]
+        if func_id is None:
+            continue
+        historico_posto[func_id][indice_posto] += 1
+        estado["soma_passagens"][func_id] += 1
+        if historico_posto[func_id][indice_posto] >= min_passagens:
+            estado["a_priorizar"][func_id] = False
+
+
+def _executar_slots(plano, estado, slot_inicial, min_passagens, modo, grade, metricas, slot_final=None):
+    """
+    Laço do rodízio, de slot_inicial até slot_final (exclusive; padrão: o fim
+    do dia). Grava as designações na grade e atualiza `estado` no lugar, então
+    pode parar em um slot e continuar dele depois (ver replanejar_escala_tabela).
+    """
+    num_postos_rodizio = len(plano["ordem_postos_rodizio"])
+    posicoes_prioridade = plano["posicoes_prioridade"]
+    destino_prioridade = plano["destino_prioridade"]
+
+    fila = estado["fila"]
+    historico_posto = estado["historico_posto"]
+    soma_passagens = estado["soma_passagens"]
+    a_priorizar = estado["a_priorizar"]
+
+    for slot in range(slot_inicial, plano["num_slots"] if slot_final is None else slot_final):
+
+        # 1. REMOÇÃO: Funcionários do RODÍZIO que saem neste slot
+        for func_id in plano["saidas_por_slot"][slot]:
+            fila.remove(func_id)
+
+        # 2. ADIÇÃO: Funcionários do RODÍZIO que entram neste slot
+        fila.extend(plano["entradas_por_slot"][slot])
 
-    nomes_postos = list(postos_rodizio.keys()) + list(postos_fixos.keys())
-    
-    # Mapeia a ordem dos postos de rodízio para seus nomes
-    ordem_postos_rodizio = list(postos_rodizio.keys())
-    
-    # Inicializa o histórico de passagens nos postos de prioridade
-    historico_posto = {nome: {posto: 0 for posto in postos_prioridade} for nome in nomes_rodizio}
-    
-    # Cabeçalho e inicialização do loop
-    escala_tabela = [["Horário"] + nomes_postos]
-    tempo_atual = datetime.combine(hoje, datetime.strptime(hora_inicio_escala_str, "%H:%M").time())
-    funcionarios_atuais = [] # Lista que representa a fila de rodízio (ordem de prioridade)
-
-    # Loop principal
-    while tempo_atual < hora_fim_escala:
-        
-        # 1. REMOÇÃO: Funcionários do RODÍZIO que saem
-        funcionarios_atuais = [
-            f for f in funcionarios_atuais 
-            if tempos_saida.get(f) is None or tempos_saida[f] > tempo_atual 
-        ]
-        
-        # 2. ADIÇÃO: Funcionários do RODÍZIO que entram
-        for nome, hora_entrada in tempos_entrada.items():
-            if nome in nomes_rodizio and hora_entrada == tempo_atual and nome not in funcionarios_atuais:
-                funcionarios_atuais.append(nome)
-        
         # 3. LÓGICA DE PRIORIZAÇÃO (ANTES DA DESIGNAÇÃO)
-        
-        # Identifica os funcionários que precisam passar mais vezes pelos postos prioritários
-        funcionarios_a_priorizar = []
-        for nome in funcionarios_atuais:
-            if all(historico_posto[nome][posto] < min_passagens for posto in postos_prioridade):
-                funcionarios_a_priorizar.append(nome)
-        
-        # Postos de prioridade na lista de rodízio
-        indices_prioridade = [ordem_postos_rodizio.index(p) for p in postos_prioridade if p in ordem_postos_rodizio]
-        
-        # Se houver funcionários e postos de prioridade disponíveis, ajusta a fila
-        if funcionarios_a_priorizar and indices_prioridade:
-            # Seleciona o funcionário com menor contagem para ser o próximo a ir para um posto prioritário
-            # Prioriza quem tem a menor soma de passagens pelos postos-alvo
-            def somar_passagens(nome):
-                return sum(historico_posto[nome].values())
-
-            funcionarios_a_priorizar.sort(key=somar_passagens)
-            
-            # Pega o funcionário mais necessitado e move-o para a posição que será designada ao primeiro posto prioritário
-            proximo_a_priorizar = funcionarios_a_priorizar[0]
-            
-            # Encontra a posição atual do funcionário na fila
-            try:
-                indice_atual = funcionarios_atuais.index(proximo_a_priorizar)
-            except ValueError:
-                # O funcionário ainda não está na fila, o que é improvável aqui
-                indice_atual = -1 
-            
-            # Se ele não for o primeiro a ser designado, move ele para a posição ideal
-            # A posição ideal é a primeira posição livre que corresponde a um posto prioritário
-            if indice_atual > -1 and indice_atual != indices_prioridade[0]:
-                funcionarios_atuais.pop(indice_atual)
-                funcionarios_atuais.insert(indices_prioridade[0], proximo_a_priorizar)
-        
-        # 4. DESIGNAR POSTOS
-        num_postos_rodizio = len(postos_rodizio)
-        designacoes_rodizio = funcionarios_atuais[:num_postos_rodizio]
-        
+        # O mais necessitado é quem tem a menor soma de passagens; em empate, o primeiro da fila
+        if modo == "rodizio" and destino_prioridade is not None:
+            indice_atual = -1
+            for posicao, func_id in enumerate(fila):
+                if a_priorizar[func_id] and (indice_atual < 0 or soma_passagens[func_id] < menor_soma):
+                    indice_atual, menor_soma = posicao, soma_passagens[func_id]
+
+            if indice_atual > -1 and indice_atual != destino_prioridade:
+                proximo_a_priorizar = fila[indice_atual]
+                del fila[indice_atual]
+                fila.insert(destino_prioridade, proximo_a_priorizar)
+
+        # 4. DESIGNAR POSTOS (None = VAGO)
+        if modo == "otimo":
+            designacoes_rodizio = _designar_otimo(
+                fila, slot, num_postos_rodizio, posicoes_prioridade, historico_posto,
+                soma_passagens, plano["slot_saida_funcionario"], min_passagens, plano["num_slots"]
+            )
+        else:
+            designacoes_rodizio = list(islice(fila, num_postos_rodizio))
+            designacoes_rodizio += [None] * (num_postos_rodizio - len(designacoes_rodizio))
+
         # Atualiza o histórico para o slot atual (antes do rodízio)
-        for i, nome in enumerate(designacoes_rodizio):
-            posto = ordem_postos_rodizio[i]
-            if posto in postos_prioridade and nome in historico_posto:
-                historico_posto[nome][posto] += 1
-        
-        # Marca como VAGO se não houver funcionário suficiente
-        vagos = num_postos_rodizio - len(designacoes_rodizio)
-        designacoes_rodizio += (["VAGO"] * vagos)
-
-        # Postos Fixos
-        designacoes_fixas = list(postos_fixos.values())
-        
-        # Combina a linha
-        linha_designacoes = designacoes_rodizio + designacoes_fixas
-
-        # 5. CRIA A LINHA DA ESCALA
-        horario_slot = f"{tempo_atual.strftime('%H:%M')} - {(tempo_atual + intervalo).strftime('%H:%M')}"
-        linha = [horario_slot] + linha_designacoes
-        escala_tabela.append(linha)
-        
+        _contar_passagens(plano, estado, designacoes_rodizio, min_passagens)
+        metricas.registrar_slot(slot, fila, designacoes_rodizio)
+
+        # 5. CRIA A LINHA DA ESCALA (só IDs; VAGO e o horário aparecem ao renderizar)
+        grade.definir_linha(slot, designacoes_rodizio)
+
         # 6. RODÍZIO: Último vai para o primeiro (apenas no pool de rodízio)
-        if funcionarios_atuais:
-            ultimo_funcionario = funcionarios_atuais.pop()
-            funcionarios_atuais.insert(0, ultimo_funcionario)
+        fila.rotate(1)
 
-        # 7. AVANÇA TEMPO
-        tempo_atual += intervalo
 
-    return escala_tabela
+def replanejar_escala_tabela(escala_tabela, horario_alteracao, hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade, min_passagens, modo="rodizio"):
+    """
+    Refaz uma escala já gerada a partir de horario_alteracao, mantendo as linhas anteriores.
+
+    A agenda já deve trazer a alteração (quem saiu tem saída = horario_alteracao
+    ou saiu da agenda, quem chegou tem entrada = horario_alteracao; ver
+    replanejamento.aplicar_alteracoes) e as dos replanejamentos anteriores.
+    O estado do rodízio em horario_alteracao (fila e passagens) é o exato: o
+    gerador é refeito do início até ali com essa agenda, o que dá as mesmas
+    linhas gravadas, porque no modo "rodizio" uma entrada ou saída só age a
+    partir do seu próprio slot. Se as linhas refeitas não batem com as
+    recebidas, a escala não veio desta configuração (ou deste modo) e nada é
+    recalculado. Sem alteração nenhuma, a escala devolvida é igual à recebida.
+
+    O modo "otimo" olha o horário de saída de cada um para decidir os slots
+    anteriores (urgência, ver _designar_otimo), então a escala gravada não
+    pode ser refeita com a agenda alterada; por isso só "rodizio" é aceito.
+
+    :param escala_tabela: Tabela de gerar_escala_balanceada (cabeçalho + uma linha por slot).
+    :param horario_alteracao: "HH:MM", precisa coincidir com o início de um slot.
+    :param intervalo_minutos: Como em gerar_grade_escala; com INTERVALO_VARIAVEL os
+                              slots são os da tabela recebida.
+    :return: (escala_tabela, metricas) do dia inteiro, como em gerar_escala_com_metricas.
+    """
+    if modo != "rodizio":
+        raise ValueError(f'Só escalas do modo "rodizio" podem ser replanejadas (recebido {modo!r}).')
+
+    if intervalo_minutos == INTERVALO_VARIAVEL:
+        # Os slots já gravados não mudam: as durações vêm dos próprios rótulos
+        intervalo_minutos = [_duracao(*linha[0].split(" - ")) for linha in escala_tabela[1:]]
+    plano = _preparar_rodizio(
+        hora_inicio_escala_str, hora_fim_escala_str, intervalo_minutos,
+        postos_rodizio, postos_fixos, agenda_funcionarios, postos_prioridade
+    )
+    if escala_tabela[0] != plano["cabecalho"] or len(escala_tabela) - 1 != plano["num_slots"]:
+        raise ValueError("A escala informada não corresponde aos horários e postos da configuração.")
+
+    try:
+        slot_inicial = [limite % MINUTOS_DIA for limite in plano["limites"]].index(_minutos(horario_alteracao))
+    except ValueError:
+        raise ValueError(f"O horário {horario_alteracao} não é o início de um slot da escala.") from None
+
+    metricas = MetricasEscala(plano["nomes_rodizio"], plano["ordem_postos_rodizio"], plano["prioridades"], min_passagens)
+    grade = _nova_grade(plano)
+    estado = _estado_inicial(plano, min_passagens)
+
+    # Até a alteração: refaz e confere com o que está gravado
+    _executar_slots(plano, estado, 0, min_passagens, modo, grade, metricas, slot_final=slot_inicial)
+    for slot, linha in enumerate(escala_tabela[1:slot_inicial + 1]):
+        if grade.linha(slot) != linha:
+            raise ValueError(
+                f"A escala gravada não corresponde à configuração e às alterações registradas "
+                f"(slot {linha[0]}); ela foi gerada com outra agenda ou outro modo."
+            )
+
+    _executar_slots(plano, estado, slot_inicial, min_passagens, modo, grade, metricas)
+    return grade.tabela(), metricas.relatorio(estado["historico_posto"], estado["soma_passagens"])
 
 # --- Configurações da Escala ---
 HORA_INICIO = "12:30"
@@ -159,18 +478,19 @@ FUNCIONARIOS_SCHEDULE = {
     "Henrique/Melissa": ("13:00", "18:30") 
 }
 
-# --- Geração e Exibição ---
-escala = gerar_escala_balanceada(
-    HORA_INICIO, 
-    HORA_FIM, 
-    INTERVALO_MINUTOS, 
-    POSTOS_RODIZIO, 
-    POSTOS_FIXOS, 
-    FUNCIONARIOS_SCHEDULE,
-    POSTOS_PRIORIDADE,
-    MIN_PASSAGENS
-)
-
-print("\n--- ESCALA COM PRIORIZAÇÃO DE POSTOS (Alfa 2 e Alfa 3) ---\n")
-for linha in escala:
-    print(" | ".join(linha))
\ No newline at end of file
+if __name__ == "__main__":
+    # --- Geração e Exibição (só ao rodar o arquivo; importar o módulo não gera nada) ---
+    escala = gerar_escala_balanceada(
+        HORA_INICIO, 
+        HORA_FIM, 
+        INTERVALO_MINUTOS, 
+        POSTOS_RODIZIO, 
+        POSTOS_FIXOS, 
+        FUNCIONARIOS_SCHEDULE,
+        POSTOS_PRIORIDADE,
+        MIN_PASSAGENS
+    )
+
+    print("\n--- ESCALA COM PRIORIZAÇÃO DE POSTOS (Alfa 2 e Alfa 3) ---\n")
+    for linha in escala:
+        print(" | ".join(linha))
@@ -0,0 +1,169 @@
+"""
+Exportação das escalas de um período para relatórios (folha, auditoria).
+
+Uma linha por slot e posto, já com os nomes de posto e funcionário. A leitura
+não passa por listas em memória:
+- CSV: o próprio Postgres gera o arquivo (COPY ... TO STDOUT), que é gravado
+  conforme chega.
+- Parquet: cursor no servidor (lotes de LINHAS_POR_LOTE) e um ParquetWriter que
+  grava um row group por lote. Precisa do pacote pyarrow.
+
+Uso: python exportacao_escalas.py 2026-11-01 2026-11-30 escalas.parquet [--site principal] [--formato parquet]
+"""
+import argparse
+import os
+from datetime import date
+
+LINHAS_POR_LOTE = 50_000
+FORMATOS = ("csv", "parquet")
+# Memória de ordenação só da transação de exportação: sem ela, a ordenação de
+# um mês inteiro vai para o disco (external merge) e domina o tempo da consulta
+WORK_MEM_EXPORTACAO = "64MB"
+
+# Colunas exportadas, na ordem do SELECT (VAGO = funcionario_id nulo)
+COLUNAS_EXPORTACAO = (
+    "escala_id", "site", "data_escala", "hora_inicio", "hora_fim",
+    "posto_id", "posto", "funcionario_id", "funcionario",
+)
+
+COLUNAS_SQL = """e.id, e.site, e.data_escala, ed.hora_inicio, ed.hora_fim,
+           p.id, p.nome, ed.funcionario_id, COALESCE(f.nome, 'VAGO')"""
+
+# Parquet: data e horários como inteiros (dias desde 1970, segundos do dia). O psycopg2
+# converte inteiros bem mais rápido que date/time, e o pyarrow só reinterpreta o tipo
+COLUNAS_SQL_PARQUET = """e.id, e.site, e.data_escala - DATE '1970-01-01',
+           EXTRACT(EPOCH FROM ed.hora_inicio)::integer, EXTRACT(EPOCH FROM ed.hora_fim)::integer,
+           p.id, p.nome, ed.funcionario_id, COALESCE(f.nome, 'VAGO')"""
+
+CONSULTA_EXPORTACAO = """
+    SELECT {colunas}
+    FROM escalas e
+    JOIN escala_detalhes ed ON ed.escala_id = e.id
+    JOIN postos p ON p.id = ed.posto_id
+    LEFT JOIN funcionarios f ON f.id = ed.funcionario_id
+    WHERE e.data_escala BETWEEN %(data_inicio)s AND %(data_fim)s
+      AND (%(sites)s::text[] IS NULL OR e.site = ANY(%(sites)s::text[]))
+    ORDER BY e.data_escala, e.site, ed.id
+"""
+
+
+def _parametros(data_inicio, data_fim, sites):
+    return {"data_inicio": data_inicio, "data_fim": data_fim, "sites": list(sites) if sites else None}
+
+
+def _preparar_transacao(cur):
+    cur.execute("SET LOCAL work_mem = %s", (WORK_MEM_EXPORTACAO,))
+
+
+def exportar_csv(conn, data_inicio, data_fim, destino, sites=None):
+    """
+    Grava o período em CSV (com cabeçalho) via COPY TO STDOUT.
+
+    :param sites: Lista de sites; None = todos.
+    :return: Número de linhas exportadas.
+    """
+    cur = conn.cursor()
+    try:
+        _preparar_transacao(cur)
+        consulta = cur.mogrify(CONSULTA_EXPORTACAO.format(colunas=COLUNAS_SQL), _parametros(data_inicio, data_fim, sites)).decode("utf-8")
+        with open(destino, "w", encoding="utf-8", newline="") as arquivo:
+            arquivo.write(",".join(COLUNAS_EXPORTACAO) + "\n")
+            cur.copy_expert(f"COPY ({consulta}) TO STDOUT WITH (FORMAT csv)", arquivo)
+        return cur.rowcount
+    finally:
+        cur.close()
+        conn.rollback()  # encerra a transação de leitura
+
+
+def ler_em_lotes(conn, data_inicio, data_fim, sites=None, tamanho_lote=LINHAS_POR_LOTE, colunas=COLUNAS_SQL):
+    """
+    Gera listas de até tamanho_lote tuplas (na ordem de COLUNAS_EXPORTACAO),
+    lidas por um cursor no servidor: a memória não cresce com o período.
+    """
+    with conn.cursor() as preparo:
+        _preparar_transacao(preparo)
+    cur = conn.cursor(name="exportacao_escalas")
+    cur.itersize = tamanho_lote
+    try:
+        cur.execute(CONSULTA_EXPORTACAO.format(colunas=colunas), _parametros(data_inicio, data_fim, sites))
+        while True:
+            lote = cur.fetchmany(tamanho_lote)
+            if not lote:
+                break
+            yield lote
+    finally:
+        cur.close()
+        conn.rollback()
+
+
+def exportar_parquet(conn, data_inicio, data_fim, destino, sites=None, tamanho_lote=LINHAS_POR_LOTE):
+    """
+    Grava o período em Parquet, um row group por lote do cursor.
+
+    :return: Número de linhas exportadas.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("A exportação em Parquet precisa do pacote pyarrow (pip install pyarrow).") from None
+
+    esquema = pa.schema([
+        ("escala_id", pa.int32()),
+        ("site", pa.string()),
+        ("data_escala", pa.date32()),
+        ("hora_inicio", pa.time32("s")),
+        ("hora_fim", pa.time32("s")),
+        ("posto_id", pa.int32()),
+        ("posto", pa.string()),
+        ("funcionario_id", pa.int32()),
+        ("funcionario", pa.string()),
+    ])
+    # Tipo em que cada coluna chega do banco (datas e horários como int32)
+    tipos_lidos = [pa.int32() if pa.types.is_temporal(campo.type) else campo.type for campo in esquema]
+
+    total = 0
+    with pq.ParquetWriter(destino, esquema, compression="zstd") as escritor:
+        for lote in ler_em_lotes(conn, data_inicio, data_fim, sites, tamanho_lote, COLUNAS_SQL_PARQUET):
+            # Linhas -> colunas: cada coluna vira um array tipado de uma vez
+            colunas = [
+                pa.array(valores, type=tipo).cast(campo.type)
+                for valores, tipo, campo in zip(zip(*lote), tipos_lidos, esquema)
+            ]
+            escritor.write_table(pa.Table.from_arrays(colunas, schema=esquema))
+            total += len(lote)
+    return total
+
+
+def exportar_escalas(conn, data_inicio, data_fim, destino, formato=None, sites=None):
+    """Exporta no formato pedido (ou deduzido da extensão do destino)."""
+    formato = formato or os.path.splitext(destino)[1].lstrip(".").lower()
+    if formato == "csv":
+        return exportar_csv(conn, data_inicio, data_fim, destino, sites)
+    if formato == "parquet":
+        return exportar_parquet(conn, data_inicio, data_fim, destino, sites)
+    raise ValueError(f"Formato de exportação inválido: {formato!r}. Use um de {FORMATOS}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_inicio", type=date.fromisoformat)
+    parser.add_argument("data_fim", type=date.fromisoformat)
+    parser.add_argument("destino")
+    parser.add_argument("--formato", choices=FORMATOS, help="Padrão: extensão do destino")
+    parser.add_argument("--site", action="append", dest="sites", help="Pode repetir; sem ele exporta todos")
+    args = parser.parse_args()
+
+    from conexao_banco import get_db_connection
+    conn = get_db_connection()
+    if not conn:
+        return
+    try:
+        total = exportar_escalas(conn, args.data_inicio, args.data_fim, args.destino, args.formato, args.sites)
+        print(f"{total} linhas exportadas para {args.destino}.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
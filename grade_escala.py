@@ -0,0 +1,137 @@
+"""
+Representação compacta da escala de um dia.
+
+Em vez de uma lista de listas de strings, a grade guarda uma matriz slots x postos
+de IDs inteiros (array 'h', 2 bytes por célula) e as tabelas de nomes uma única vez.
+O rótulo de horário de cada slot é calculado, não guardado (com slots de
+duração variável, guarda-se só a lista de limites). A tabela no formato
+antigo (cabeçalho + uma linha por slot) só é montada quando alguém pede (tabela()).
+"""
+import sys
+from array import array
+
+VAGO = -1  # ID de célula sem funcionário
+
+
+def _formatar_minutos(minutos):
+    """Converte minutos desde a meia-noite em "HH:MM" (com virada do dia)."""
+    return f"{(minutos // 60) % 24:02d}:{minutos % 60:02d}"
+
+
+class GradeEscala:
+    """
+    Escala de um dia: designacoes[slot * num_postos + coluna] = ID em `nomes` (ou VAGO).
+
+    As colunas seguem o cabeçalho do gerador: postos de rodízio e depois os fixos.
+    """
+
+    __slots__ = ("inicio", "intervalo", "num_slots", "limites", "postos", "nomes", "_ids", "designacoes")
+
+    def __init__(self, inicio, intervalo, num_slots, postos, nomes=(), limites=None):
+        """
+        :param inicio: Início do primeiro slot, em minutos desde a meia-noite.
+        :param intervalo: Duração de cada slot, em minutos (None se `limites` for informado).
+        :param postos: Nomes das colunas (sem "Horário").
+        :param nomes: Nomes já conhecidos, sem repetição; o índice é o ID.
+        :param limites: Slots de duração variável: início de cada slot e fim do
+                        último (num_slots + 1 valores, em minutos desde a meia-noite).
+        """
+        if limites is not None and len(limites) != num_slots + 1:
+            raise ValueError("Os limites precisam ter num_slots + 1 horários.")
+        self.inicio = inicio
+        self.intervalo = intervalo
+        self.num_slots = num_slots
+        self.limites = None if limites is None else tuple(limites)
+        self.postos = tuple(sys.intern(posto) for posto in postos)
+        self.nomes = [sys.intern(nome) for nome in nomes]
+        self._ids = None  # nome -> ID, montado só se id_do_nome() for usado
+        # 'h' (int16) cabe até 32767 nomes; acima disso usa int32
+        tipo = "h" if len(self.nomes) < 2 ** 15 - 1 else "i"
+        self.designacoes = array(tipo, [VAGO]) * (num_slots * len(self.postos))
+
+    def id_do_nome(self, nome):
+        """ID do nome na tabela da grade, acrescentando-o se for novo ("VAGO" -> VAGO)."""
+        if nome is None or nome == "VAGO":
+            return VAGO
+        if self._ids is None:
+            self._ids = {nome: func_id for func_id, nome in enumerate(self.nomes)}
+        func_id = self._ids.get(nome)
+        if func_id is None:
+            func_id = self._ids[nome] = len(self.nomes)
+            self.nomes.append(sys.intern(nome))
+        return func_id
+
+    # --- Escrita ---
+
+    def definir_linha(self, slot, ids, coluna_inicial=0):
+        """Grava IDs (None = VAGO) nas colunas a partir de coluna_inicial do slot."""
+        base = slot * len(self.postos) + coluna_inicial
+        self.designacoes[base:base + len(ids)] = array(
+            self.designacoes.typecode, [VAGO if func_id is None else func_id for func_id in ids]
+        )
+
+    def preencher_coluna(self, coluna, func_id):
+        """Mesmo ID na coluna em todos os slots (postos fixos)."""
+        num_postos = len(self.postos)
+        for slot in range(self.num_slots):
+            self.designacoes[slot * num_postos + coluna] = func_id
+
+    # --- Leitura ---
+
+    def __len__(self):
+        return self.num_slots
+
+    def horario(self, slot):
+        if self.limites is not None:
+            return f"{_formatar_minutos(self.limites[slot])} - {_formatar_minutos(self.limites[slot + 1])}"
+        minutos = self.inicio + slot * self.intervalo
+        return f"{_formatar_minutos(minutos)} - {_formatar_minutos(minutos + self.intervalo)}"
+
+    def ids_da_linha(self, slot):
+        num_postos = len(self.postos)
+        return self.designacoes[slot * num_postos:(slot + 1) * num_postos]
+
+    def _nomes_com_vago(self):
+        # VAGO (-1) indexa o último item: a tradução vira um simples __getitem__
+        return self.nomes + ["VAGO"]
+
+    def linha(self, slot, _nomes=None):
+        """Linha no formato da tabela: [horário, nome ou "VAGO" por posto]."""
+        nomes = _nomes or self._nomes_com_vago()
+        linha = [self.horario(slot)]
+        linha.extend(map(nomes.__getitem__, self.ids_da_linha(slot)))
+        return linha
+
+    def cabecalho(self):
+        return ["Horário"] + list(self.postos)
+
+    def tabela(self):
+        """Tabela completa (cabeçalho + linhas), como gerar_escala_balanceada sempre retornou."""
+        nomes = self._nomes_com_vago()
+        return [self.cabecalho()] + [self.linha(slot, nomes) for slot in range(self.num_slots)]
+
+    @classmethod
+    def da_tabela(cls, escala_tabela, inicio, intervalo, limites=None):
+        """Converte uma tabela no formato antigo (ex.: lida do banco) em grade."""
+        nomes = dict.fromkeys(nome for linha in escala_tabela[1:] for nome in linha[1:] if nome != "VAGO")
+        grade = cls(inicio, intervalo, len(escala_tabela) - 1, escala_tabela[0][1:], nomes, limites)
+        for slot, linha in enumerate(escala_tabela[1:]):
+            grade.definir_linha(slot, [grade.id_do_nome(nome) for nome in linha[1:]])
+        return grade
+
+    # --- Pickle (envio entre processos) ---
+
+    def __reduce__(self):
+        # Só os dados brutos: a matriz vai como bytes e o índice de nomes é refeito
+        return (
+            _reconstruir,
+            (self.inicio, self.intervalo, self.num_slots, self.postos, tuple(self.nomes),
+             self.designacoes.typecode, self.designacoes.tobytes(), self.limites)
+        )
+
+
+def _reconstruir(inicio, intervalo, num_slots, postos, nomes, tipo, dados, limites=None):
+    grade = GradeEscala(inicio, intervalo, num_slots, postos, nomes, limites)
+    grade.designacoes = array(tipo)
+    grade.designacoes.frombytes(dados)
+    return grade
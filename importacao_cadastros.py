@@ -0,0 +1,106 @@
+"""
+Importação em massa de funcionários e postos (JSON ou CSV).
+
+Cada linha é validada em Python; as válidas vão para o banco em um único
+INSERT ... ON CONFLICT (upsert) e as inválidas voltam com o número da linha e o motivo.
+"""
+import csv
+import io
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+
+def ler_linhas(conteudo, tipo):
+    """
+    Converte o corpo da requisição em uma lista de dicionários.
+
+    :param conteudo: Lista já decodificada (JSON) ou texto CSV com cabeçalho.
+    :param tipo: "json" ou "csv".
+    """
+    if tipo == "csv":
+        return list(csv.DictReader(io.StringIO(conteudo)))
+    if not isinstance(conteudo, list):
+        raise ValueError("O corpo JSON deve ser uma lista de objetos.")
+    return conteudo
+
+
+def _horario(valor):
+    """Aceita "HH:MM" ou "HH:MM:SS" e devolve "HH:MM:SS"."""
+    valor = str(valor or "").strip()
+    for formato in ("%H:%M", "%H:%M:%S"):
+        try:
+            return datetime.strptime(valor, formato).strftime("%H:%M:%S")
+        except ValueError:
+            pass
+    raise ValueError(f"horário inválido: {valor!r}")
+
+
+def _validar(linhas, converter):
+    """Aplica converter(linha) -> tupla; separa válidas e erros, rejeitando nomes repetidos."""
+    validas = []
+    erros = []
+    vistos = set()
+    for numero, linha in enumerate(linhas, start=1):
+        try:
+            if not isinstance(linha, dict):
+                raise ValueError("linha deve ser um objeto")
+            tupla = converter(linha)
+            if tupla[0] in vistos:
+                raise ValueError(f"nome repetido no lote: {tupla[0]!r}")
+            vistos.add(tupla[0])
+            validas.append(tupla)
+        except ValueError as e:
+            erros.append({"linha": numero, "erro": str(e)})
+    return validas, erros
+
+
+def _funcionario(linha):
+    nome = str(linha.get("nome") or "").strip()
+    if not nome or len(nome) > 100:
+        raise ValueError("nome obrigatório (até 100 caracteres)")
+    return (nome, _horario(linha.get("horario_inicio")), _horario(linha.get("horario_fim")))
+
+
+def _posto(linha):
+    nome = str(linha.get("nome") or "").strip()
+    if not nome or len(nome) > 50:
+        raise ValueError("nome obrigatório (até 50 caracteres)")
+    try:
+        prioridade = int(linha.get("prioridade") or 2)
+    except (TypeError, ValueError):
+        raise ValueError("prioridade deve ser um número (1 = Alta, 2 = Normal)")
+    return (nome, prioridade)
+
+
+def _upsert(cur, sql, validas):
+    """Executa o upsert em um único comando e conta inseridos x atualizados."""
+    if not validas:
+        return {"inseridos": 0, "atualizados": 0}
+    # xmax = 0 só em linhas recém-inseridas (em updates o Postgres preenche o xmax)
+    resultado = execute_values(cur, sql, validas, page_size=len(validas), fetch=True)
+    inseridos = sum(1 for (inserido,) in resultado if inserido)
+    return {"inseridos": inseridos, "atualizados": len(resultado) - inseridos}
+
+
+def importar_funcionarios(cur, linhas):
+    """Upsert de funcionários pelo nome. Retorna {"inseridos", "atualizados", "erros"}."""
+    validas, erros = _validar(linhas, _funcionario)
+    contagem = _upsert(cur, """
+        INSERT INTO funcionarios (nome, horario_inicio, horario_fim) VALUES %s
+        ON CONFLICT (nome) DO UPDATE
+            SET horario_inicio = EXCLUDED.horario_inicio, horario_fim = EXCLUDED.horario_fim
+        RETURNING (xmax = 0)
+    """, validas)
+    return dict(contagem, erros=erros)
+
+
+def importar_postos(cur, linhas):
+    """Upsert de postos pelo nome. Retorna {"inseridos", "atualizados", "erros"}."""
+    validas, erros = _validar(linhas, _posto)
+    contagem = _upsert(cur, """
+        INSERT INTO postos (nome, prioridade) VALUES %s
+        ON CONFLICT (nome) DO UPDATE SET prioridade = EXCLUDED.prioridade
+        RETURNING (xmax = 0)
+    """, validas)
+    return dict(contagem, erros=erros)
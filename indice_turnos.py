@@ -0,0 +1,110 @@
+"""
+Índice de turnos: quem está em serviço numa janela [inicio, fim), em tempo logarítmico.
+
+Os turnos ficam em arrays ordenados pela entrada. Para as consultas de "quem
+está em serviço", o prefixo de entradas <= t é dividido em O(log n) blocos (os
+blocos de uma árvore de Fenwick), cada um com os turnos ordenados pela saída
+em ordem decrescente: de cada bloco só se leem os turnos que servem. Uma
+consulta custa O(log n + k), k = turnos devolvidos, e montar o índice
+custa O(n log n).
+
+Os horários são minutos (inteiros) numa linha do tempo qualquer (desde a meia-noite, ou
+desde o início da escala, ver escala_com_dicionarios2._turno_relativo).
+da_agenda() monta o índice de um dia a partir de "HH:MM" (ou datetime.time):
+um turno que vira a meia-noite (19:00-07:00) termina depois de 24:00, e cada
+turno se repete no dia anterior e no seguinte.
+"""
+from bisect import bisect_left, bisect_right
+
+MINUTOS_DIA = 24 * 60
+
+
+def minutos(horario):
+    """ "HH:MM" ou datetime.time -> minutos desde a meia-noite."""
+    if isinstance(horario, str):
+        horas, minutos_ = horario.split(":")[:2]
+        return int(horas) * 60 + int(minutos_)
+    return horario.hour * 60 + horario.minute
+
+
+class IndiceTurnos:
+    """
+    Turnos (chave, entrada, saida), com entrada < saida em minutos.
+
+    Chaves iguais podem aparecer mais de uma vez (o mesmo turno em dias
+    diferentes); as consultas devolvem cada chave uma vez, na ordem de entrada.
+    """
+
+    __slots__ = ("chaves", "entradas", "saidas", "_blocos")
+
+    def __init__(self, turnos):
+        # Ordem estável: entradas no mesmo minuto ficam na ordem recebida
+        ordenados = sorted(turnos, key=lambda turno: turno[1])
+        self.chaves = [chave for chave, _, _ in ordenados]
+        self.entradas = [entrada for _, entrada, _ in ordenados]
+        self.saidas = [saida for _, _, saida in ordenados]
+        self._blocos = None  # montados na primeira consulta por saída (entradas_em não precisa)
+
+    @classmethod
+    def da_agenda(cls, agenda):
+        """
+        Índice de um dia a partir de {chave: (entrada, saida)} em "HH:MM" ou time.
+        O turno é diário: entra também no dia anterior (madrugada de hoje, se ele
+        vira a meia-noite) e no seguinte (janelas que passam de 24:00).
+        """
+        turnos = []
+        for dia in (-1, 0, 1):
+            for chave, (entrada, saida) in agenda.items():
+                inicio = minutos(entrada)
+                fim = inicio + ((minutos(saida) - inicio) % MINUTOS_DIA or MINUTOS_DIA)
+                turnos.append((chave, inicio + dia * MINUTOS_DIA, fim + dia * MINUTOS_DIA))
+        return cls(turnos)
+
+    def __len__(self):
+        return len(self.chaves)
+
+    def _saida_ao_menos(self, quantidade, saida_minima):
+        """Posições entre as `quantidade` primeiras entradas com saída >= saida_minima."""
+        if self._blocos is None:
+            # _blocos[i] (1 a n) = posições (i - menor_bit(i), i] do array, por saída decrescente
+            self._blocos = [None] + [
+                sorted(range(i - (i & -i), i), key=lambda posicao: -self.saidas[posicao])
+                for i in range(1, len(self.saidas) + 1)
+            ]
+        posicoes = []
+        i = quantidade
+        while i > 0:
+            for posicao in self._blocos[i]:
+                if self.saidas[posicao] < saida_minima:
+                    break
+                posicoes.append(posicao)
+            i -= i & -i
+        posicoes.sort()
+        return posicoes
+
+    def _chaves(self, posicoes):
+        return list(dict.fromkeys(self.chaves[posicao] for posicao in posicoes))
+
+    def cobrem(self, inicio, fim):
+        """Chaves em serviço durante toda a janela [inicio, fim): entrada <= inicio e saída >= fim."""
+        return self._chaves(self._saida_ao_menos(bisect_left(self.entradas, inicio + 1), fim))
+
+    def presentes(self, inicio, fim):
+        """Chaves em serviço em algum momento de [inicio, fim): entrada < fim e saída > inicio."""
+        return self._chaves(self._saida_ao_menos(bisect_left(self.entradas, fim), inicio + 1))
+
+    def entradas_em(self, inicio, fim):
+        """Chaves que entram em [inicio, fim), por horário de entrada."""
+        return self._chaves(range(bisect_left(self.entradas, inicio), bisect_left(self.entradas, fim)))
+
+    def proxima_entrada(self, depois_de):
+        """Primeiro horário de entrada > depois_de, ou None (busca binária nas entradas ordenadas)."""
+        posicao = bisect_right(self.entradas, depois_de)
+        return self.entradas[posicao] if posicao < len(self.entradas) else None
+
+    def turno_em(self, chave_procurada, instante):
+        """(entrada, saida) do turno da chave em serviço no instante, ou None."""
+        for posicao in self._saida_ao_menos(bisect_left(self.entradas, instante + 1), instante + 1):
+            if self.chaves[posicao] == chave_procurada:
+                return self.entradas[posicao], self.saidas[posicao]
+        return None
@@ -0,0 +1,278 @@
+"""
+Instrumentação da API e do acesso ao banco, sem dependências externas.
+
+- Latência por rota: histograma por método, regra da rota e status
+  (before_request/after_request do Flask, ver instrumentar_app; MedicaoASGI
+  na API assíncrona).
+- Tempo por comando SQL: eventos before/after_cursor_execute do SQLAlchemy
+  (rotas) e conexao_banco.cursor_instrumentado(), o cursor psycopg2 de todas as
+  conexões do engine (funções de gestao_escala, persistência, exportação). Um
+  comando feito pelo SQLAlchemy é medido só pelos eventos, nunca duas vezes.
+  No asyncpg, um query logger por conexão (instrumentar_conexao_async).
+- Comandos acima de SQL_LENTO_SEGUNDOS vão para o logger "escala.sql".
+- Operações longas (geração, replanejamento, leitura do monitor) via @cronometrado.
+- exportar_prometheus() gera o texto do /metrics (formato de exposição 0.0.4).
+
+Só usa a biblioteca padrão: pode ser importado pelo gerador e pelos workers
+sem carregar Flask, SQLAlchemy, psycopg2 ou asyncpg.
+"""
+import logging
+import os
+import threading
+import time as relogio
+from bisect import bisect_left
+from functools import wraps
+
+CO_COROUTINE = 0x80  # flag de `async def` (inspect.CO_COROUTINE, sem importar inspect)
+
+# Limites superiores dos baldes, em segundos (o +Inf é implícito)
+BALDES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_LENTO_SEGUNDOS = float(os.environ.get("ESCALA_SQL_LENTO_MS", "200")) / 1000
+TAMANHO_MAXIMO_LOG_SQL = 500
+# Rótulo "operacao" do SQL: a primeira palavra do comando, se for uma destas (senão "OUTRO")
+OPERACOES_SQL = frozenset((
+    "SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY", "DECLARE", "SET", "SHOW",
+    "BEGIN", "COMMIT", "ROLLBACK", "LISTEN", "NOTIFY", "CREATE", "ALTER", "DROP", "TRUNCATE",
+))
+
+logger_sql = logging.getLogger("escala.sql")
+
+_metricas = []  # registro, na ordem de criação
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _rotulos(nomes, valores, extra=""):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+class Histograma:
+    """Histograma com rótulos; observar() é seguro entre threads."""
+
+    def __init__(self, nome, ajuda, rotulos=(), baldes=BALDES_SEGUNDOS):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self.baldes = tuple(baldes)
+        self._series = {}  # valores dos rótulos -> [contagem por balde (+Inf no fim), soma]
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def observar(self, valor, *rotulos):
+        indice = bisect_left(self.baldes, valor)  # primeiro balde com limite >= valor
+        with self._lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                serie = self._series[rotulos] = [[0] * (len(self.baldes) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        with self._lock:
+            series = [(rotulos, list(contagens), soma) for rotulos, (contagens, soma) in self._series.items()]
+        for rotulos, contagens, soma in sorted(series):
+            acumulado = 0
+            for limite, contagem in zip(self.baldes + ("+Inf",), contagens):
+                acumulado += contagem
+                le = 'le="' + (limite if isinstance(limite, str) else repr(float(limite))) + '"'
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, rotulos, le)} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, rotulos)} {soma!r}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, rotulos)} {acumulado}")
+        return linhas
+
+
+class Contador:
+    """Contador monotônico com rótulos."""
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+        _metricas.append(self)
+
+    def incrementar(self, *rotulos, quantidade=1):
+        with self._lock:
+            self._valores[rotulos] = self._valores.get(rotulos, 0) + quantidade
+
+    def valor(self, *rotulos):
+        with self._lock:
+            return self._valores.get(rotulos, 0)
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        with self._lock:
+            valores = sorted(self._valores.items())
+        linhas.extend(f"{self.nome}{_rotulos(self.rotulos, rotulos)} {valor}" for rotulos, valor in valores)
+        return linhas
+
+
+class Medidor:
+    """Valor lido na hora da exportação (ex.: conexões do pool em uso)."""
+
+    def __init__(self, nome, ajuda, ler):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.ler = ler
+        _metricas.append(self)
+
+    def exportar(self):
+        return [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} gauge", f"{self.nome} {self.ler()}"]
+
+
+def exportar_prometheus():
+    """Todas as métricas registradas, em texto no formato do Prometheus."""
+    linhas = []
+    for metrica in _metricas:
+        linhas.extend(metrica.exportar())
+    return "\n".join(linhas) + "\n"
+
+
+LATENCIA_ROTAS = Histograma(
+    "escala_http_requisicao_segundos", "Latência das requisições por rota.", ("metodo", "rota", "status")
+)
+DURACAO_SQL = Histograma("escala_sql_segundos", "Duração dos comandos SQL por operação.", ("operacao",))
+SQL_LENTOS = Contador("escala_sql_lentos_total", "Comandos SQL acima do limite de lentidão.", ("operacao",))
+DURACAO_OPERACOES = Histograma(
+    "escala_operacao_segundos", "Duração das operações de geração e leitura de escalas.", ("operacao",)
+)
+
+
+# --- SQL ---
+
+def _texto_sql(comando, cursor=None):
+    if isinstance(comando, bytes):
+        return comando.decode("utf-8", "replace")
+    if not isinstance(comando, str) and hasattr(comando, "as_string"):  # psycopg2.sql.Composed
+        return comando.as_string(cursor)
+    return str(comando)
+
+
+def registrar_sql(comando, duracao, cursor=None):
+    """Soma um comando ao histograma (pela primeira palavra) e registra se for lento."""
+    texto = _texto_sql(comando, cursor)
+    palavras = texto.split(None, 1)
+    operacao = palavras[0].rstrip(";").upper() if palavras else ""  # "BEGIN;" do asyncpg
+    if operacao not in OPERACOES_SQL:
+        operacao = "OUTRO"
+    DURACAO_SQL.observar(duracao, operacao)
+    if duracao >= SQL_LENTO_SEGUNDOS:
+        SQL_LENTOS.incrementar(operacao)
+        logger_sql.warning("SQL lento (%.3f s): %s", duracao, " ".join(texto.split())[:TAMANHO_MAXIMO_LOG_SQL])
+
+
+def instrumentar_engine(engine):
+    """Liga os eventos de cursor do SQLAlchemy ao histograma de SQL."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicios_sql", []).append(relogio.perf_counter())
+        if hasattr(cursor, "medido_pelo_sqlalchemy"):  # CursorInstrumentado
+            cursor.medido_pelo_sqlalchemy = True
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        registrar_sql(statement, relogio.perf_counter() - conn.info["inicios_sql"].pop())
+        if hasattr(cursor, "medido_pelo_sqlalchemy"):
+            cursor.medido_pelo_sqlalchemy = False
+
+    @event.listens_for(engine, "handle_error")
+    def _erro(contexto):
+        inicios = contexto.connection.info.get("inicios_sql") if contexto.connection is not None else None
+        if inicios:
+            registrar_sql(contexto.statement or "?", relogio.perf_counter() - inicios.pop())
+        if hasattr(contexto.cursor, "medido_pelo_sqlalchemy"):
+            contexto.cursor.medido_pelo_sqlalchemy = False
+
+
+def instrumentar_conexao_async(conn):
+    """Mede os comandos de uma conexão asyncpg (use como `init` do pool)."""
+    conn.add_query_logger(lambda registro: registrar_sql(registro.query, registro.elapsed))
+
+
+# --- Flask, ASGI e operações ---
+
+def instrumentar_app(app):
+    """Mede a latência de todas as rotas do app (inclusive as que terminam em 500)."""
+    from flask import g, request
+
+    @app.before_request
+    def _inicio_requisicao():
+        g.inicio_requisicao = relogio.perf_counter()
+
+    @app.after_request
+    def _fim_requisicao(resposta):
+        inicio = g.pop("inicio_requisicao", None)
+        if inicio is not None:
+            rota = request.url_rule.rule if request.url_rule is not None else "(sem rota)"
+            LATENCIA_ROTAS.observar(
+                relogio.perf_counter() - inicio, request.method, rota, str(resposta.status_code)
+            )
+        return resposta
+
+
+class MedicaoASGI:
+    """
+    Middleware ASGI com a mesma latência por rota do instrumentar_app. A rota é o
+    modelo do Starlette (scope["route"]); o tempo vai até o início da resposta,
+    como no after_request do Flask.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        inicio = relogio.perf_counter()
+        respondeu = False
+
+        def observar(status):
+            rota = getattr(scope.get("route"), "path", "(sem rota)")
+            LATENCIA_ROTAS.observar(relogio.perf_counter() - inicio, scope["method"], rota, str(status))
+
+        async def enviar(mensagem):
+            nonlocal respondeu
+            if mensagem["type"] == "http.response.start":
+                respondeu = True
+                observar(mensagem["status"])
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        except Exception:
+            if not respondeu:
+                observar(500)
+            raise
+
+
+def cronometrado(operacao):
+    """Decorador: soma a duração de cada chamada em escala_operacao_segundos{operacao}."""
+    def decorador(funcao):
+        if funcao.__code__.co_flags & CO_COROUTINE:
+            @wraps(funcao)
+            async def medida_async(*args, **kwargs):
+                inicio = relogio.perf_counter()
+                try:
+                    return await funcao(*args, **kwargs)
+                finally:
+                    DURACAO_OPERACOES.observar(relogio.perf_counter() - inicio, operacao)
+            return medida_async
+
+        @wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = relogio.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                DURACAO_OPERACOES.observar(relogio.perf_counter() - inicio, operacao)
+        return medida
+    return decorador
@@ -0,0 +1,110 @@
+"""
+Slots de duração variável para o rodízio (regra de 30 a 60 minutos).
+
+Cada início de slot é uma troca de postos, então menos slots = menos passagens
+de serviço. planejar_intervalos escolhe os limites dos slots por programação
+dinâmica sobre uma grade de `passo` minutos, olhando só os horários em que o
+efetivo muda (entradas e saídas):
+1. Cada entrada deve cair no início de um slot (quem chega no meio de um slot
+   só assume posto no seguinte), então uma entrada dentro de um slot custa PESO_ENTRADA.
+2. Uma saída dentro de um slot prende o funcionário até o fim dele: custa PESO_SAIDA.
+3. Cada slot custa 1 (uma troca). Com efetivo estável os slots ficam longos;
+   perto das trocas de turno ficam curtos para coincidir com os horários.
+4. Meta de equilíbrio: pelo menos min_slots slots, para que haja passagens
+   suficientes pelos postos de prioridade. Se não couber, usa o máximo possível.
+"""
+INTERVALO_MINIMO = 30
+INTERVALO_MAXIMO = 60
+PASSO_PADRAO = 5
+
+# Custos, na mesma unidade de "uma troca a mais"
+PESO_ENTRADA = 100
+PESO_SAIDA = 1
+PESO_EXCESSO = 0.001  # por minuto do último slot além do fim da escala (desempate)
+
+
+def _contagem_acumulada(horarios, tamanho):
+    """acumulado[x] = quantos horários (em minutos relativos) são menores que x."""
+    contagem = [0] * (tamanho + 1)
+    for horario in horarios:
+        if 0 < horario < tamanho:
+            contagem[horario + 1] += 1
+    for x in range(1, tamanho + 1):
+        contagem[x] += contagem[x - 1]
+    return contagem
+
+
+def planejar_intervalos(inicio, fim, entradas, saidas, min_slots=0,
+                        minimo=INTERVALO_MINIMO, maximo=INTERVALO_MAXIMO, passo=PASSO_PADRAO):
+    """
+    Escolhe a duração de cada slot entre `inicio` e `fim`.
+
+    :param inicio: Início da escala, em minutos desde a meia-noite.
+    :param fim: Fim da escala, em minutos desde a meia-noite.
+    :param entradas: Horários de entrada do efetivo do rodízio, em minutos.
+    :param saidas: Horários de saída do efetivo do rodízio, em minutos.
+    :param min_slots: Número mínimo de slots desejado (meta de equilíbrio).
+    :param passo: Granularidade dos limites; entradas fora dela caem no slot seguinte.
+    :return: Lista com a duração (minutos) de cada slot; o último pode passar de `fim`.
+    """
+    if passo <= 0 or minimo <= 0 or minimo > maximo:
+        raise ValueError("Os limites de duração dos slots são inválidos.")
+    duracao = fim - inicio
+    if duracao <= 0:
+        return []
+
+    menor_passo = -(-minimo // passo)
+    maior_passo = maximo // passo
+    if menor_passo > maior_passo:
+        raise ValueError(f"Nenhum múltiplo de {passo} minutos entre {minimo} e {maximo}.")
+    ultimo_inicio = -(-duracao // passo) - 1       # último ponto da grade antes de `fim`
+    num_pontos = ultimo_inicio + maior_passo + 1
+    tamanho = num_pontos * passo
+    entradas_antes = _contagem_acumulada([e - inicio for e in entradas], tamanho)
+    saidas_antes = _contagem_acumulada([s - inicio for s in saidas], tamanho)
+
+    def custo_slot(a, b):
+        # Eventos estritamente dentro de (a, b), em minutos relativos
+        dentro_entradas = entradas_antes[b] - entradas_antes[a + 1]
+        dentro_saidas = saidas_antes[b] - saidas_antes[a + 1]
+        return PESO_ENTRADA * dentro_entradas + PESO_SAIDA * dentro_saidas
+
+    # melhor[j] = {num_slots: (custo, ponto anterior)} para slots cobrindo [0, j * passo]
+    melhor = [dict() for _ in range(num_pontos + 1)]
+    melhor[0][0] = (0, None)
+    for i in range(ultimo_inicio + 1):
+        if not melhor[i]:
+            continue
+        for j in range(i + menor_passo, min(i + maior_passo, num_pontos) + 1):
+            custo = custo_slot(i * passo, j * passo)
+            if j * passo > duracao:
+                custo += PESO_EXCESSO * (j * passo - duracao)
+            destino = melhor[j]
+            for quantidade, (custo_anterior, _) in melhor[i].items():
+                total = custo_anterior + custo
+                atual = destino.get(quantidade + 1)
+                if atual is None or total < atual[0]:
+                    destino[quantidade + 1] = (total, i)
+
+    # Finais válidos: último limite em `fim` ou depois dele
+    finais = [
+        (quantidade + custo, quantidade, j)
+        for j in range(-(-duracao // passo), num_pontos + 1)
+        for quantidade, (custo, _) in melhor[j].items()
+    ]
+    if not finais:
+        raise ValueError("Não há divisão da escala em slots dentro dos limites de duração.")
+    dentro_da_meta = [final for final in finais if final[1] >= min_slots]
+    if dentro_da_meta:
+        _, quantidade, j = min(dentro_da_meta)
+    else:
+        _, quantidade, j = min(finais, key=lambda final: (-final[1], final[0]))
+
+    # Refaz o caminho de trás para frente
+    limites = [j]
+    while quantidade:
+        j = melhor[j][quantidade][1]
+        quantidade -= 1
+        limites.append(j)
+    limites.reverse()
+    return [(b - a) * passo for a, b in zip(limites, limites[1:])]
@@ -0,0 +1,201 @@
+"""
+Geração em lote: vários dias e vários sites de uma vez.
+
+A geração (CPU) é distribuída em um pool de processos; a gravação acontece no
+processo principal, em ordem, com o caminho em massa de persistencia_escala.
+Cada (site, data) tem uma semente fixa, então o resultado é o mesmo com 1 ou N workers.
+
+Uso: python lote_escalas.py 2026-11-01 2026-11-30 [--sites sites.json] [--workers 4] [--modo otimo]
+"""
+import hashlib
+import json
+import random
+from datetime import date, timedelta
+
+from escala_com_dicionarios2 import gerar_grade_escala
+
+
+def semente_escala(site, data_escala):
+    """Semente determinística de um (site, data), igual em qualquer processo."""
+    digest = hashlib.sha256(f"{site}|{data_escala.isoformat()}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def datas_do_intervalo(intervalo_datas):
+    """Aceita (data_inicio, data_fim) inclusive ou qualquer iterável de datas."""
+    if isinstance(intervalo_datas, tuple) and len(intervalo_datas) == 2 and all(isinstance(d, date) for d in intervalo_datas):
+        inicio, fim = intervalo_datas
+        return [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+    return list(intervalo_datas)
+
+
+def agenda_do_dia(config, site, data_escala):
+    """
+    Agenda na ordem usada para o (site, data). A semente embaralha a ordem de
+    chegada, variando quem começa em cada posto de um dia para o outro (mas
+    sempre igual para o mesmo dia).
+    """
+    agenda = list(config["agenda_funcionarios"].items())
+    random.Random(semente_escala(site, data_escala)).shuffle(agenda)
+    return dict(agenda)
+
+
+def _gerar_tarefa(tarefa):
+    """Roda em um worker: gera a escala de um (site, data)."""
+    site, data_escala, config, modo = tarefa
+
+    grade, metricas = gerar_grade_escala(
+        config["hora_inicio"],
+        config["hora_fim"],
+        config["intervalo_minutos"],
+        config["postos_rodizio"],
+        config["postos_fixos"],
+        agenda_do_dia(config, site, data_escala),
+        config["postos_prioridade"],
+        config["min_passagens"],
+        modo=modo,
+        restricoes=config.get("restricoes")
+    )
+    # A grade (matriz de IDs) volta para o processo principal bem menor que a tabela de textos
+    return site, data_escala, grade, metricas
+
+
+def gerar_escalas(intervalo_datas, sites, workers=None, modo="rodizio", conn=None, metodo="copy"):
+    """
+    Gera (e opcionalmente grava) as escalas de todos os sites em todas as datas.
+
+    :param intervalo_datas: (data_inicio, data_fim) inclusive, ou lista de datas.
+    :param sites: {nome_do_site: config}, onde config tem as chaves hora_inicio, hora_fim,
+                  intervalo_minutos, postos_rodizio, postos_fixos, agenda_funcionarios,
+                  postos_prioridade e min_passagens (e, no modo "restricoes", restricoes).
+                  intervalo_minutos pode ser "variavel" (ver gerar_grade_escala).
+    :param workers: Processos do pool (None = número de CPUs; 1 = tudo no processo atual).
+    :param conn: Conexão psycopg2; se informada, as escalas são gravadas e as que
+                 já existem no banco são puladas.
+    :return: {(site, data): GradeEscala} das escalas geradas (grade.tabela() dá o formato de tabela).
+    """
+    datas = datas_do_intervalo(intervalo_datas)
+    tarefas = [
+        (site, data_escala, config, modo)
+        for site, config in sorted(sites.items())
+        for data_escala in datas
+    ]
+
+    if conn is not None:
+        tarefas = _remover_existentes(conn, tarefas)
+
+    if workers == 1 or len(tarefas) <= 1:
+        resultados = list(map(_gerar_tarefa, tarefas))
+    else:
+        # Importado aqui: os workers (e quem só gera em um processo) não pagam o multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            resultados = list(executor.map(_gerar_tarefa, tarefas, chunksize=8))
+
+    escalas = {(site, data_escala): grade for site, data_escala, grade, _ in resultados}
+
+    if conn is not None:
+        metricas = {(site, data_escala): relatorio for site, data_escala, _, relatorio in resultados}
+        _gravar_lote(conn, escalas, metodo, metricas)
+    return escalas
+
+
+def _remover_existentes(conn, tarefas):
+    """Tira do lote os (site, data) que já têm escala gravada, com uma única consulta."""
+    if not tarefas:
+        return tarefas
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT site, data_escala FROM escalas WHERE site = ANY(%s) AND data_escala BETWEEN %s AND %s",
+            (
+                sorted({t[0] for t in tarefas}),
+                min(t[1] for t in tarefas),
+                max(t[1] for t in tarefas)
+            )
+        )
+        existentes = set(cur.fetchall())
+    finally:
+        cur.close()
+    for site, data_escala in sorted(existentes):
+        print(f"Atenção: Já existe uma escala para {site} em {data_escala}. Pulando.")
+    return [t for t in tarefas if (t[0], t[1]) not in existentes]
+
+
+def _gravar_lote(conn, escalas, metodo, metricas):
+    """
+    Grava as escalas (com suas métricas) na ordem (site, data),
+    lendo os IDs de postos/funcionários uma vez só.
+    """
+    from persistencia_escala import carregar_ids, detalhes_da_grade, salvar_escala
+
+    cur = conn.cursor()
+    try:
+        postos_ids, funcionarios_ids = carregar_ids(
+            cur,
+            {posto for grade in escalas.values() for posto in grade.postos},
+            {nome for grade in escalas.values() for nome in grade.nomes}
+        )
+    finally:
+        cur.close()
+
+    for (site, data_escala), grade in sorted(escalas.items()):
+        detalhes = detalhes_da_grade(grade, postos_ids, funcionarios_ids)
+        escala_id = salvar_escala(
+            conn, data_escala, detalhes, metodo=metodo, site=site, metricas=metricas[(site, data_escala)]
+        )
+        print(f"Escala {site} {data_escala} salva (ID {escala_id}, {len(detalhes)} linhas).")
+
+
+def config_exemplo():
+    """Configuração de exemplo (a mesma de escala_com_dicionarios2) como um único site."""
+    import escala_com_dicionarios2 as exemplo
+    return {
+        "hora_inicio": exemplo.HORA_INICIO,
+        "hora_fim": exemplo.HORA_FIM,
+        "intervalo_minutos": exemplo.INTERVALO_MINUTOS,
+        "postos_rodizio": exemplo.POSTOS_RODIZIO,
+        "postos_fixos": exemplo.POSTOS_FIXOS,
+        "agenda_funcionarios": exemplo.FUNCIONARIOS_SCHEDULE,
+        "postos_prioridade": exemplo.POSTOS_PRIORIDADE,
+        "min_passagens": exemplo.MIN_PASSAGENS
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_inicio", type=date.fromisoformat)
+    parser.add_argument("data_fim", type=date.fromisoformat)
+    parser.add_argument("--sites", help="JSON {site: config}; sem ele usa a configuração de exemplo")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--modo", default="rodizio")
+    parser.add_argument("--sem-gravar", action="store_true", help="Só gera, não grava no banco")
+    args = parser.parse_args()
+
+    if args.sites:
+        with open(args.sites, encoding="utf-8") as arquivo:
+            sites = json.load(arquivo)
+    else:
+        sites = {"principal": config_exemplo()}
+
+    conn = None
+    if not args.sem_gravar:
+        from conexao_banco import get_db_connection
+        conn = get_db_connection()
+        if not conn:
+            return
+
+    try:
+        escalas = gerar_escalas(
+            (args.data_inicio, args.data_fim), sites, workers=args.workers, modo=args.modo, conn=conn
+        )
+        print(f"{len(escalas)} escalas geradas.")
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
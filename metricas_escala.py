@@ -0,0 +1,102 @@
+"""
+Métricas de equilíbrio e cobertura calculadas durante a geração da escala.
+
+O gerador chama registrar_slot() a cada slot, com os IDs já designados; no
+fim, relatorio() monta o resumo a partir dos contadores, sem reler a tabela.
+"""
+
+
+def gini(valores):
+    """Coeficiente de Gini (0 = todos iguais, perto de 1 = tudo com um só)."""
+    valores = sorted(valores)
+    total = sum(valores)
+    n = len(valores)
+    if n == 0 or total == 0:
+        return 0.0
+    acumulado = sum(i * valor for i, valor in enumerate(valores, start=1))
+    return (2 * acumulado) / (n * total) - (n + 1) / n
+
+
+def variancia(valores):
+    """Variância populacional."""
+    n = len(valores)
+    if n == 0:
+        return 0.0
+    media = sum(valores) / n
+    return sum((valor - media) ** 2 for valor in valores) / n
+
+
+class MetricasEscala:
+    """Contadores incrementais de uma escala em geração (IDs inteiros do gerador)."""
+
+    def __init__(self, nomes_rodizio, postos_rodizio, prioridades, min_passagens):
+        self.nomes_rodizio = nomes_rodizio
+        self.postos_rodizio = postos_rodizio
+        self.prioridades = prioridades
+        self.min_passagens = min_passagens
+
+        num_funcionarios = len(nomes_rodizio)
+        self.slots = 0
+        self.vagas_por_posto = [0] * len(postos_rodizio)
+        self.carga = [0] * num_funcionarios              # slots trabalhados
+        self.presente = [False] * num_funcionarios       # esteve na fila em algum slot
+        self.ultimo_posto = [-1] * num_funcionarios
+        self.ultimo_slot = [-2] * num_funcionarios
+        self.sequencia = [0] * num_funcionarios          # slots seguidos no mesmo posto
+        self.maior_sequencia = (0, None, None)           # (slots, func_id, posição do posto)
+
+    def registrar_slot(self, slot, fila, designacoes_rodizio):
+        """Atualiza os contadores com as designações de um slot (None = VAGO)."""
+        self.slots += 1
+        for func_id in fila:
+            self.presente[func_id] = True
+
+        for posicao, func_id in enumerate(designacoes_rodizio):
+            if func_id is None:
+                self.vagas_por_posto[posicao] += 1
+                continue
+            self.carga[func_id] += 1
+            if self.ultimo_posto[func_id] == posicao and self.ultimo_slot[func_id] == slot - 1:
+                self.sequencia[func_id] += 1
+            else:
+                self.sequencia[func_id] = 1
+            self.ultimo_posto[func_id] = posicao
+            self.ultimo_slot[func_id] = slot
+            if self.sequencia[func_id] > self.maior_sequencia[0]:
+                self.maior_sequencia = (self.sequencia[func_id], func_id, posicao)
+
+    def relatorio(self, historico_posto, soma_passagens):
+        """
+        Resumo final em tipos simples (pronto para JSON).
+
+        :param historico_posto: Passagens por posto de prioridade, por ID (mantido pelo gerador).
+        :param soma_passagens: Total de passagens prioritárias por ID.
+        """
+        presentes = [func_id for func_id, presente in enumerate(self.presente) if presente]
+        cargas = [self.carga[func_id] for func_id in presentes]
+        prioritarias = [soma_passagens[func_id] for func_id in presentes]
+        slots_seguidos, func_id, posicao = self.maior_sequencia
+
+        return {
+            "slots": self.slots,
+            "vagas_total": sum(self.vagas_por_posto),
+            "vagas_por_posto": dict(zip(self.postos_rodizio, self.vagas_por_posto)),
+            "carga_por_funcionario": {self.nomes_rodizio[f]: self.carga[f] for f in presentes},
+            "passagens_prioritarias": {
+                self.nomes_rodizio[f]: dict(zip(self.prioridades, historico_posto[f])) for f in presentes
+            },
+            # Mesma regra do gerador (a_priorizar): abaixo do mínimo em cada posto de prioridade
+            "abaixo_do_minimo": [
+                self.nomes_rodizio[f] for f in presentes
+                if all(passagens < self.min_passagens for passagens in historico_posto[f])
+            ],
+            "max_consecutivos_mesmo_posto": {
+                "slots": slots_seguidos,
+                "funcionario": None if func_id is None else self.nomes_rodizio[func_id],
+                "posto": None if posicao is None else self.postos_rodizio[posicao]
+            },
+            "carga_variancia": variancia(cargas),
+            "carga_gini": gini(cargas),
+            "prioritarios_variancia": variancia(prioritarias),
+            "prioritarios_gini": gini(prioritarias)
+        }
@@ -0,0 +1,191 @@
+"""
+Atualização dos monitores por push: Postgres LISTEN/NOTIFY + Server-Sent Events.
+
+Quem grava (salvar_escala, rotas de cadastro) emite um NOTIFY na mesma transação.
+Um único ouvinte por processo Flask recebe a notificação, invalida os caches do
+monitor e dos cadastros e repassa o evento para todas as telas conectadas. O ouvinte também avisa
+as telas quando o relógio cruza o início de um slot da escala do dia.
+Assim o banco só é consultado quando algo muda, não a cada tela x atualização.
+"""
+import json
+import queue
+import select
+import threading
+import time as relogio
+from datetime import date, datetime
+
+import cache_cadastros
+import cache_monitor
+
+CANAL_ESCALA = "escala_alterada"
+CANAL_CADASTRO = "cadastro_alterado"
+
+
+def notificar(cur, canal, **dados):
+    """Emite um NOTIFY pelo cursor psycopg2 (entregue quando a transação fizer commit)."""
+    cur.execute("SELECT pg_notify(%s, %s)", (canal, json.dumps(dados, default=str)))
+
+
+def notificar_sessao(session, canal, **dados):
+    """Mesmo que notificar(), para a sessão do Flask-SQLAlchemy."""
+    from sqlalchemy import text
+    session.execute(
+        text("SELECT pg_notify(:canal, :dados)"),
+        {"canal": canal, "dados": json.dumps(dados, default=str)}
+    )
+
+
+async def notificar_async(conn, canal, **dados):
+    """Mesmo que notificar(), para uma conexão asyncpg (API assíncrona)."""
+    await conn.execute("SELECT pg_notify($1, $2)", canal, json.dumps(dados, default=str))
+
+
+def evento_da_notificacao(canal, payload):
+    """Invalida o cache do monitor conforme a notificação e devolve o evento para as telas."""
+    try:
+        dados = json.loads(payload or "{}")
+    except ValueError:
+        dados = {}
+
+    if canal == CANAL_ESCALA:
+        cache_monitor.invalidar(dados.get("site"), dados.get("data"))
+    else:
+        cache_cadastros.invalidar()
+        cache_monitor.invalidar()
+    return dict(dados, tipo=canal)
+
+
+def inicio_de_slot(grade, minuto):
+    """Horário ("HH:MM - HH:MM") do slot da grade que começa no minuto dado, ou None."""
+    for slot in grade["slots"]:
+        if _minutos(slot["horario"].split(" - ")[0]) == minuto:
+            return slot["horario"]
+    return None
+
+
+def _minutos(horario):
+    """ "HH:MM" -> minutos desde a meia-noite."""
+    horas, minutos = horario.split(":")
+    return int(horas) * 60 + int(minutos)
+
+
+class OuvinteEscalas(threading.Thread):
+    """
+    Thread que escuta os canais do Postgres e distribui eventos para as telas.
+
+    Cada tela (conexão SSE) recebe uma fila própria via assinar(site).
+    """
+
+    def __init__(self, abrir_conexao, get_db_connection, intervalo_verificacao=1.0):
+        super().__init__(name="ouvinte-escalas", daemon=True)
+        self._abrir_conexao = abrir_conexao           # conexão dedicada (LISTEN não usa o pool)
+        self._get_db_connection = get_db_connection   # pool, para carregar a grade do dia
+        self._intervalo = intervalo_verificacao
+        self._lock = threading.Lock()
+        self._assinantes = {}                         # fila -> site
+        self._ultimo_minuto = None
+
+    # --- Assinaturas ---
+
+    def assinar(self, site):
+        fila = queue.Queue(maxsize=100)
+        with self._lock:
+            self._assinantes[fila] = site
+        return fila
+
+    def cancelar(self, fila):
+        with self._lock:
+            self._assinantes.pop(fila, None)
+
+    def publicar(self, evento):
+        """Entrega o evento às telas do site (ou a todas, se o evento não tiver site)."""
+        with self._lock:
+            destinos = [
+                fila for fila, site in self._assinantes.items()
+                if evento.get("site") in (None, site)
+            ]
+        for fila in destinos:
+            try:
+                fila.put_nowait(evento)
+            except queue.Full:
+                pass  # tela parada; ela recarrega tudo quando voltar
+
+    # --- Laço principal ---
+
+    def run(self):
+        while True:
+            try:
+                self._escutar()
+            except Exception as e:
+                print(f"Ouvinte de escalas: conexão perdida ({e}), tentando de novo em 5 s")
+                relogio.sleep(5)
+
+    def _escutar(self):
+        conn = self._abrir_conexao()
+        conn.autocommit = True
+        cur = conn.cursor()
+        cur.execute(f"LISTEN {CANAL_ESCALA}; LISTEN {CANAL_CADASTRO};")
+        try:
+            while True:
+                prontos, _, _ = select.select([conn], [], [], self._intervalo)
+                if prontos:
+                    conn.poll()
+                    while conn.notifies:
+                        self._tratar_notificacao(conn.notifies.pop(0))
+                self._verificar_troca_de_slot()
+        finally:
+            cur.close()
+            conn.close()
+
+    def _tratar_notificacao(self, notificacao):
+        self.publicar(evento_da_notificacao(notificacao.channel, notificacao.payload))
+
+    def _verificar_troca_de_slot(self):
+        """Publica "troca_de_slot" quando o minuto atual é o início de um slot de hoje."""
+        agora = datetime.now()
+        minuto = agora.hour * 60 + agora.minute
+        if minuto == self._ultimo_minuto:
+            return
+        self._ultimo_minuto = minuto
+
+        with self._lock:
+            sites = set(self._assinantes.values())
+        hoje = date.today()
+        for site in sites:
+            try:
+                grade = cache_monitor.obter_monitor(hoje, site, self._get_db_connection)["grade"]
+            except Exception:
+                continue
+            horario = inicio_de_slot(grade, minuto)
+            if horario:
+                self.publicar({"tipo": "troca_de_slot", "site": site, "data": hoje.isoformat(), "horario": horario})
+
+
+_ouvinte = None
+_ouvinte_lock = threading.Lock()
+
+
+def obter_ouvinte(abrir_conexao, get_db_connection):
+    """Retorna o ouvinte do processo, iniciando-o na primeira chamada."""
+    global _ouvinte
+    with _ouvinte_lock:
+        if _ouvinte is None:
+            _ouvinte = OuvinteEscalas(abrir_conexao, get_db_connection)
+            _ouvinte.start()
+    return _ouvinte
+
+
+def fluxo_sse(ouvinte, site, intervalo_keepalive=15):
+    """Gerador de Server-Sent Events para uma tela."""
+    fila = ouvinte.assinar(site)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                evento = fila.get(timeout=intervalo_keepalive)
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            yield f"data: {json.dumps(evento, ensure_ascii=False)}\n\n"
+    finally:
+        ouvinte.cancelar(fila)
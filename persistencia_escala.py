@@ -0,0 +1,190 @@
+import io
+import json
+from collections import Counter
+
+from psycopg2.extras import execute_values
+
+import cache_cadastros
+import cache_monitor
+from conexao_banco import SITE_PADRAO
+from instrumentacao import cronometrado
+from notificacoes import CANAL_ESCALA, notificar
+
+# Quantas linhas vão em cada INSERT ... VALUES gerado pelo execute_values
+TAMANHO_PAGINA = 1000
+
+
+def atualizar_resumo_postos(cur, data_escala, detalhes, sinal=1):
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) as designações ao resumo de postos do dia.
+    Só toca as chaves (data, funcionário, posto) das linhas informadas: não relê
+    escala_detalhes nem recalcula os outros sites da mesma data.
+    Deve rodar na mesma transação que grava (ou altera) os detalhes da escala.
+
+    :param detalhes: Tuplas (posto_id, funcionario_id, ...); VAGO (None) não conta.
+    """
+    quantidades = Counter((funcionario_id, posto_id) for posto_id, funcionario_id, *_ in detalhes if funcionario_id is not None)
+    if not quantidades:
+        return
+    execute_values(cur, """
+        INSERT INTO resumo_postos_dia (data_escala, funcionario_id, posto_id, quantidade)
+        VALUES %s
+        ON CONFLICT (data_escala, funcionario_id, posto_id)
+        DO UPDATE SET quantidade = resumo_postos_dia.quantidade + EXCLUDED.quantidade
+    """, [
+        (data_escala, funcionario_id, posto_id, sinal * quantidade)
+        for (funcionario_id, posto_id), quantidade in quantidades.items()
+    ], page_size=TAMANHO_PAGINA)
+    if sinal < 0:
+        # Chaves que chegaram a zero saem (a chave primária começa pela data)
+        cur.execute("DELETE FROM resumo_postos_dia WHERE data_escala = %s AND quantidade <= 0", (data_escala,))
+
+
+def _copiar_detalhes(cur, escala_id, detalhes):
+    """Envia os detalhes com COPY FROM STDIN (formato texto, \\N = NULL)."""
+    buffer = io.StringIO()
+    for posto_id, funcionario_id, hora_inicio, hora_fim in detalhes:
+        campos = (escala_id, posto_id, funcionario_id, hora_inicio, hora_fim)
+        buffer.write("\t".join("\\N" if campo is None else str(campo) for campo in campos))
+        buffer.write("\n")
+    buffer.seek(0)
+    cur.copy_expert(
+        "COPY escala_detalhes (escala_id, posto_id, funcionario_id, hora_inicio, hora_fim) FROM STDIN",
+        buffer
+    )
+
+
+@cronometrado("salvar_escala")
+def salvar_escala(conn, data_escala, detalhes, metodo="values", site=SITE_PADRAO, metricas=None):
+    """
+    Grava o cabeçalho e todos os detalhes de uma escala em uma única transação.
+
+    :param detalhes: Iterável de tuplas (posto_id, funcionario_id, hora_inicio, hora_fim).
+                     funcionario_id pode ser None (posto VAGO).
+    :param metodo: "values" (execute_values, em páginas) ou "copy" (COPY FROM STDIN).
+    :param site: Site dono da escala (uma escala por site e por dia).
+    :param metricas: Relatório de gerar_escala_com_metricas, gravado no cabeçalho (coluna JSONB).
+    :return: ID da escala criada em `escalas`.
+    """
+    detalhes = detalhes if isinstance(detalhes, list) else list(detalhes)  # lido duas vezes (detalhes e resumo)
+    cur = conn.cursor()
+    try:
+        # abertura: início do primeiro slot (os detalhes vêm na ordem do dia)
+        cur.execute(
+            "INSERT INTO escalas (site, data_escala, abertura, metricas) VALUES (%s, %s, %s, %s) RETURNING id",
+            (
+                site, data_escala, detalhes[0][2] if detalhes else None,
+                None if metricas is None else json.dumps(metricas, ensure_ascii=False)
+            )
+        )
+        escala_id = cur.fetchone()[0]
+
+        if metodo == "copy":
+            _copiar_detalhes(cur, escala_id, detalhes)
+        elif metodo == "values":
+            execute_values(
+                cur,
+                "INSERT INTO escala_detalhes (escala_id, posto_id, funcionario_id, hora_inicio, hora_fim) VALUES %s",
+                detalhes,
+                template=f"({int(escala_id)}, %s, %s, %s, %s)",
+                page_size=TAMANHO_PAGINA
+            )
+        else:
+            raise ValueError(f"Método de gravação inválido: {metodo!r}")
+
+        atualizar_resumo_postos(cur, data_escala, detalhes)
+        # Avisa os outros processos (monitores) quando o commit acontecer
+        notificar(cur, CANAL_ESCALA, site=site, data=data_escala, escala_id=escala_id)
+        conn.commit()
+        cache_monitor.invalidar(site, data_escala)
+        return escala_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def detalhes_da_tabela(escala_tabela, postos_ids, funcionarios_ids):
+    """
+    Converte a tabela de gerar_escala_balanceada em linhas de escala_detalhes.
+
+    :param escala_tabela: Cabeçalho ["Horário", posto...] seguido de ["HH:MM - HH:MM", nome...].
+    :param postos_ids: {nome do posto: id}.
+    :param funcionarios_ids: {nome do funcionário: id}.
+    :return: Lista de tuplas (posto_id, funcionario_id, hora_inicio, hora_fim); VAGO vira None.
+    """
+    cabecalho = escala_tabela[0][1:]
+    postos_sem_cadastro = [posto for posto in cabecalho if posto not in postos_ids]
+    if postos_sem_cadastro:
+        raise ValueError(f"Postos sem cadastro: {', '.join(postos_sem_cadastro)}")
+    ids_colunas = [postos_ids[posto] for posto in cabecalho]
+
+    detalhes = []
+    sem_cadastro = set()
+    for linha in escala_tabela[1:]:
+        hora_inicio, hora_fim = linha[0].split(" - ")
+        for posto_id, nome in zip(ids_colunas, linha[1:]):
+            if nome == "VAGO":
+                funcionario_id = None
+            else:
+                funcionario_id = funcionarios_ids.get(nome)
+                if funcionario_id is None:
+                    sem_cadastro.add(nome)
+            detalhes.append((posto_id, funcionario_id, hora_inicio, hora_fim))
+
+    if sem_cadastro:
+        raise ValueError(f"Funcionários sem cadastro: {', '.join(sorted(sem_cadastro))}")
+    return detalhes
+
+
+def detalhes_da_grade(grade, postos_ids, funcionarios_ids):
+    """
+    Mesmo que detalhes_da_tabela, lendo direto da GradeEscala: os nomes são
+    traduzidos para IDs do banco uma vez por grade, não uma vez por célula.
+    """
+    postos_sem_cadastro = [posto for posto in grade.postos if posto not in postos_ids]
+    if postos_sem_cadastro:
+        raise ValueError(f"Postos sem cadastro: {', '.join(postos_sem_cadastro)}")
+    sem_cadastro = [nome for nome in grade.nomes if nome not in funcionarios_ids]
+    if sem_cadastro:
+        raise ValueError(f"Funcionários sem cadastro: {', '.join(sorted(sem_cadastro))}")
+
+    ids_colunas = [postos_ids[posto] for posto in grade.postos]
+    ids_banco = [funcionarios_ids[nome] for nome in grade.nomes]
+    detalhes = []
+    for slot in range(grade.num_slots):
+        hora_inicio, hora_fim = grade.horario(slot).split(" - ")
+        for posto_id, func_id in zip(ids_colunas, grade.ids_da_linha(slot)):
+            detalhes.append((posto_id, None if func_id < 0 else ids_banco[func_id], hora_inicio, hora_fim))
+    return detalhes
+
+
+def carregar_ids(cur, postos=(), funcionarios=()):
+    """
+    Retorna ({nome do posto: id}, {nome do funcionário: id}), do cache de cadastros.
+
+    :param postos: Nomes de postos que serão procurados.
+    :param funcionarios: Nomes de funcionários que serão procurados ("VAGO" é ignorado).
+    Só os funcionários pedidos são consultados (os que faltam no cache vêm do banco);
+    se algum posto não estiver no cache (cadastro recente de outro processo), relê os postos.
+    """
+    lista_postos = cache_cadastros.postos(cur)
+    if not set(postos) <= {nome for _, nome, _ in lista_postos}:
+        cache_cadastros.invalidar()
+        lista_postos = cache_cadastros.postos(cur)
+    linhas = cache_cadastros.funcionarios_por_nome(cur, [nome for nome in funcionarios if nome != "VAGO"])
+    return cache_cadastros.ids_por_nome(lista_postos, linhas.values())
+
+
+def salvar_escala_tabela(conn, data_escala, escala_tabela, metodo="values", site=SITE_PADRAO, metricas=None):
+    """Grava uma tabela de gerar_escala_balanceada (um slot por linha) e retorna o ID da escala."""
+    cur = conn.cursor()
+    try:
+        postos_ids, funcionarios_ids = carregar_ids(
+            cur, escala_tabela[0][1:], {nome for linha in escala_tabela[1:] for nome in linha[1:]}
+        )
+    finally:
+        cur.close()
+    detalhes = detalhes_da_tabela(escala_tabela, postos_ids, funcionarios_ids)
+    return salvar_escala(conn, data_escala, detalhes, metodo=metodo, site=site, metricas=metricas)
@@ -0,0 +1,213 @@
+"""
+Replanejamento de uma escala gravada quando alguém sai ou chega no meio do turno.
+
+Lê a escala do banco, aplica a alteração na agenda a partir do horário T e
+recalcula só os slots de T em diante (replanejar_escala_tabela). Apenas as
+linhas de escala_detalhes que mudaram são regravadas, na mesma transação que
+atualiza o resumo do dia, as métricas do cabeçalho, registra a alteração em
+escala_alteracoes (os próximos replanejamentos partem da agenda já alterada)
+e avisa os monitores.
+"""
+import json
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+import cache_monitor
+from instrumentacao import cronometrado
+from escala_com_dicionarios2 import replanejar_escala_tabela
+from lote_escalas import agenda_do_dia
+from notificacoes import CANAL_ESCALA, notificar
+from persistencia_escala import SITE_PADRAO, atualizar_resumo_postos, carregar_ids
+
+
+def aplicar_alteracoes(agenda_funcionarios, hora_inicio_escala, horario, alteracoes):
+    """
+    Retorna uma cópia da agenda com as alterações a partir de `horario` ("HH:MM").
+
+    Os horários são comparados a partir de hora_inicio_escala, como no gerador
+    (turnos e escalas que viram a meia-noite).
+
+    :param alteracoes: {nome: None} para quem sai em `horario`: quem ainda não
+                       tinha entrado sai da agenda, quem já tinha saído fica como estava;
+                       {nome: "HH:MM"} para quem chega em `horario` (ou já está em
+                       serviço) e fica até o horário informado. Um segundo turno para
+                       quem já encerrou o seu não é aceito (ValueError).
+    """
+    agenda = dict(agenda_funcionarios)
+    momento = _minutos_desde(hora_inicio_escala, horario)
+    for nome, saida in alteracoes.items():
+        turno = _turno(hora_inicio_escala, agenda[nome]) if nome in agenda else None
+        if saida is None:
+            if turno is None:
+                raise ValueError(f"Funcionário fora da agenda do dia: {nome!r}")
+            if momento <= turno[0]:
+                del agenda[nome]  # sai antes de entrar: não trabalha mais no dia
+            elif momento < turno[1]:
+                agenda[nome] = (agenda[nome][0], horario)
+            continue
+
+        if _minutos_desde(hora_inicio_escala, saida) <= momento:
+            raise ValueError(f"A saída de {nome!r} ({saida}) tem de ser depois de {horario}.")
+        if turno is None or momento <= turno[0]:
+            agenda[nome] = (horario, saida)
+        elif momento < turno[1]:
+            agenda[nome] = (agenda[nome][0], saida)
+        else:
+            entrada_antiga, saida_antiga = agenda[nome]
+            raise ValueError(
+                f"{nome!r} já encerrou o turno ({entrada_antiga} - {saida_antiga}) antes de {horario}; "
+                "um segundo turno no mesmo dia não é suportado."
+            )
+    return agenda
+
+
+def _minutos_desde(hora_inicio_escala, horario):
+    """Minutos de hora_inicio_escala até `horario` ("HH:MM"), no máximo um dia depois."""
+    inicio = datetime.strptime(hora_inicio_escala, "%H:%M")
+    hora = datetime.strptime(horario, "%H:%M")
+    return (hora - inicio).seconds // 60
+
+
+def _turno(hora_inicio_escala, turno):
+    """(entrada, saida) em minutos desde o início da escala, como escala_com_dicionarios2._turno_relativo."""
+    entrada_str, saida_str = turno
+    entrada = _minutos_desde(hora_inicio_escala, entrada_str)
+    return entrada, entrada + _minutos_desde(entrada_str, saida_str)
+
+
+def carregar_escala_gravada(cur, data_escala, site):
+    """
+    Lê os detalhes da escala: (escala_id, {(hora_inicio, posto): (detalhe_id, nome, posto_id,
+    funcionario_id)}, horarios), com hora_inicio em "HH:MM" e horarios = [(inicio, fim)] em ordem.
+    """
+    cur.execute("SELECT id FROM escalas WHERE data_escala = %s AND site = %s", (data_escala, site))
+    linha = cur.fetchone()
+    if linha is None:
+        raise LookupError(f"Nenhuma escala gravada para {site} em {data_escala}.")
+    escala_id = linha[0]
+
+    # Os IDs seguem a ordem dos slots (inclusive depois da meia-noite)
+    cur.execute("""
+        SELECT ed.id, ed.hora_inicio, ed.hora_fim, p.nome, COALESCE(f.nome, 'VAGO'), ed.posto_id, ed.funcionario_id
+        FROM escala_detalhes ed
+        JOIN postos p ON p.id = ed.posto_id
+        LEFT JOIN funcionarios f ON f.id = ed.funcionario_id
+        WHERE ed.escala_id = %s
+        ORDER BY ed.id
+    """, (escala_id,))
+    gravados = {}
+    horarios = {}
+    for detalhe_id, hora_inicio, hora_fim, posto, funcionario, posto_id, funcionario_id in cur.fetchall():
+        inicio = hora_inicio.strftime("%H:%M")
+        horarios[inicio] = hora_fim.strftime("%H:%M")
+        gravados[(inicio, posto)] = (detalhe_id, funcionario, posto_id, funcionario_id)
+    return escala_id, gravados, list(horarios.items())
+
+
+def carregar_alteracoes(cur, escala_id):
+    """Alterações já aplicadas à escala, na ordem em que foram feitas: [(horario "HH:MM", alteracoes)]."""
+    cur.execute(
+        "SELECT horario, alteracoes FROM escala_alteracoes WHERE escala_id = %s ORDER BY id",
+        (escala_id,)
+    )
+    return [(horario.strftime("%H:%M"), alteracoes) for horario, alteracoes in cur.fetchall()]
+
+
+@cronometrado("replanejar_escala")
+def replanejar_escala(conn, data_escala, horario, alteracoes, config, site=SITE_PADRAO, modo="rodizio"):
+    """
+    Aplica uma alteração de efetivo em `horario` e regrava só os slots que mudaram.
+
+    A agenda do dia vem da configuração mais as alterações dos replanejamentos
+    anteriores (tabela escala_alteracoes). Os slots anteriores a `horario` são
+    refeitos uma vez só, conferidos com os gravados e seguidos do recálculo
+    (replanejar_escala_tabela): se não batem (configuração diferente da usada
+    na geração, ou escala de outro modo), nada é alterado e sobe ValueError.
+    A alteração aplicada é registrada na mesma transação.
+
+    :param config: Configuração do site (mesmas chaves de lote_escalas.gerar_escalas).
+    :param alteracoes: Ver aplicar_alteracoes.
+    :param modo: Só "rodizio" (ver replanejar_escala_tabela).
+    :return: {"escala_id", "linhas_alteradas", "metricas"}.
+    """
+    cabecalho = ["Horário"] + list(config["postos_rodizio"]) + list(config["postos_fixos"])
+    argumentos = (
+        config["hora_inicio"], config["hora_fim"], config["intervalo_minutos"],
+        config["postos_rodizio"], config["postos_fixos"]
+    )
+
+    cur = conn.cursor()
+    try:
+        escala_id, gravados, horarios = carregar_escala_gravada(cur, data_escala, site)
+        if not horarios:
+            raise LookupError(f"A escala de {site} em {data_escala} não tem slots gravados.")
+
+        # Monta a tabela gravada no formato do gerador (VAGO onde não há linha)
+        escala_tabela = [cabecalho] + [
+            [f"{inicio} - {fim}"] + [gravados.get((inicio, posto), (None, "VAGO"))[1] for posto in cabecalho[1:]]
+            for inicio, fim in horarios
+        ]
+
+        # Agenda em vigor: a da geração com os replanejamentos anteriores, na ordem, e a alteração nova
+        agenda = agenda_do_dia(config, site, data_escala)
+        for horario_anterior, alteracoes_anteriores in carregar_alteracoes(cur, escala_id):
+            agenda = aplicar_alteracoes(agenda, config["hora_inicio"], horario_anterior, alteracoes_anteriores)
+        agenda = aplicar_alteracoes(agenda, config["hora_inicio"], horario, alteracoes)
+
+        # Confere os slots antes de `horario` com os gravados e recalcula os seguintes, numa passada
+        nova_tabela, metricas = replanejar_escala_tabela(
+            escala_tabela, horario, *argumentos, agenda,
+            config["postos_prioridade"], config["min_passagens"], modo=modo
+        )
+
+        # Só as células diferentes viram UPDATE
+        _, funcionarios_ids = carregar_ids(cur, funcionarios={nome for linha in nova_tabela[1:] for nome in linha[1:]})
+        alteradas = []
+        removidas = []    # (posto_id, funcionario_id) que saem do resumo do dia
+        adicionadas = []  # e as que entram
+        for antiga, nova in zip(escala_tabela[1:], nova_tabela[1:]):
+            inicio = nova[0].split(" - ")[0]
+            for posto, nome_antigo, nome_novo in zip(cabecalho[1:], antiga[1:], nova[1:]):
+                if nome_antigo == nome_novo:
+                    continue
+                if (inicio, posto) not in gravados:
+                    raise ValueError(f"Slot {inicio} do posto {posto!r} não existe na escala gravada.")
+                if nome_novo == "VAGO":
+                    funcionario_id = None
+                elif nome_novo in funcionarios_ids:
+                    funcionario_id = funcionarios_ids[nome_novo]
+                else:
+                    raise ValueError(f"Funcionário sem cadastro: {nome_novo!r}")
+                detalhe_id, _, posto_id, funcionario_antigo = gravados[(inicio, posto)]
+                alteradas.append((detalhe_id, funcionario_id))
+                removidas.append((posto_id, funcionario_antigo))
+                adicionadas.append((posto_id, funcionario_id))
+
+        if alteradas:
+            execute_values(cur, """
+                UPDATE escala_detalhes AS ed SET funcionario_id = v.funcionario_id
+                FROM (VALUES %s) AS v (id, funcionario_id)
+                WHERE ed.id = v.id
+            """, alteradas, template="(%s, %s::integer)")
+            atualizar_resumo_postos(cur, data_escala, removidas, sinal=-1)
+            atualizar_resumo_postos(cur, data_escala, adicionadas)
+        if alteracoes:
+            # JSON (não JSONB): a ordem dos nomes define a ordem de chegada ao refazer a agenda
+            cur.execute(
+                "INSERT INTO escala_alteracoes (escala_id, horario, alteracoes) VALUES (%s, %s, %s::json)",
+                (escala_id, horario, json.dumps(alteracoes, ensure_ascii=False))
+            )
+        cur.execute(
+            "UPDATE escalas SET metricas = %s WHERE id = %s",
+            (json.dumps(metricas, ensure_ascii=False), escala_id)
+        )
+        notificar(cur, CANAL_ESCALA, site=site, data=data_escala, escala_id=escala_id)
+        conn.commit()
+        cache_monitor.invalidar(site, data_escala)
+        return {"escala_id": escala_id, "linhas_alteradas": len(alteradas), "metricas": metricas}
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
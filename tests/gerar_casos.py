@@ -0,0 +1,49 @@
+"""Entradas aleatórias para o gerador, no domínio do gerador original (tudo no mesmo dia)."""
+
+
+def hhmm(minutos):
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def caso_aleatorio(rng, alinhado=False):
+    """
+    Argumentos de gerar_escala_balanceada: escala e turnos dentro do mesmo dia.
+    Com alinhado=True as entradas caem no início de um slot (todo mundo entra na escala).
+    """
+    num_postos = rng.randint(0, 9)
+    postos_rodizio = {f"P{i}": "" for i in range(num_postos)}
+    postos_fixos = {f"F{i}": f"E{rng.randint(0, 20)}" for i in range(rng.randint(0, 2))}
+    intervalo = rng.choice([5, 15, 30, 45, 60])
+    inicio = rng.randrange(0, 1435, 5)
+    fim = rng.randrange(inicio + 5, 1440, 5)
+
+    agenda = {}
+    for i in range(rng.randint(0, 25)):
+        if alinhado:
+            entrada = min(inicio + intervalo * rng.randrange(0, -(-(fim - inicio) // intervalo)), 1435)
+        else:
+            entrada = rng.randrange(0, 1435, rng.choice([5, 15, 30]))
+        saida = rng.randrange(entrada + 1, 1440, 5) if entrada < 1435 else 1439
+        agenda[f"E{i}"] = (hhmm(entrada), hhmm(saida))
+
+    postos_prioridade = rng.sample(list(postos_rodizio) + ["X"], k=min(rng.randint(0, 3), num_postos + 1))
+    min_passagens = rng.randint(-1, 4)
+    return (hhmm(inicio), hhmm(fim), intervalo, postos_rodizio, postos_fixos, agenda, postos_prioridade, min_passagens)
+
+
+def presenca(args, nome):
+    """Slots [entrada, saida) em que `nome` está no rodízio, pela regra do gerador original."""
+    inicio, fim, intervalo, _, _, agenda, _, _ = args
+    comeco = _minutos(inicio)
+    num_slots = -(-(_minutos(fim) - comeco) // intervalo)
+    entrada, saida = (_minutos(h) for h in agenda[nome])
+    if (entrada - comeco) % intervalo or not 0 <= entrada - comeco < num_slots * intervalo:
+        return 0, 0  # só entra quem chega exatamente no início de um slot
+    slot_entrada = (entrada - comeco) // intervalo
+    slot_saida = min(num_slots, max(0, -(-(saida - comeco) // intervalo)))
+    return slot_entrada, max(slot_entrada, slot_saida)
+
+
+def _minutos(horario):
+    horas, minutos = horario.split(":")
+    return int(horas) * 60 + int(minutos)
@@ -0,0 +1,42 @@
+import random
+from itertools import permutations
+
+from atribuicao_otima import atribuicao_custo_minimo, atribuir_postos_prioritarios
+
+
+def _menor_custo(custos):
+    """Força bruta: todas as escolhas de colunas distintas."""
+    if not custos:
+        return 0
+    return min(
+        sum(linha[coluna] for linha, coluna in zip(custos, colunas))
+        for colunas in permutations(range(len(custos[0])), len(custos))
+    )
+
+
+def test_atribuicao_custo_minimo_igual_a_forca_bruta():
+    rng = random.Random(0)
+    for _ in range(400):
+        linhas = rng.randint(0, 4)
+        colunas = rng.randint(max(linhas, 1), 6)
+        custos = [[rng.randint(-20, 20) for _ in range(colunas)] for _ in range(linhas)]
+        escolha = atribuicao_custo_minimo(custos)
+        assert len(set(escolha)) == linhas
+        assert sum(custos[i][j] for i, j in enumerate(escolha)) == _menor_custo(custos)
+
+
+def test_atribuir_postos_prioritarios_igual_a_forca_bruta():
+    rng = random.Random(1)
+    for _ in range(400):
+        candidatos = rng.sample(range(50), rng.randint(0, 9))
+        num_postos = rng.randint(0, 4)
+        tabela = {(f, p): rng.randint(0, 6) for f in candidatos for p in range(num_postos)}
+        escolhidos = atribuir_postos_prioritarios(candidatos, num_postos, lambda f, p: tabela[f, p])
+
+        preenchidos = min(num_postos, len(candidatos))
+        assert len(escolhidos) == num_postos
+        assert escolhidos[preenchidos:] == [None] * (num_postos - preenchidos)
+        assert len(set(escolhidos[:preenchidos])) == preenchidos
+        assert set(escolhidos[:preenchidos]) <= set(candidatos)
+        custos = [[tabela[f, p] for f in candidatos] for p in range(preenchidos)]
+        assert sum(tabela[f, p] for p, f in enumerate(escolhidos[:preenchidos])) == _menor_custo(custos)
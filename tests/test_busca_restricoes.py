@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+import escala_com_dicionarios2 as gerador
+from gerar_casos import caso_aleatorio, presenca
+
+
+def _restricoes_aleatorias(rng, args):
+    postos = list(args[3])
+    nomes = list(args[5])
+    restricoes = {"tempo_limite": 0.02, "semente": rng.randint(0, 9)}
+    if postos and rng.random() < 0.7:
+        restricoes["max_consecutivos"] = (
+            rng.randint(1, 3) if rng.random() < 0.5 else {p: rng.randint(1, 3) for p in rng.sample(postos, rng.randint(1, len(postos)))}
+        )
+    if rng.random() < 0.6:
+        restricoes["pausa_apos"] = rng.randint(1, 4)
+        restricoes["duracao_pausa"] = rng.randint(1, 2)
+    if postos and nomes and rng.random() < 0.7:
+        restricoes["postos_proibidos"] = {
+            nome: rng.sample(postos, rng.randint(1, len(postos))) for nome in rng.sample(nomes, rng.randint(1, len(nomes)))
+        }
+    return restricoes
+
+
+def _trechos(sequencia, vale):
+    """(início, fim exclusivo) de cada trecho seguido de posições em que vale(valor)."""
+    trechos, inicio = [], None
+    for posicao, valor in enumerate(sequencia + [None]):
+        if posicao < len(sequencia) and vale(valor):
+            inicio = posicao if inicio is None else inicio
+        elif inicio is not None:
+            trechos.append((inicio, posicao))
+            inicio = None
+    return trechos
+
+
+def _verificar_restricoes(args, restricoes, tabela):
+    _, _, _, postos_rodizio, postos_fixos, agenda, _, _ = args
+    postos = list(postos_rodizio)
+    linhas = [linha[1:1 + len(postos)] for linha in tabela[1:]]
+    limites = restricoes.get("max_consecutivos")
+    proibidos = restricoes.get("postos_proibidos", {})
+    pausa_apos = restricoes.get("pausa_apos")
+    duracao_pausa = restricoes.get("duracao_pausa", 1)
+
+    for nome in agenda:
+        if nome in postos_fixos.values():
+            continue
+        entrada, saida = presenca(args, nome)
+        # Posto de cada slot em que o funcionário está em serviço (None = folga)
+        sequencia = []
+        for slot, linha in enumerate(linhas):
+            posto = postos[linha.index(nome)] if nome in linha else None
+            if not entrada <= slot < saida:
+                assert posto is None, (nome, slot)
+            else:
+                sequencia.append(posto)
+
+        for posto in sequencia:
+            assert posto not in proibidos.get(nome, ()), (nome, posto)
+        for posto in postos:
+            limite = limites.get(posto) if isinstance(limites, dict) else limites
+            if limite is not None:
+                for inicio, fim in _trechos(sequencia, lambda p: p == posto):
+                    assert fim - inicio <= limite, (nome, posto, sequencia)
+        if pausa_apos is not None:
+            trabalho = _trechos(sequencia, lambda p: p is not None)
+            assert all(fim - inicio <= pausa_apos for inicio, fim in trabalho), (nome, sequencia)
+            # Folga no meio do turno logo depois de um trecho completo: tem de durar a pausa toda
+            fins_completos = {fim for inicio, fim in trabalho if fim - inicio >= pausa_apos}
+            for inicio, fim in _trechos(sequencia, lambda p: p is None):
+                if inicio in fins_completos and fim < len(sequencia):
+                    assert fim - inicio >= duracao_pausa, (nome, sequencia)
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_modo_restricoes_nunca_viola_restricoes(semente):
+    rng = random.Random(200 + semente)
+    for _ in range(60):
+        args = caso_aleatorio(rng, alinhado=True)
+        restricoes = _restricoes_aleatorias(rng, args)
+        tabela = gerador.gerar_escala_balanceada(*args, modo="restricoes", restricoes=restricoes, usar_cache=False)
+        assert len(tabela) == len(gerador.gerar_escala_balanceada(*args, usar_cache=False))
+        _verificar_restricoes(args, restricoes, tabela)
+
+
+def test_restricao_desconhecida():
+    args = caso_aleatorio(random.Random(0))
+    with pytest.raises(ValueError):
+        gerador.gerar_escala_balanceada(*args, modo="restricoes", restricoes={"max_horas": 2}, usar_cache=False)
@@ -0,0 +1,91 @@
+from datetime import time
+
+import pytest
+
+import cache_cadastros
+
+FUNCIONARIOS = {id: (id, f"Func {id}", time(8), time(17)) for id in range(1, 51)}
+
+
+class CursorFalso:
+    """Responde às consultas de cache_cadastros a partir de FUNCIONARIOS e guarda as chaves pedidas."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def execute(self, sql, parametros=()):
+        if sql == cache_cadastros.CONSULTA_POSTOS:
+            self.consultas.append(("postos", None))
+            self._linhas = [(1, "Alfa", 1)]
+            return
+        if sql == cache_cadastros.CONSULTA_TURNOS:
+            self.consultas.append(("turnos", None))
+            self._linhas = list(FUNCIONARIOS.values())
+            return
+        chaves = list(parametros[0])
+        coluna = "nome" if "WHERE nome" in sql else "id"
+        self.consultas.append((coluna, chaves))
+        self._linhas = [linha for linha in FUNCIONARIOS.values() if linha[0 if coluna == "id" else 1] in chaves]
+
+    def fetchall(self):
+        return self._linhas
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    cache_cadastros.invalidar()
+    yield
+    cache_cadastros.invalidar()
+
+
+def test_so_as_chaves_que_faltam_vao_ao_banco():
+    cur = CursorFalso()
+    assert cache_cadastros.funcionarios_por_id(cur, [1, 2, 999]) == {1: FUNCIONARIOS[1], 2: FUNCIONARIOS[2]}
+    assert cache_cadastros.funcionarios_por_id(cur, [2, 3]) == {2: FUNCIONARIOS[2], 3: FUNCIONARIOS[3]}
+    # Pelo nome, as linhas já lidas pelo id também servem
+    assert cache_cadastros.funcionarios_por_nome(cur, ["Func 1", "Func 4"]) == {"Func 1": FUNCIONARIOS[1], "Func 4": FUNCIONARIOS[4]}
+    assert cur.consultas == [("id", [1, 2, 999]), ("id", [3]), ("nome", ["Func 4"])]
+
+
+def test_invalidar_descarta_postos_turnos_e_funcionarios():
+    cur = CursorFalso()
+    for _ in range(2):
+        cache_cadastros.postos(cur)
+        assert cache_cadastros.turnos(cur) == list(FUNCIONARIOS.values())
+        cache_cadastros.funcionarios_por_id(cur, [1])
+    cache_cadastros.invalidar()
+    cache_cadastros.postos(cur)
+    cache_cadastros.turnos(cur)
+    cache_cadastros.funcionarios_por_id(cur, [1])
+    assert cur.consultas == [("postos", None), ("turnos", None), ("id", [1])] * 2
+
+
+def test_turnos_expiram_com_o_ttl(monkeypatch):
+    monkeypatch.setattr(cache_cadastros, "TTL_SEGUNDOS", -1)
+    cur = CursorFalso()
+    cache_cadastros.turnos(cur)
+    cache_cadastros.turnos(cur)
+    assert cur.consultas == [("turnos", None)] * 2
+
+
+def test_lru_limita_as_linhas_em_memoria(monkeypatch):
+    monkeypatch.setattr(cache_cadastros, "ITENS_FUNCIONARIOS", 3)
+    cur = CursorFalso()
+    cache_cadastros.funcionarios_por_id(cur, [1, 2, 3])
+    cache_cadastros.funcionarios_por_id(cur, [1])       # 1 passa a ser o mais recente
+    cache_cadastros.funcionarios_por_id(cur, [4])       # descarta 2
+    cur.consultas.clear()
+    cache_cadastros.funcionarios_por_id(cur, [1, 2, 3, 4])
+    assert cur.consultas == [("id", [2])]
+    # 1, 3 e 4 foram usados antes de 2 chegar: sai o 1, e o nome dele sai do índice por nome
+    assert set(cache_cadastros._ids_por_nome) == {"Func 2", "Func 3", "Func 4"}
+
+
+def test_nome_alterado_sem_aviso_nao_acerta():
+    cur = CursorFalso()
+    cache_cadastros.funcionarios_por_id(cur, [5])
+    # Outra linha com o mesmo id e outro nome (renomeado por SQL direto): o nome antigo não pode valer
+    cache_cadastros._ids_por_nome["Outro"] = 5
+    cur.consultas.clear()
+    assert cache_cadastros.funcionarios_por_nome(cur, ["Outro"]) == {}
+    assert cur.consultas == [("nome", ["Outro"])]
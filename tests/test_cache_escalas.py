@@ -0,0 +1,100 @@
+import pytest
+
+import cache_escalas
+import escala_com_dicionarios2 as gerador
+
+EXEMPLO = (
+    gerador.HORA_INICIO, gerador.HORA_FIM, gerador.INTERVALO_MINUTOS, gerador.POSTOS_RODIZIO,
+    gerador.POSTOS_FIXOS, gerador.FUNCIONARIOS_SCHEDULE, gerador.POSTOS_PRIORIDADE, gerador.MIN_PASSAGENS,
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo(monkeypatch):
+    monkeypatch.setattr(cache_escalas, "PERSISTENTE", "")
+    cache_escalas.limpar_memoria()
+    yield
+    cache_escalas.limpar_memoria()
+
+
+def _leituras():
+    return {origem: cache_escalas.LEITURAS.valor(origem) for origem in cache_escalas.NIVEIS}
+
+
+def _diferenca(antes):
+    return {origem: valor - antes[origem] for origem, valor in _leituras().items()}
+
+
+def test_acerto_depois_da_primeira_geracao():
+    antes = _leituras()
+    primeira = gerador.gerar_escala_com_metricas(*EXEMPLO)
+    segunda = gerador.gerar_escala_com_metricas(*EXEMPLO)
+    assert _diferenca(antes) == {"memoria": 1, "persistente": 0, "gerada": 1}
+    assert list(primeira) == list(segunda) == list(gerador.gerar_escala_com_metricas(*EXEMPLO, usar_cache=False))
+
+
+def test_resultado_devolvido_e_uma_copia():
+    tabela = gerador.gerar_escala_balanceada(*EXEMPLO)
+    tabela[1][1] = "Outro"
+    assert gerador.gerar_escala_balanceada(*EXEMPLO)[1][1] != "Outro"
+
+
+def test_entradas_diferentes_nao_acertam():
+    gerador.gerar_escala_balanceada(*EXEMPLO)
+    antes = _leituras()
+    agenda = dict(gerador.FUNCIONARIOS_SCHEDULE, Manuel=("12:30", "14:00"))
+    gerador.gerar_escala_balanceada(*EXEMPLO[:5], agenda, *EXEMPLO[6:])
+    gerador.gerar_escala_balanceada(*EXEMPLO[:7], EXEMPLO[7] + 1)
+    gerador.gerar_escala_balanceada(*EXEMPLO, modo="otimo")
+    assert _diferenca(antes)["gerada"] == 3
+
+
+def test_chave_normaliza_horarios_e_ignora_valores_dos_postos():
+    chave = cache_escalas.impressao_digital("v", *EXEMPLO, "rodizio", None)
+    postos = {posto: "qualquer" for posto in gerador.POSTOS_RODIZIO}
+    agenda = {nome: (entrada.lstrip("0"), saida) for nome, (entrada, saida) in gerador.FUNCIONARIOS_SCHEDULE.items()}
+    args = (EXEMPLO[0], EXEMPLO[1], EXEMPLO[2], postos, EXEMPLO[4], agenda, EXEMPLO[6], EXEMPLO[7])
+    assert cache_escalas.impressao_digital("v", *args, "rodizio", {}) == chave
+    # A ordem da agenda define os IDs (e os desempates): muda a chave
+    invertida = dict(reversed(list(gerador.FUNCIONARIOS_SCHEDULE.items())))
+    assert cache_escalas.impressao_digital("v", *EXEMPLO[:5], invertida, *EXEMPLO[6:], "rodizio", None) != chave
+
+
+def test_nova_versao_do_gerador_invalida(monkeypatch):
+    gerador.gerar_escala_balanceada(*EXEMPLO)
+    monkeypatch.setattr(gerador, "VERSAO_GERADOR", gerador.VERSAO_GERADOR + "-teste")
+    antes = _leituras()
+    gerador.gerar_escala_balanceada(*EXEMPLO)
+    assert _diferenca(antes) == {"memoria": 0, "persistente": 0, "gerada": 1}
+
+
+def test_lru_descarta_o_menos_usado(monkeypatch):
+    monkeypatch.setattr(cache_escalas, "ITENS_MEMORIA", 2)
+    gerar = {chave: (lambda chave=chave: [chave]) for chave in "abc"}
+    cache_escalas.memorizado("a", "v", gerar["a"])
+    cache_escalas.memorizado("b", "v", gerar["b"])
+    cache_escalas.memorizado("a", "v", gerar["a"])   # "a" passa a ser o mais recente
+    cache_escalas.memorizado("c", "v", gerar["c"])   # descarta "b"
+    antes = _leituras()
+    cache_escalas.memorizado("a", "v", gerar["a"])
+    cache_escalas.memorizado("b", "v", gerar["b"])
+    assert _diferenca(antes) == {"memoria": 1, "persistente": 0, "gerada": 1}
+    assert cache_escalas.estatisticas()["itens_memoria"] == 2
+
+
+def test_nivel_em_disco_sobrevive_a_memoria(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_escalas, "PERSISTENTE", str(tmp_path))
+    esperado = gerador.gerar_escala_com_metricas(*EXEMPLO)
+    cache_escalas.limpar_memoria()
+    antes = _leituras()
+    assert gerador.gerar_escala_com_metricas(*EXEMPLO) == esperado
+    gerador.gerar_escala_com_metricas(*EXEMPLO)
+    assert _diferenca(antes) == {"memoria": 1, "persistente": 1, "gerada": 0}
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_sem_cache_nao_le_nem_grava():
+    antes = _leituras()
+    gerador.gerar_escala_balanceada(*EXEMPLO, usar_cache=False)
+    assert _diferenca(antes) == {"memoria": 0, "persistente": 0, "gerada": 0}
+    assert cache_escalas.estatisticas()["itens_memoria"] == 0
@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+import cache_monitor
+
+GRADE = cache_monitor.montar_grade([], date(2098, 1, 1), "principal", {}, {})
+
+
+class RelogioFalso:
+    def __init__(self):
+        self.agora = 1000.0
+
+    def monotonic(self):
+        return self.agora
+
+
+class ConexaoFalsa:
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = RelogioFalso()
+    monkeypatch.setattr(cache_monitor, "relogio", relogio)
+    monkeypatch.setattr(cache_monitor, "TTL_SEGUNDOS", 60)
+    cache_monitor.invalidar()
+    yield relogio
+    cache_monitor.invalidar()
+
+
+def _obter(leituras):
+    def get_db_connection():
+        leituras.append(1)
+        return ConexaoFalsa()
+    return cache_monitor.obter_monitor(date(2098, 1, 1), "principal", get_db_connection)
+
+
+def test_grade_expira_depois_do_ttl(relogio, monkeypatch):
+    monkeypatch.setattr(cache_monitor, "carregar_grade", lambda conn, data_escala, site: GRADE)
+    leituras = []
+    _obter(leituras)
+    relogio.agora += 59
+    _obter(leituras)
+    assert len(leituras) == 1
+    # Sem aviso de invalidação (ouvinte fora do ar), a grade é relida depois do TTL
+    relogio.agora += 1
+    _obter(leituras)
+    assert len(leituras) == 2
+
+
+def test_invalidar_descarta_antes_do_ttl(relogio, monkeypatch):
+    monkeypatch.setattr(cache_monitor, "carregar_grade", lambda conn, data_escala, site: GRADE)
+    leituras = []
+    _obter(leituras)
+    cache_monitor.invalidar("principal", date(2098, 1, 1))
+    _obter(leituras)
+    assert len(leituras) == 2
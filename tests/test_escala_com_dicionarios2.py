@@ -0,0 +1,163 @@
+import json
+import os
+import random
+
+import pytest
+
+import escala_com_dicionarios2 as gerador
+import escala_original
+from gerar_casos import caso_aleatorio, hhmm, presenca
+
+EXEMPLO = (
+    gerador.HORA_INICIO, gerador.HORA_FIM, gerador.INTERVALO_MINUTOS, gerador.POSTOS_RODIZIO,
+    gerador.POSTOS_FIXOS, gerador.FUNCIONARIOS_SCHEDULE, gerador.POSTOS_PRIORIDADE, gerador.MIN_PASSAGENS,
+)
+
+
+def test_exemplo_igual_a_saida_original():
+    with open(os.path.join(os.path.dirname(__file__), "dados", "escala_exemplo_original.json"), encoding="utf-8") as arquivo:
+        esperado = json.load(arquivo)
+    assert gerador.gerar_escala_balanceada(*EXEMPLO, usar_cache=False) == esperado
+
+
+@pytest.mark.parametrize("semente", range(4))
+def test_rodizio_igual_ao_gerador_original(semente):
+    rng = random.Random(semente)
+    for _ in range(250):
+        args = caso_aleatorio(rng)
+        assert gerador.gerar_escala_balanceada(*args, usar_cache=False) == escala_original.gerar_escala_balanceada(*args), args
+
+
+def _verificar_designacoes(args, tabela):
+    """Cada linha: só quem está em serviço, ninguém em dois postos, VAGO só por falta de gente."""
+    _, _, _, postos_rodizio, postos_fixos, agenda, _, _ = args
+    nomes_rodizio = [nome for nome in agenda if nome not in postos_fixos.values()]
+    presencas = {nome: presenca(args, nome) for nome in nomes_rodizio}
+    num_postos = len(postos_rodizio)
+    for slot, linha in enumerate(tabela[1:]):
+        em_servico = {nome for nome, (entrada, saida) in presencas.items() if entrada <= slot < saida}
+        rodizio = linha[1:1 + num_postos]
+        ocupados = [nome for nome in rodizio if nome != "VAGO"]
+        assert set(ocupados) <= em_servico
+        assert len(ocupados) == len(set(ocupados))
+        assert len(ocupados) == min(num_postos, len(em_servico))
+        assert linha[1 + num_postos:] == list(postos_fixos.values())
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_modo_otimo_respeita_presenca_e_ocupacao(semente):
+    rng = random.Random(100 + semente)
+    for _ in range(150):
+        args = caso_aleatorio(rng)
+        tabela = gerador.gerar_escala_balanceada(*args, modo="otimo", usar_cache=False)
+        assert tabela[0] == gerador.gerar_escala_balanceada(*args, usar_cache=False)[0]
+        _verificar_designacoes(args, tabela)
+
+
+@pytest.mark.parametrize("modo", ["rodizio", "otimo"])
+def test_abaixo_do_minimo_conta_cada_posto_de_prioridade(modo):
+    _, metricas = gerador.gerar_escala_com_metricas(*EXEMPLO, modo=modo, usar_cache=False)
+    assert metricas["abaixo_do_minimo"] == [
+        nome for nome, por_posto in metricas["passagens_prioritarias"].items()
+        if all(passagens < gerador.MIN_PASSAGENS for passagens in por_posto.values())
+    ]
+    if modo == "rodizio":
+        # 1 + 2 passagens somam o mínimo (3), mas em nenhum dos dois postos ele foi atingido
+        assert metricas["passagens_prioritarias"]["Manuel"] == {"Alfa 2": 1, "Alfa 3": 2}
+        assert "Manuel" in metricas["abaixo_do_minimo"]
+
+
+def test_modo_otimo_equilibra_os_postos_prioritarios():
+    _, metricas_rodizio = gerador.gerar_escala_com_metricas(*EXEMPLO, usar_cache=False)
+    _, metricas_otimo = gerador.gerar_escala_com_metricas(*EXEMPLO, modo="otimo", usar_cache=False)
+    assert metricas_otimo["prioritarios_variancia"] < metricas_rodizio["prioritarios_variancia"]
+
+
+def test_modo_invalido():
+    with pytest.raises(ValueError):
+        gerador.gerar_escala_balanceada(*EXEMPLO, modo="aleatorio", usar_cache=False)
+    with pytest.raises(ValueError):
+        gerador.gerar_escala_balanceada(*EXEMPLO, restricoes={"max_consecutivos": 2}, usar_cache=False)
+
+
+def _celulas_diferentes(tabela_a, tabela_b):
+    return sum(a != b for linha_a, linha_b in zip(tabela_a, tabela_b) for a, b in zip(linha_a, linha_b))
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_replanejar_sem_alteracao_nao_muda_nenhuma_celula(semente):
+    rng = random.Random(300 + semente)
+    for _ in range(80):
+        args = caso_aleatorio(rng, alinhado=True)
+        tabela, metricas = gerador.gerar_escala_com_metricas(*args, usar_cache=False)
+        for linha in tabela[1:]:
+            nova, novas_metricas = gerador.replanejar_escala_tabela(tabela, linha[0].split(" - ")[0], *args)
+            assert _celulas_diferentes(tabela, nova) == 0
+            assert novas_metricas == metricas
+
+
+def test_replanejar_exemplo_sem_alteracao_em_todos_os_horarios():
+    tabela = gerador.gerar_escala_balanceada(*EXEMPLO, usar_cache=False)
+    for horario in ("12:30", "14:00", "15:30", "17:00", "18:00"):
+        assert gerador.replanejar_escala_tabela(tabela, horario, *EXEMPLO)[0] == tabela
+
+
+def test_replanejar_so_aceita_rodizio():
+    tabela = gerador.gerar_escala_balanceada(*EXEMPLO, modo="otimo", usar_cache=False)
+    with pytest.raises(ValueError):
+        gerador.replanejar_escala_tabela(tabela, "14:00", *EXEMPLO, modo="otimo")
+
+
+def test_replanejar_recusa_escala_de_outra_configuracao():
+    tabela = gerador.gerar_escala_balanceada(*EXEMPLO, usar_cache=False)
+    agenda = dict(reversed(list(gerador.FUNCIONARIOS_SCHEDULE.items())))
+    with pytest.raises(ValueError):
+        gerador.replanejar_escala_tabela(tabela, "15:00", *EXEMPLO[:5], agenda, *EXEMPLO[6:])
+
+
+def _mover(horario, delta):
+    return hhmm((int(horario[:2]) * 60 + int(horario[3:]) + delta) % 1440)
+
+
+def _deslocar(args, delta):
+    """Os mesmos argumentos com todos os horários deslocados de `delta` minutos (módulo 24h)."""
+    inicio, fim, intervalo, postos_rodizio, postos_fixos, agenda, postos_prioridade, min_passagens = args
+    agenda = {nome: (_mover(entrada, delta), _mover(saida, delta)) for nome, (entrada, saida) in agenda.items()}
+    return (_mover(inicio, delta), _mover(fim, delta), intervalo, postos_rodizio, postos_fixos, agenda, postos_prioridade, min_passagens)
+
+
+@pytest.mark.parametrize("modo", ["rodizio", "otimo"])
+def test_escala_que_vira_a_meia_noite_igual_a_do_mesmo_dia(modo):
+    rng = random.Random(400)
+    for _ in range(200):
+        args = caso_aleatorio(rng, alinhado=rng.random() < 0.5)
+        inicio, fim = (int(h[:2]) * 60 + int(h[3:]) for h in args[:2])
+        # Início k minutos antes da meia-noite: escala e turnos passam a virar o dia
+        delta = 1440 - inicio - rng.randrange(1, fim - inicio)
+        noturno = _deslocar(args, delta)
+        tabela = gerador.gerar_escala_balanceada(*args, modo=modo, usar_cache=False)
+        tabela_noturna = gerador.gerar_escala_balanceada(*noturno, modo=modo, usar_cache=False)
+        assert [linha[1:] for linha in tabela_noturna] == [linha[1:] for linha in tabela], noturno
+        assert [linha[0] for linha in tabela_noturna[1:]] == [
+            " - ".join(_mover(horario, delta) for horario in linha[0].split(" - ")) for linha in tabela[1:]
+        ]
+
+
+def test_turno_noturno_cobre_os_dois_lados_da_meia_noite():
+    tabela = gerador.gerar_escala_balanceada(
+        "22:00", "02:00", 60, {"P": ""}, {}, {"Noite": ("23:00", "01:00"), "Dia": ("22:00", "23:00")}, ["P"], 1,
+        usar_cache=False
+    )
+    assert tabela[1:] == [["22:00 - 23:00", "Dia"], ["23:00 - 00:00", "Noite"], ["00:00 - 01:00", "Noite"], ["01:00 - 02:00", "VAGO"]]
+
+
+def test_horarios_iguais_nao_viram_24h():
+    """Entrada igual à saída só ocupa o slot de entrada, como no gerador original."""
+    rng = random.Random(500)
+    for _ in range(200):
+        args = caso_aleatorio(rng, alinhado=True)
+        agenda = {nome: (entrada, entrada) if rng.random() < 0.3 else (entrada, saida) for nome, (entrada, saida) in args[5].items()}
+        args = args[:5] + (agenda,) + args[6:]
+        assert gerador.gerar_escala_balanceada(*args, usar_cache=False) == escala_original.gerar_escala_balanceada(*args)
+    # Escala com início igual ao fim: nenhum slot (antes, 24h)
+    assert gerador.gerar_escala_balanceada("08:00", "08:00", 30, {"P": ""}, {}, {"A": ("08:00", "12:00")}, ["P"], 1, usar_cache=False) == [["Horário", "P"]]
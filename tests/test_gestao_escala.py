@@ -0,0 +1,110 @@
+import random
+from datetime import time
+
+from gestao_escala import ESQUEMA_ESPERADO, distribuir_postos, esquema_pendente
+from indice_turnos import MINUTOS_DIA, minutos
+
+POSTOS = [(1, "Alfa 2", 1), (2, "Alfa 3", 1), (3, "Ronda", 2)]
+
+
+def _hora(minuto):
+    minuto %= MINUTOS_DIA
+    return time(minuto // 60, minuto % 60)
+
+
+def _distribuir(funcionarios, janela, postos=POSTOS, historico=None):
+    return distribuir_postos(postos, funcionarios, historico or {}, janela, [f[0] for f in funcionarios])
+
+
+def _resumo(trechos):
+    return [(t["posto_nome"], t["func_nome"], t["h_inicio"].strftime("%H:%M"), t["h_fim"].strftime("%H:%M")) for t in trechos]
+
+
+def _duracao(inicio, fim):
+    return (minutos(fim) - minutos(inicio)) % MINUTOS_DIA or MINUTOS_DIA
+
+
+def _em_servico(turno, minuto):
+    return (minuto - minutos(turno[0])) % MINUTOS_DIA < _duracao(*turno)
+
+
+def test_janela_que_vira_a_meia_noite():
+    funcionarios = [(1, "Noite", time(22), time(6)), (2, "Madrugada", time(0), time(8))]
+    assert _resumo(_distribuir(funcionarios, ("22:00", "06:00"), postos=POSTOS[:2])) == [
+        ("Alfa 2", "Noite", "22:00", "06:00"),
+        ("Alfa 3", "VAGO", "22:00", "00:00"),
+        ("Alfa 3", "Madrugada", "00:00", "06:00"),
+    ]
+
+
+def test_turno_da_vespera_cobre_a_madrugada():
+    # Entrou às 20:00 de ontem: está em serviço de 00:00 a 02:00 de hoje
+    funcionarios = [(1, "Ontem", time(20), time(2))]
+    assert _resumo(_distribuir(funcionarios, ("00:00", "04:00"), postos=POSTOS[:1])) == [
+        ("Alfa 2", "Ontem", "00:00", "02:00"),
+        ("Alfa 2", "VAGO", "02:00", "04:00"),
+    ]
+
+
+def test_trechos_aleatorios_cobrem_a_janela_sem_sobreposicao():
+    rng = random.Random(7)
+    for _ in range(200):
+        funcionarios = []
+        for id in range(1, rng.randint(0, 8) + 1):
+            entrada = rng.randrange(0, MINUTOS_DIA, 30)
+            funcionarios.append((id, f"F{id}", _hora(entrada), _hora(entrada + rng.randrange(60, 720, 30))))
+        inicio = rng.randrange(0, MINUTOS_DIA, 30)
+        duracao = rng.randrange(60, MINUTOS_DIA + 1, 30)
+        janela = (_hora(inicio).strftime("%H:%M"), _hora(inicio + duracao).strftime("%H:%M"))
+        turnos = {f[0]: (f[2], f[3]) for f in funcionarios}
+
+        trechos = []  # (posto, func_id, início, fim) em minutos desde o início da janela
+        for trecho in _distribuir(funcionarios, janela):
+            comeco = (minutos(trecho["h_inicio"]) - inicio) % MINUTOS_DIA
+            trechos.append((trecho["posto_id"], trecho["func_id"], comeco, comeco + _duracao(trecho["h_inicio"], trecho["h_fim"])))
+
+        for posto_id, *_ in POSTOS:
+            # Cada posto coberto do início ao fim da janela, em trechos seguidos
+            limites = [(c, f) for p, _, c, f in trechos if p == posto_id]
+            assert limites[0][0] == 0 and limites[-1][1] == duracao
+            assert all(a[1] == b[0] for a, b in zip(limites, limites[1:]))
+
+        for posto_id, func_id, comeco, fim in trechos:
+            if func_id is not None:
+                # Em serviço o trecho inteiro e em um posto só por vez
+                assert all(_em_servico(turnos[func_id], inicio + m) for m in range(comeco, fim))
+                assert not any(
+                    f == func_id and (p, c) != (posto_id, comeco) and c < fim and comeco < ff
+                    for p, f, c, ff in trechos
+                )
+            else:
+                # Vago só se todos os que estão em serviço no início do trecho estão em outro posto
+                for outro in turnos:
+                    if _em_servico(turnos[outro], inicio + comeco):
+                        assert any(f == outro and c <= comeco < ff for _, f, c, ff in trechos)
+
+
+class ConexaoCatalogo:
+    """Responde à consulta de information_schema de esquema_pendente com as colunas dadas."""
+
+    def __init__(self, colunas):
+        self.colunas = colunas
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, parametros):
+        pass
+
+    def fetchall(self):
+        return self.colunas
+
+    def close(self):
+        pass
+
+
+def test_esquema_pendente_lista_tabelas_e_colunas_que_faltam():
+    completo = [(tabela, coluna) for tabela, colunas in ESQUEMA_ESPERADO.items() for coluna in colunas]
+    assert esquema_pendente(ConexaoCatalogo(completo)) == []
+    sem_coluna = [c for c in completo if c != ("escalas", "abertura") and c[0] != "escala_alteracoes"]
+    assert esquema_pendente(ConexaoCatalogo(sem_coluna)) == ["escalas.abertura", "escala_alteracoes"]
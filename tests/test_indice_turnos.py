@@ -0,0 +1,48 @@
+import random
+from datetime import time
+
+from indice_turnos import MINUTOS_DIA, IndiceTurnos, minutos
+
+
+def _turnos_aleatorios(rng, quantidade):
+    turnos = []
+    for chave in range(quantidade):
+        entrada = rng.randrange(0, 300, 5)
+        turnos.append((chave % max(1, quantidade // 2), entrada, entrada + rng.randrange(5, 120, 5)))
+    return turnos
+
+
+def _chaves(turnos, condicao):
+    return list(dict.fromkeys(chave for chave, entrada, saida in sorted(turnos, key=lambda t: t[1]) if condicao(entrada, saida)))
+
+
+def test_consultas_iguais_a_forca_bruta():
+    rng = random.Random(0)
+    for _ in range(200):
+        turnos = _turnos_aleatorios(rng, rng.randint(0, 40))
+        indice = IndiceTurnos(turnos)
+        for _ in range(20):
+            inicio = rng.randrange(-10, 400, 5)
+            fim = inicio + rng.randrange(5, 120, 5)
+            assert indice.cobrem(inicio, fim) == _chaves(turnos, lambda e, s: e <= inicio and s >= fim)
+            assert indice.presentes(inicio, fim) == _chaves(turnos, lambda e, s: e < fim and s > inicio)
+            assert indice.entradas_em(inicio, fim) == _chaves(turnos, lambda e, s: inicio <= e < fim)
+
+            proximas = sorted(e for _, e, _ in turnos if e > inicio)
+            assert indice.proxima_entrada(inicio) == (proximas[0] if proximas else None)
+
+            for chave, entrada, saida in turnos:
+                if entrada <= inicio < saida:
+                    turno = indice.turno_em(chave, inicio)
+                    assert turno is not None and turno[0] <= inicio < turno[1]
+                elif not any(c == chave and e <= inicio < s for c, e, s in turnos):
+                    assert indice.turno_em(chave, inicio) is None
+
+
+def test_agenda_com_turno_que_vira_a_meia_noite():
+    indice = IndiceTurnos.da_agenda({"dia": ("07:00", "19:00"), "noite": (time(19), time(7)), "madrugada": ("05:00", "13:00")})
+    assert indice.cobrem(minutos("02:00"), minutos("03:00")) == ["noite"]
+    assert indice.presentes(minutos("06:00"), minutos("08:00")) == ["noite", "madrugada", "dia"]
+    # Janela 19:00-07:00 (fim depois de 24:00): quem entra às 05:00 do dia seguinte aparece
+    assert indice.entradas_em(minutos("19:00"), MINUTOS_DIA + minutos("07:00")) == ["noite", "madrugada"]
+    assert indice.turno_em("noite", MINUTOS_DIA + 60) == (minutos("19:00"), MINUTOS_DIA + minutos("07:00"))
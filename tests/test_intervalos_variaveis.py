@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from intervalos_variaveis import planejar_intervalos
+
+
+def _limites(duracoes):
+    """Início de cada slot e o fim do último, em minutos desde o início da escala."""
+    limites = [0]
+    for duracao in duracoes:
+        limites.append(limites[-1] + duracao)
+    return limites
+
+
+def test_duracoes_dentro_dos_limites():
+    rng = random.Random(3)
+    for _ in range(200):
+        inicio = rng.randrange(0, 600, 5)
+        fim = inicio + rng.randrange(1, 600)
+        entradas = [rng.randrange(inicio, fim) for _ in range(rng.randint(0, 6))]
+        saidas = [rng.randrange(inicio, fim) for _ in range(rng.randint(0, 6))]
+        minimo = rng.choice([15, 30, 45])
+        maximo = minimo + rng.choice([0, 15, 30])
+        duracoes = planejar_intervalos(inicio, fim, entradas, saidas, rng.randint(0, 10), minimo, maximo)
+        assert all(minimo <= d <= maximo and d % 5 == 0 for d in duracoes)
+        # Cobre a escala, e o último slot começa antes do fim
+        assert sum(duracoes) >= fim - inicio > sum(duracoes[:-1])
+
+
+def test_entradas_caem_no_inicio_de_um_slot():
+    # 12:00-16:00 com entradas às 13:00 e 14:10
+    assert {60, 130} <= set(_limites(planejar_intervalos(720, 960, [780, 850], [])))
+
+
+def test_saida_alinhada_quando_nao_custa_slot_a_mais():
+    # 100 minutos cabem em dois slots; com a saída em 40, o primeiro termina nela
+    assert planejar_intervalos(0, 100, [], [40]) == [40, 60]
+
+
+def test_ultimo_slot_passa_do_fim_quando_a_grade_nao_fecha():
+    duracoes = planejar_intervalos(0, 62, [], [])
+    assert len(duracoes) == 2 and sum(duracoes) == 65
+
+
+def test_meta_de_slots_e_o_maximo_possivel_quando_nao_cabe():
+    assert len(planejar_intervalos(0, 120, [], [])) == 2
+    assert len(planejar_intervalos(0, 120, [], [], min_slots=3)) == 3
+    # Mais de 4 slots de 30 minutos não cabem em 2 horas: fica com 4
+    assert planejar_intervalos(0, 120, [], [], min_slots=10) == [30, 30, 30, 30]
+
+
+def test_limites_invalidos_e_escala_vazia():
+    with pytest.raises(ValueError):
+        planejar_intervalos(0, 120, [], [], minimo=60, maximo=30)
+    with pytest.raises(ValueError):
+        planejar_intervalos(0, 120, [], [], passo=0)
+    with pytest.raises(ValueError, match="Nenhum múltiplo"):
+        planejar_intervalos(0, 120, [], [], minimo=31, maximo=34)
+    assert planejar_intervalos(600, 600, [780], []) == []
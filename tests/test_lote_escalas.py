@@ -0,0 +1,28 @@
+from datetime import date
+
+import pytest
+
+from lote_escalas import config_exemplo, datas_do_intervalo, gerar_escalas
+
+
+def _sites():
+    noturno = dict(config_exemplo(), hora_inicio="22:00", hora_fim="04:00", intervalo_minutos="variavel")
+    noturno["agenda_funcionarios"] = {
+        nome: ("22:00", "04:00") if i % 2 else ("23:00", "03:00")
+        for i, nome in enumerate(config_exemplo()["agenda_funcionarios"])
+    }
+    return {"principal": config_exemplo(), "noturno": noturno}
+
+
+@pytest.mark.parametrize("modo", ["rodizio", "otimo"])
+def test_um_worker_ou_varios_dao_as_mesmas_escalas(modo):
+    datas = (date(2098, 5, 1), date(2098, 5, 4))
+    sozinho = gerar_escalas(datas, _sites(), workers=1, modo=modo)
+    em_paralelo = gerar_escalas(datas, _sites(), workers=2, modo=modo)
+
+    assert sorted(sozinho) == sorted(em_paralelo) and len(sozinho) == 8
+    assert {chave: grade.tabela() for chave, grade in sozinho.items()} == {
+        chave: grade.tabela() for chave, grade in em_paralelo.items()
+    }
+    # A semente muda de um dia para o outro: a comparação não é entre escalas iguais
+    assert len({str(sozinho[("principal", data)].tabela()) for data in datas_do_intervalo(datas)}) > 1
@@ -0,0 +1,68 @@
+import pytest
+
+import escala_com_dicionarios2 as gerador
+from replanejamento import aplicar_alteracoes
+
+EXEMPLO = (
+    gerador.HORA_INICIO, gerador.HORA_FIM, gerador.INTERVALO_MINUTOS, gerador.POSTOS_RODIZIO,
+    gerador.POSTOS_FIXOS, gerador.FUNCIONARIOS_SCHEDULE, gerador.POSTOS_PRIORIDADE, gerador.MIN_PASSAGENS,
+)
+
+
+def _replanejar(tabela, agenda, horario, alteracoes):
+    """O que replanejamento.replanejar_escala faz, sem o banco: agenda em vigor + alteração nova."""
+    agenda = aplicar_alteracoes(agenda, gerador.HORA_INICIO, horario, alteracoes)
+    return gerador.replanejar_escala_tabela(tabela, horario, *EXEMPLO[:5], agenda, *EXEMPLO[6:])[0], agenda
+
+
+def _aparece_depois(tabela, nome, horario):
+    return any(nome in linha[1:] for linha in tabela[1:] if linha[0] >= horario)
+
+
+def test_segundo_replanejamento_mantem_a_saida_do_primeiro():
+    tabela = gerador.gerar_escala_balanceada(*EXEMPLO, usar_cache=False)
+    assert _aparece_depois(tabela, "Manuel", "14:00")
+
+    tabela, agenda = _replanejar(tabela, gerador.FUNCIONARIOS_SCHEDULE, "14:00", {"Manuel": None})
+    assert not _aparece_depois(tabela, "Manuel", "14:00")
+
+    tabela, agenda = _replanejar(tabela, agenda, "15:30", {"Novato": "18:30"})
+    assert not _aparece_depois(tabela, "Manuel", "14:00")
+    assert _aparece_depois(tabela, "Novato", "15:30")
+
+    # A agenda refeita (geração + alterações registradas) reproduz a escala gravada
+    assert gerador.replanejar_escala_tabela(tabela, "12:30", *EXEMPLO[:5], agenda, *EXEMPLO[6:])[0] == tabela
+
+
+@pytest.mark.parametrize("horario", ["13:00", "14:00"])
+def test_quem_sai_antes_de_entrar_nao_aparece_mais(horario):
+    # Augusto entra às 14:00; sair antes (ou na hora) não pode virar um turno que dá a volta no dia
+    tabela = gerador.gerar_escala_balanceada(*EXEMPLO, usar_cache=False)
+    tabela, agenda = _replanejar(tabela, gerador.FUNCIONARIOS_SCHEDULE, horario, {"Augusto": None})
+    assert "Augusto" not in agenda
+    assert not any("Augusto" in linha[1:] for linha in tabela[1:])
+
+
+def test_saida_depois_do_turno_nao_muda_nada():
+    agenda = aplicar_alteracoes(gerador.FUNCIONARIOS_SCHEDULE, gerador.HORA_INICIO, "15:00", {"Melero": None})
+    assert agenda == gerador.FUNCIONARIOS_SCHEDULE
+
+
+def test_volta_depois_do_fim_do_turno_e_recusada():
+    # Melero sai às 13:30; voltar às 15:00 seria um segundo turno
+    with pytest.raises(ValueError, match="já encerrou o turno"):
+        aplicar_alteracoes(gerador.FUNCIONARIOS_SCHEDULE, gerador.HORA_INICIO, "15:00", {"Melero": "18:00"})
+
+
+def test_chegada_com_saida_antes_do_horario_e_recusada():
+    with pytest.raises(ValueError, match="tem de ser depois"):
+        aplicar_alteracoes(gerador.FUNCIONARIOS_SCHEDULE, gerador.HORA_INICIO, "15:00", {"Manuel": "14:00"})
+
+
+def test_alteracoes_em_escala_que_vira_a_meia_noite():
+    agenda = {"Noite": ("22:00", "02:00"), "Madrugada": ("00:00", "04:00")}
+    assert aplicar_alteracoes(agenda, "20:00", "01:00", {"Noite": None, "Madrugada": "03:00"}) == {
+        "Noite": ("22:00", "01:00"), "Madrugada": ("00:00", "03:00"),
+    }
+    # 23:00 vem antes da entrada de Madrugada (00:00) nesta escala
+    assert aplicar_alteracoes(agenda, "20:00", "23:00", {"Madrugada": None}) == {"Noite": ("22:00", "02:00")}